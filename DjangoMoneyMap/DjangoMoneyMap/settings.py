@@ -22,7 +22,7 @@ STATICFILES_DIRS = [
 STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')  # for collectstatic in production
 
 MEDIA_URL = '/media/'
-MEDIA_ROOT = BASE_DIR /'media'
+MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
 from pathlib import Path
 
@@ -56,6 +56,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'MoneyMapControl.middleware.PerformanceMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -63,7 +64,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
-    'whitenoise.middleware.WhiteNoiseMiddleware',
+    'MoneyMapControl.middleware.StaticFilesMiddleware',
 ]
 
 STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFileStorage'
@@ -72,7 +73,7 @@ ROOT_URLCONF = 'DjangoMoneyMap.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'BACKEND': 'MoneyMapControl.metrics.TimedDjangoTemplates',
         'DIRS': [],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -90,14 +91,89 @@ WSGI_APPLICATION = 'DjangoMoneyMap.wsgi.application'
 
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
+# MONEYMAP_SQLITE_PROFILE picks the SQLite tuning: "stock" (the default) is
+# plain SQLite; "production" runs the pragmas below on every new connection and
+# begins write transactions IMMEDIATE so concurrent writers queue on
+# busy_timeout instead of failing with "database is locked". Opting in switches
+# the database file to WAL for good and leaves -wal/-shm files beside it.
+# Production also keeps request connections open for ten minutes, checked
+# before reuse. The async views' section threads (MoneyMapControl.fanout)
+# come from a bounded pool and keep their connections under either profile.
+
+SQLITE_READ_PRAGMAS = (
+    'PRAGMA busy_timeout=5000;'
+    'PRAGMA mmap_size=134217728;'
+    'PRAGMA cache_size=-32000;'
+    'PRAGMA temp_store=MEMORY;'
+)
+
+MONEYMAP_SQLITE_PROFILES = {
+    'stock': {},
+    'production': {
+        'CONN_MAX_AGE': 600,
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            'init_command': 'PRAGMA journal_mode=WAL;PRAGMA synchronous=NORMAL;' + SQLITE_READ_PRAGMAS,
+            'transaction_mode': 'IMMEDIATE',
+        },
+    },
+}
+
+MONEYMAP_SQLITE_PROFILE = os.environ.get('MONEYMAP_SQLITE_PROFILE', 'stock')
 
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        **MONEYMAP_SQLITE_PROFILES[MONEYMAP_SQLITE_PROFILE],
+    }
+}
+
+# Reports, dashboards and exports read from the "replica" alias (see
+# MoneyMapControl.routers). MONEYMAP_REPLICA_PATH names a replicated copy of
+# the database; without it the replica is a read-only connection to the
+# primary file. Read-only connections leave the journal mode to the primary.
+
+MONEYMAP_REPLICA_PATH = os.environ.get('MONEYMAP_REPLICA_PATH')
+
+DATABASES['replica'] = {
+    **DATABASES['default'],
+    'NAME': Path(MONEYMAP_REPLICA_PATH or DATABASES['default']['NAME']).resolve().as_uri() + '?mode=ro',
+    'OPTIONS': {'init_command': SQLITE_READ_PRAGMAS} if MONEYMAP_SQLITE_PROFILE == 'production' else {},
+    'TEST': {'MIRROR': 'default'},
+}
+
+DATABASE_ROUTERS = ['MoneyMapControl.routers.ReadReplicaRouter']
+
+# Seconds after a user's last write during which their reads stay on the primary.
+MONEYMAP_REPLICA_LAG = 10
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# Local memory by default; set MONEYMAP_CACHE_DIR to share a file-based cache between processes.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'moneymap',
     }
 }
 
+if os.environ.get('MONEYMAP_CACHE_DIR'):
+    CACHES['default'] = {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.environ['MONEYMAP_CACHE_DIR'],
+    }
+
+MONEYMAP_CACHE_TIMEOUT = 3600
+
+# Async views run their independent sections on separate threads and connections.
+MONEYMAP_CONCURRENT_SECTIONS = True
+
+# Requests slower than this many milliseconds are logged with their SQL; unset to disable.
+MONEYMAP_SLOW_REQUEST_MS = float(os.environ['MONEYMAP_SLOW_REQUEST_MS']) if os.environ.get('MONEYMAP_SLOW_REQUEST_MS') else None
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
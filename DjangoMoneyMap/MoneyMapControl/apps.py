@@ -2,4 +2,9 @@ from django.apps import AppConfig
 
 class MoneymapcontrolConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'MoneyMapControl'
\ No newline at end of file
+    name = 'MoneyMapControl'
+
+    def ready(self):
+        from django.db.backends.signals import connection_created
+        from . import metrics, signals  # noqa: F401
+        connection_created.connect(metrics.install_query_counter, dispatch_uid='moneymap_query_counter')
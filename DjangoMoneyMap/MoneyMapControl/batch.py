@@ -0,0 +1,124 @@
+from collections import defaultdict
+from decimal import Decimal
+from django.db.transaction import atomic
+from .forms import TransactionForm, resolve_categories
+from .models import Transaction, add_ledger_delta, apply_ledger_deltas, normalize_type
+from .signals import data_changed
+
+MAX_OPERATIONS = 1000
+FIELDS = [*TransactionForm._meta.fields, 'category']
+
+
+class BatchError(ValueError):
+    pass
+
+
+def _form_errors(form):
+    return {field: [str(e) for e in errs] for field, errs in form.errors.items()}
+
+
+def apply_batch(user, operations):
+    """Apply create/update/delete ``operations`` to ``user``'s transactions.
+
+    Every operation is validated first; if any fails nothing is written and
+    the per-operation results say why. Otherwise all of them are applied in
+    one transaction with a single ``bulk_create``, ``bulk_update`` and delete.
+    Updates may be partial. Returns ``(ok, results)``.
+    """
+    if not isinstance(operations, list):
+        raise BatchError("'operations' must be a list.")
+    if len(operations) > MAX_OPERATIONS:
+        raise BatchError(f"At most {MAX_OPERATIONS} operations per batch.")
+
+    ids = set()
+    for op in operations:
+        if isinstance(op, dict) and op.get('op') in ('update', 'delete'):
+            try:
+                ids.add(int(op.get('id')))
+            except (TypeError, ValueError):
+                pass
+    existing = Transaction.objects.filter(user=user).select_related('category').in_bulk(ids)
+
+    results, creates, updates, deletes, forms = [], [], [], [], []
+    touched = set()
+    for index, op in enumerate(operations):
+        kind = op.get('op') if isinstance(op, dict) else None
+        result = {'index': index, 'op': kind}
+        results.append(result)
+        if kind not in ('create', 'update', 'delete'):
+            result['errors'] = {'op': ["Must be 'create', 'update' or 'delete'."]}
+            continue
+        data = op.get('data') or {}
+        if not isinstance(data, dict):
+            result['errors'] = {'data': ['Must be an object.']}
+            continue
+        if 'type' in data:
+            data = {**data, 'type': normalize_type(data['type'])}
+
+        if kind == 'create':
+            form = TransactionForm(data, user=user)
+            if not form.is_valid():
+                result['errors'] = _form_errors(form)
+                continue
+            transaction = form.instance
+            transaction.user = user
+            creates.append((result, transaction))
+            forms.append(form)
+            continue
+
+        try:
+            instance = existing.get(int(op.get('id')))
+        except (TypeError, ValueError):
+            instance = None
+        result['id'] = op.get('id')
+        if instance is None:
+            result['errors'] = {'id': ['Transaction not found.']}
+            continue
+        if instance.pk in touched:
+            result['errors'] = {'id': ['Transaction appears more than once in this batch.']}
+            continue
+        touched.add(instance.pk)
+
+        if kind == 'delete':
+            deletes.append((result, instance))
+            continue
+
+        merged = {field: getattr(instance, field) for field in TransactionForm._meta.fields}
+        merged['category'] = instance.category.name
+        merged.update(data)
+        form = TransactionForm(merged, instance=instance, user=user)
+        if not form.is_valid():
+            result['errors'] = _form_errors(form)
+            continue
+        updates.append((result, instance))
+        forms.append(form)
+
+    if any('errors' in result for result in results):
+        for result in results:
+            result['status'] = 'error' if 'errors' in result else 'skipped'
+        return False, results
+
+    deltas = defaultdict(lambda: [Decimal('0'), 0])
+    with atomic():
+        # Categories are only created once the whole batch is known to be valid.
+        resolve_categories(user.id, forms)
+        Transaction.objects.bulk_create([t for _result, t in creates])
+        Transaction.objects.bulk_update([t for _result, t in updates], FIELDS)
+        Transaction.objects.filter(pk__in=[t.pk for _result, t in deletes]).delete()
+
+        for result, transaction in creates:
+            transaction._ledger_row = transaction.ledger_row()
+            add_ledger_delta(deltas, transaction._ledger_row, 1)
+            result.update(status='created', id=transaction.pk)
+        for result, transaction in updates:
+            add_ledger_delta(deltas, transaction._ledger_row, -1)
+            transaction._ledger_row = transaction.ledger_row()
+            add_ledger_delta(deltas, transaction._ledger_row, 1)
+            result['status'] = 'updated'
+        for result, transaction in deletes:
+            add_ledger_delta(deltas, transaction._ledger_row, -1)
+            result['status'] = 'deleted'
+        apply_ledger_deltas(deltas)
+        if results:
+            data_changed(user.id)
+    return True, results
@@ -0,0 +1,37 @@
+from .caching import bump_version, cached, data_version
+from .models import Blog
+
+# Blog posts read the same for everyone, so they are cached once for the
+# whole site under this namespace instead of per user.
+SITE = 'site'
+
+# Seconds browsers and shared caches may reuse a blog page without asking.
+MAX_AGE = 300
+
+
+def _latest(limit):
+    return list(Blog.objects.only('title', 'slug', 'excerpt', 'published_date')[:limit])
+
+
+def latest_blogs(limit=2):
+    """The newest ``limit`` posts for the dashboard feed."""
+    return cached(SITE, f'blogs:latest:{limit}', _latest, limit)
+
+
+def _page(slug, render):
+    blog = Blog.objects.filter(slug=slug).first()
+    # An empty page marks an unknown slug, so misses are cached too.
+    return render(blog) if blog is not None else ''
+
+
+def blog_page(slug, render):
+    """``render(blog)`` for the post at ``slug``, cached until a post changes; ``''`` if there is none."""
+    return cached(SITE, f'blogs:page:{slug}', _page, slug, render)
+
+
+def blog_etag(request, slug):
+    return f"blog-{slug}-{data_version(SITE)}"
+
+
+def blogs_changed():
+    bump_version(SITE)
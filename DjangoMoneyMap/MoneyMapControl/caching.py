@@ -0,0 +1,69 @@
+import threading
+import time
+from django.conf import settings
+from django.core.cache import cache
+
+KEY_PREFIX = 'moneymap'
+
+_stats = {'hits': 0, 'misses': 0, 'bumps': 0}
+_stats_lock = threading.Lock()
+
+
+def _count(name):
+    with _stats_lock:
+        _stats[name] += 1
+
+
+def stats():
+    """Hit/miss/bump counters for this process since start (or the last ``reset_stats``)."""
+    with _stats_lock:
+        counters = dict(_stats)
+    lookups = counters['hits'] + counters['misses']
+    counters['hit_rate'] = round(counters['hits'] / lookups, 4) if lookups else 0.0
+    return counters
+
+
+def reset_stats():
+    with _stats_lock:
+        for name in _stats:
+            _stats[name] = 0
+
+
+def _version_key(user_id):
+    return f'{KEY_PREFIX}:version:{user_id}'
+
+
+def data_version(user_id):
+    """Current data version for ``user_id``.
+
+    A missing version (first use or evicted) is started from the clock rather
+    than from 1, so entries cached under an older, evicted version can never
+    be mistaken for current ones.
+    """
+    version = cache.get(_version_key(user_id))
+    if version is None:
+        version = time.time_ns()
+        if not cache.add(_version_key(user_id), version, timeout=None):
+            version = cache.get(_version_key(user_id), version)
+    return version
+
+
+def bump_version(*user_ids):
+    """Invalidate everything cached for ``user_ids`` by moving them to a new version."""
+    version = time.time_ns()
+    cache.set_many({_version_key(user_id): version for user_id in user_ids}, timeout=None)
+    with _stats_lock:
+        _stats['bumps'] += len(user_ids)
+
+
+def cached(user_id, name, compute, *args):
+    """Return ``compute(*args)`` cached under ``user_id``'s current data version."""
+    key = f'{KEY_PREFIX}:{user_id}:{data_version(user_id)}:{name}'
+    value = cache.get(key)
+    if value is not None:
+        _count('hits')
+        return value
+    _count('misses')
+    value = compute(*args)
+    cache.set(key, value, timeout=getattr(settings, 'MONEYMAP_CACHE_TIMEOUT', 3600))
+    return value
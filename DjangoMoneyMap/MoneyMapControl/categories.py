@@ -0,0 +1,61 @@
+import hashlib
+from django.core.cache import cache
+from django.db import transaction
+from .caching import KEY_PREFIX
+from .models import Category, category_key, clean_category_name, normalize_type
+
+CACHE_TIMEOUT = 24 * 60 * 60
+
+
+def _cache_key(user_id, type_, key):
+    digest = hashlib.md5(key.encode('utf-8')).hexdigest()
+    return f'{KEY_PREFIX}:category:{user_id}:{type_}:{digest}'
+
+
+def _fetch(user_id, wanted):
+    rows = Category.objects.filter(user_id=user_id, key__in={key for _type, key in wanted})
+    return {
+        (type_, key): pk
+        for pk, type_, key in rows.values_list('pk', 'type', 'key')
+        if (type_, key) in wanted
+    }
+
+
+def resolve_many(user_id, pairs):
+    """Map ``(type, name)`` pairs to ``user_id``'s category ids, creating any that are missing.
+
+    Returns ``{(type, key): id}`` keyed by the normalized type and
+    ``category_key``. Known ids come from the cache; the rest cost one query
+    plus one ``bulk_create``. Ids are only cached once the surrounding
+    transaction commits, so a rollback can never leave a dangling id behind.
+    """
+    wanted = {}
+    for type_, name in pairs:
+        name = clean_category_name(name)
+        wanted.setdefault((normalize_type(type_), category_key(name)), name)
+
+    cache_keys = {_cache_key(user_id, *pair): pair for pair in wanted}
+    found = {cache_keys[key]: pk for key, pk in cache.get_many(list(cache_keys)).items()}
+    missing = wanted.keys() - found.keys()
+    if missing:
+        fetched = _fetch(user_id, missing)
+        new = missing - fetched.keys()
+        if new:
+            Category.objects.bulk_create(
+                [Category(user_id=user_id, type=type_, key=key, name=wanted[type_, key]) for type_, key in new],
+                ignore_conflicts=True,
+            )
+            fetched.update(_fetch(user_id, new))
+        found.update(fetched)
+        entries = {_cache_key(user_id, *pair): pk for pair, pk in fetched.items()}
+        transaction.on_commit(lambda: cache.set_many(entries, CACHE_TIMEOUT))
+    return found
+
+
+def resolve(user_id, type_, name):
+    """The id of ``user_id``'s category called ``name`` (in any case or spacing), created if new."""
+    return resolve_many(user_id, [(type_, name)])[normalize_type(type_), category_key(name)]
+
+
+def forget(category):
+    cache.delete(_cache_key(category.user_id, category.type, category.key))
@@ -0,0 +1,85 @@
+import csv
+import zlib
+from django.core.serializers.json import DjangoJSONEncoder
+from .models import Transaction, Budget, Goal, Investment
+
+CHUNK_SIZE = 2000
+FLUSH_BYTES = 64 * 1024
+
+DATASETS = {
+    'transactions': (
+        lambda user: Transaction.objects.filter(user=user).order_by('date', 'id'),
+        ['id', 'date', 'type', 'category', 'amount', 'description'],
+    ),
+    'budgets': (
+        lambda user: Budget.objects.with_spending(user).order_by('id'),
+        ['id', 'category', 'limit', 'spent_amount'],
+    ),
+    'goals': (
+        lambda user: Goal.objects.filter(user=user).order_by('id'),
+        ['id', 'name', 'target_amount', 'saved_amount'],
+    ),
+    'investments': (
+        lambda user: Investment.objects.filter(user=user).order_by('id'),
+        ['id', 'name', 'type', 'quantity', 'purchase_price', 'current_price'],
+    ),
+}
+# Columns read through a relation rather than from the row itself.
+LOOKUPS = {'category': 'category__name'}
+FORMATS = {'csv': 'text/csv', 'ndjson': 'application/x-ndjson'}
+
+
+class _Line:
+    """File-like object whose ``write`` hands the CSV row back instead of storing it."""
+
+    def write(self, value):
+        return value
+
+
+def _rows(user, dataset):
+    queryset, fields = DATASETS[dataset]
+    return fields, queryset(user).values_list(*[LOOKUPS.get(field, field) for field in fields]).iterator(chunk_size=CHUNK_SIZE)
+
+
+def csv_lines(user, dataset):
+    fields, rows = _rows(user, dataset)
+    writer = csv.writer(_Line())
+    yield writer.writerow(fields)
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def ndjson_lines(user, dataset):
+    fields, rows = _rows(user, dataset)
+    encoder = DjangoJSONEncoder()
+    for row in rows:
+        yield encoder.encode(dict(zip(fields, row))) + '\n'
+
+
+def _buffered(lines):
+    """Join lines into ~64KB chunks so the response is not written one row at a time."""
+    buffer, size = [], 0
+    for line in lines:
+        buffer.append(line)
+        size += len(line)
+        if size >= FLUSH_BYTES:
+            yield ''.join(buffer).encode('utf-8')
+            buffer, size = [], 0
+    if buffer:
+        yield ''.join(buffer).encode('utf-8')
+
+
+def _gzipped(chunks):
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def export_stream(user, dataset, fmt, gzip=False):
+    """Byte chunks for ``dataset`` in ``fmt``; rows are read with ``.iterator()`` so memory stays flat."""
+    lines = csv_lines(user, dataset) if fmt == 'csv' else ndjson_lines(user, dataset)
+    chunks = _buffered(lines)
+    return _gzipped(chunks) if gzip else chunks
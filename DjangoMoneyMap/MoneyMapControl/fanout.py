@@ -0,0 +1,63 @@
+import asyncio
+from functools import wraps
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import connections
+from . import metrics
+
+
+def _release():
+    # Worker threads come from a bounded pool, so each keeps its connection
+    # like a pool would; only connections left unusable by an error are closed.
+    for connection in connections.all(initialized_only=True):
+        if connection.errors_occurred:
+            if connection.is_usable():
+                connection.errors_occurred = False
+            else:
+                connection.close()
+
+
+def _run(stats, concurrent, fn, args):
+    # Each section counts into its own stats, as sections may run at the same time.
+    token = metrics.current.set(stats)
+    try:
+        return fn(*args)
+    finally:
+        metrics.current.reset(token)
+        if concurrent:
+            _release()
+
+
+async def gather(*calls):
+    """Run each ``(fn, *args)`` of ``calls`` in a worker thread; return their results in order.
+
+    With ``MONEYMAP_CONCURRENT_SECTIONS`` (the default) every call gets its own
+    thread and database connection, so independent queries overlap and the
+    event loop stays free while they run. The worker threads keep their
+    connections between requests, whatever ``CONN_MAX_AGE`` says. Otherwise the calls run one after
+    another on the request's thread, as a synchronous view would. Queries are
+    added to the current request's metrics either way.
+    """
+    concurrent = getattr(settings, 'MONEYMAP_CONCURRENT_SECTIONS', True)
+    parent = metrics.current.get()
+    children = [
+        None if parent is None else metrics.RequestStats(capture_sql=parent.sql is not None)
+        for _call in calls
+    ]
+    results = await asyncio.gather(*(
+        sync_to_async(_run, thread_sensitive=not concurrent)(stats, concurrent, fn, args)
+        for stats, (fn, *args) in zip(children, calls)
+    ))
+    for stats in children:
+        if stats is not None:
+            parent.merge(stats)
+    return results
+
+
+def resolve_user(view):
+    """Load ``request.user`` without blocking, so sync helpers such as ETag functions can read it."""
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        request.user = await request.auser()
+        return await view(request, *args, **kwargs)
+    return wrapper
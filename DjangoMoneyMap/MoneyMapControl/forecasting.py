@@ -0,0 +1,89 @@
+from datetime import date
+import numpy as np
+from django.db.models import Sum
+from .models import Goal, MonthlyRollup
+
+LOOKBACK_MONTHS = 12
+HALF_LIFE_MONTHS = 3
+
+
+def _month(day):
+    return np.datetime64(day, 'M')
+
+
+def monthly_net_flow(user, today=None, lookback=LOOKBACK_MONTHS):
+    """Income minus expense for each of the last ``lookback`` complete months, oldest first.
+
+    Months before the user's first recorded transaction are dropped so a new
+    user's average is not diluted by empty history.
+    """
+    end = _month(today or date.today())
+    start = end - lookback
+    flows = np.zeros(lookback)
+    active = np.zeros(lookback, dtype=bool)
+    rows = (
+        MonthlyRollup.objects
+        .filter(user=user, month__gte=start.astype(object), month__lt=end.astype(object), count__gt=0)
+        .values_list('month', 'type')
+        .annotate(total=Sum('total'))
+        .order_by()
+    )
+    for month, type_, total in rows:
+        index = (_month(month) - start).astype(int)
+        flows[index] += float(total) if type_ == 'Income' else -float(total)
+        active[index] = True
+    if not active.any():
+        return flows[:0]
+    return flows[np.argmax(active):]
+
+
+def savings_rate(flows, half_life=HALF_LIFE_MONTHS):
+    """Exponentially weighted mean of monthly net flow, recent months counting most; never negative."""
+    if not len(flows):
+        return 0.0
+    weights = 0.5 ** (np.arange(len(flows))[::-1] / half_life)
+    return max(float(weights @ flows / weights.sum()), 0.0)
+
+
+def forecast_goals(user, today=None, goals=None):
+    """Completion month and required monthly contribution for every goal of ``user``.
+
+    The estimated monthly savings are assumed to fund goals one at a time,
+    earliest target date first (goals without one last, oldest first).
+    ``goals`` may pass already fetched ``Goal`` value dicts. Returns
+    ``{'monthly_savings': float, 'goals': {goal_id: {...}}}``.
+    """
+    today = today or date.today()
+    if goals is None:
+        goals = Goal.objects.filter(user=user).values('id', 'target_amount', 'saved_amount', 'target_date')
+    rows = [(g['id'], g['target_amount'], g['saved_amount'], g['target_date']) for g in goals]
+    rate = savings_rate(monthly_net_flow(user, today))
+    if not rows:
+        return {'monthly_savings': round(rate, 2), 'goals': {}}
+
+    ids, targets, saved, target_dates = zip(*rows)
+    remaining = np.maximum(np.array(targets, dtype=float) - np.array(saved, dtype=float), 0)
+    now = _month(today)
+    deadline = np.array([_month(d) if d else np.datetime64('NaT', 'M') for d in target_dates])
+    has_deadline = ~np.isnat(deadline)
+    months_left = np.where(has_deadline, (deadline - now).astype(int), 0)
+    months_left = np.maximum(months_left, 1)
+
+    order = np.lexsort((np.array(ids), np.where(has_deadline, months_left, np.iinfo(np.int64).max)))
+    queued = np.empty_like(remaining)
+    queued[order] = np.cumsum(remaining[order])
+    with np.errstate(divide='ignore', invalid='ignore'):
+        months_needed = np.where(remaining == 0, 0, np.ceil(queued / rate) if rate else np.inf)
+    done = np.isfinite(months_needed)
+    completion = now + np.where(done, months_needed, 0).astype(int)
+    required = np.where(has_deadline, remaining / months_left, np.nan)
+
+    forecast = {}
+    for i, goal_id in enumerate(ids):
+        forecast[goal_id] = {
+            'months_to_complete': int(months_needed[i]) if done[i] else None,
+            'completion_month': str(completion[i]) if done[i] else None,
+            'required_monthly': round(float(required[i]), 2) if has_deadline[i] else None,
+            'on_track': bool(done[i] and completion[i] <= deadline[i]) if has_deadline[i] else None,
+        }
+    return {'monthly_savings': round(rate, 2), 'goals': forecast}
@@ -1,6 +1,7 @@
 from django import forms
 from django.contrib.auth.forms import UserCreationForm, AuthenticationForm
-from .models import CustomUser, Transaction, Budget, Goal
+from .categories import resolve_many
+from .models import CustomUser, Transaction, Budget, Goal, RecurringRule, category_key, normalize_type
 
 class CustomUserCreationForm(UserCreationForm):
     username = forms.CharField(max_length=150, required=True, label='Username')
@@ -33,23 +34,77 @@ class ForgotPasswordForm(forms.Form):
             raise forms.ValidationError("Passwords do not match.")
         return cleaned_data
         
-class TransactionForm(forms.ModelForm):
+def resolve_categories(user_id, valid_forms):
+    """Point each valid form's instance at its category, creating missing categories in one go."""
+    ids = resolve_many(user_id, [form.category_name() for form in valid_forms])
+    for form in valid_forms:
+        type_, name = form.category_name()
+        form.instance.category_id = ids[normalize_type(type_), category_key(name)]
+
+class CategoryNameForm(forms.ModelForm):
+    """Takes ``category`` as a name and resolves it to one of ``user``'s categories on ``save()``.
+
+    Validation never writes: a category that does not exist yet is only
+    created when the form is saved, or by ``resolve_categories`` once every
+    form of a batch has validated.
+    """
+    category = forms.CharField(max_length=100)
+    # Budgets have no ``type`` field; they always track an expense category.
+    category_type = None
+    field_order = ['type', 'category']
+
+    def __init__(self, *args, user=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.user_id = user.pk if user is not None else self.instance.user_id
+        if self.instance.category_id and 'category' not in self.initial:
+            self.initial['category'] = self.instance.category.name
+
+    def category_name(self):
+        """``(type, name)`` of the category the validated form refers to."""
+        return self.category_type or self.cleaned_data['type'], self.cleaned_data['category']
+
+    def save(self, commit=True):
+        resolve_categories(self.user_id, [self])
+        return super().save(commit)
+
+class TransactionForm(CategoryNameForm):
     class Meta:
         model = Transaction
-        fields = ['type', 'category', 'amount', 'date', 'description']
+        fields = ['type', 'amount', 'date', 'description']
         widgets = {
             'date': forms.DateInput(attrs={'type': 'date'}),
         }
 
-class BudgetForm(forms.ModelForm):
+class RecurringRuleForm(CategoryNameForm):
+    class Meta:
+        model = RecurringRule
+        fields = ['type', 'amount', 'description', 'frequency', 'interval', 'start_date', 'end_date']
+        widgets = {
+            'start_date': forms.DateInput(attrs={'type': 'date'}),
+            'end_date': forms.DateInput(attrs={'type': 'date'}),
+            'description': forms.TextInput(),
+        }
+
+    def clean(self):
+        cleaned_data = super().clean()
+        start, end = cleaned_data.get('start_date'), cleaned_data.get('end_date')
+        if start and end and end < start:
+            self.add_error('end_date', 'End date must be after the start date.')
+        if cleaned_data.get('interval') == 0:
+            self.add_error('interval', 'Interval must be at least 1.')
+        return cleaned_data
+
+class BudgetForm(CategoryNameForm):
+    category = forms.CharField(max_length=100, widget=forms.TextInput(attrs={
+        'class': 'border-gray-300 rounded-md p-2 w-full',
+        'placeholder': 'Category name'
+    }))
+    category_type = 'Expense'
+
     class Meta:
         model = Budget
-        fields = ['category', 'limit']
+        fields = ['limit']
         widgets = {
-            'category': forms.TextInput(attrs={
-                'class': 'border-gray-300 rounded-md p-2 w-full',
-                'placeholder': 'Category name'
-            }),
             'limit': forms.NumberInput(attrs={
                 'class': 'border-gray-300 rounded-md p-2 w-full',
                 'placeholder': 'Limit (₹)'
@@ -59,9 +114,10 @@ class BudgetForm(forms.ModelForm):
 class GoalForm(forms.ModelForm):
     class Meta:
         model = Goal
-        fields = ['name', 'target_amount', 'saved_amount']
+        fields = ['name', 'target_amount', 'saved_amount', 'target_date']
         widgets = {
             'name': forms.TextInput(attrs={'class': 'border-gray-300 rounded-md p-2 w-full', 'placeholder': 'Goal name'}),
             'target_amount': forms.NumberInput(attrs={'class': 'border-gray-300 rounded-md p-2 w-full', 'placeholder': 'Target (₹)'}),
             'saved_amount': forms.NumberInput(attrs={'class': 'border-gray-300 rounded-md p-2 w-full', 'placeholder': 'Saved (₹)'}),
+            'target_date': forms.DateInput(attrs={'type': 'date', 'class': 'border-gray-300 rounded-md p-2 w-full'}),
         }
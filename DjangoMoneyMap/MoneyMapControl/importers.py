@@ -0,0 +1,189 @@
+import csv
+import io
+import re
+import time
+from collections import Counter, defaultdict
+from decimal import Decimal, InvalidOperation
+from django.db.models import Max
+from django.db.transaction import atomic
+from .categories import resolve_many
+from .forms import TransactionForm
+from .models import Transaction, add_ledger_delta, apply_ledger_deltas, category_key, normalize_type
+from .signals import data_changed
+
+BATCH_SIZE = 1000
+MAX_REPORTED_ERRORS = 1000
+
+CSV_ALIASES = {
+    'type': 'type', 'transaction type': 'type',
+    'category': 'category',
+    'amount': 'amount', 'value': 'amount',
+    'date': 'date', 'posted': 'date', 'transaction date': 'date',
+    'description': 'description', 'memo': 'description', 'narration': 'description', 'details': 'description',
+}
+OFX_TAG = re.compile(r'<(/?)([A-Za-z0-9.]+)>([^<]*)')
+
+
+class ImportReport:
+    def __init__(self):
+        self.rows = 0
+        self.created = 0
+        self.duplicates = 0
+        self.error_count = 0
+        self.errors = []
+        self.started = time.perf_counter()
+        self.elapsed = 0.0
+
+    def add_error(self, line, errors):
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({'line': line, 'errors': errors})
+
+    @property
+    def rows_per_second(self):
+        return self.rows / self.elapsed if self.elapsed else 0.0
+
+    def as_dict(self):
+        return {
+            'rows': self.rows,
+            'created': self.created,
+            'duplicates': self.duplicates,
+            'error_count': self.error_count,
+            'errors': self.errors,
+            'seconds': round(self.elapsed, 3),
+            'rows_per_second': round(self.rows_per_second, 1),
+        }
+
+
+def _signed(row):
+    """Fill in ``type`` from the sign of ``amount`` when the source has no type column."""
+    amount = (row.get('amount') or '').replace(',', '').strip()
+    if not row.get('type') and amount:
+        try:
+            row['type'] = 'Expense' if Decimal(amount) < 0 else 'Income'
+        except InvalidOperation:
+            pass
+    row['amount'] = amount.lstrip('-+')
+    row['type'] = normalize_type(row.get('type'))
+    return row
+
+
+def parse_csv(stream):
+    """Yield ``(line_number, row)`` from a CSV text stream without reading it all into memory."""
+    reader = csv.reader(stream)
+    header = next(reader, None)
+    if header is None:
+        return
+    columns = [CSV_ALIASES.get(name.strip().lower()) for name in header]
+    for values in reader:
+        if not any(v.strip() for v in values):
+            continue
+        row = {column: value.strip() for column, value in zip(columns, values) if column}
+        row.setdefault('category', 'Uncategorized')
+        yield reader.line_num, _signed(row)
+
+
+def parse_ofx(stream):
+    """Yield ``(line_number, row)`` for each ``<STMTTRN>`` block of an OFX (SGML or XML) stream."""
+    current = None
+    for line_number, line in enumerate(stream, start=1):
+        for closing, tag, value in OFX_TAG.findall(line):
+            tag = tag.upper()
+            value = value.strip()
+            if tag == 'STMTTRN':
+                if closing and current is not None:
+                    yield current.pop('_line'), _signed(current)
+                    current = None
+                elif not closing:
+                    current = {'_line': line_number, 'category': 'Uncategorized'}
+            elif current is not None and not closing:
+                if tag == 'TRNAMT':
+                    current['amount'] = value
+                elif tag == 'DTPOSTED' and len(value) >= 8:
+                    current['date'] = f"{value[:4]}-{value[4:6]}-{value[6:8]}"
+                elif tag in ('NAME', 'MEMO') and value:
+                    current['description'] = f"{current['description']} - {value}" if current.get('description') else value
+
+
+PARSERS = {'csv': parse_csv, 'ofx': parse_ofx, 'qfx': parse_ofx}
+
+
+def detect_format(filename):
+    extension = filename.rsplit('.', 1)[-1].lower() if '.' in filename else ''
+    return extension if extension in PARSERS else 'csv'
+
+
+def open_text(binary):
+    return io.TextIOWrapper(binary, encoding='utf-8-sig', errors='replace', newline='')
+
+
+def _dedupe_key(t):
+    return (t.date, t.type, t.category_id, t.amount, t.description or '')
+
+
+def _flush(user, rows, report, before):
+    """Insert the ``(transaction, (type, category name))`` rows not already in the database.
+
+    Only transactions with a pk up to ``before`` (those that existed when the
+    import started) count as duplicates, each matching at most one row, so
+    identical rows within the file, like two equal coffees on one day, are all
+    kept while importing the same file again adds nothing.
+    """
+    categories = resolve_many(user.id, [pair for _t, pair in rows])
+    batch = []
+    for t, (type_, name) in rows:
+        t.category_id = categories[normalize_type(type_), category_key(name)]
+        batch.append(t)
+    existing = Counter(
+        (day, type_, category, amount, description or '')
+        for day, type_, category, amount, description in Transaction.objects
+        .filter(user=user, date__in={t.date for t in batch}, pk__lte=before)
+        .values_list('date', 'type', 'category', 'amount', 'description')
+    )
+    fresh = []
+    for t in batch:
+        key = _dedupe_key(t)
+        if existing[key] > 0:
+            existing[key] -= 1
+            report.duplicates += 1
+            continue
+        fresh.append(t)
+
+    with atomic():
+        Transaction.objects.bulk_create(fresh)
+        deltas = defaultdict(lambda: [Decimal('0'), 0])
+        for t in fresh:
+            add_ledger_delta(deltas, t.ledger_row(), 1)
+        apply_ledger_deltas(deltas)
+    report.created += len(fresh)
+
+
+def import_transactions(user, rows, batch_size=BATCH_SIZE):
+    """Validate ``rows`` with ``TransactionForm`` and insert them in batches.
+
+    Each batch is deduplicated against the transactions the user had before
+    the import and written in its own transaction, so an invalid row only
+    skips that row and memory use is bounded by ``batch_size`` whatever the
+    input size.
+    """
+    report = ImportReport()
+    before = Transaction.objects.filter(user=user).aggregate(last=Max('pk'))['last'] or 0
+    batch = []
+    for line, row in rows:
+        report.rows += 1
+        form = TransactionForm(row, user=user)
+        if not form.is_valid():
+            report.add_error(line, {field: [str(e) for e in errs] for field, errs in form.errors.items()})
+            continue
+        transaction = form.instance
+        transaction.user = user
+        batch.append((transaction, form.category_name()))
+        if len(batch) >= batch_size:
+            _flush(user, batch, report, before)
+            batch = []
+    if batch:
+        _flush(user, batch, report, before)
+    if report.created:
+        data_changed(user.id)
+    report.elapsed = time.perf_counter() - report.started
+    return report
@@ -0,0 +1,237 @@
+import logging
+import os
+import socket
+import threading
+import traceback
+from datetime import date, timedelta
+from time import perf_counter
+from django.db import IntegrityError, OperationalError, close_old_connections, connections
+from django.db.models import Count, Max, Sum
+from django.db.transaction import atomic
+from django.utils import timezone
+from . import ledger
+from .models import Job, RecurringRule
+from .prices import parse_prices, refresh_prices
+from .recurring import materialize
+from .signals import data_changed
+
+logger = logging.getLogger('MoneyMapControl.jobs')
+
+MAX_ATTEMPTS = 3
+# A failed attempt is retried after RETRY_DELAY, doubling with every attempt.
+RETRY_DELAY = timedelta(seconds=30)
+POLL_SECONDS = 1.0
+
+TASKS = {}
+
+
+def task(name):
+    """Register the decorated function as the job ``name``; it is called with the job's ``args``."""
+    def register(fn):
+        TASKS[name] = fn
+        return fn
+    return register
+
+
+@task('recompute_user')
+def recompute_user(user_id):
+    result = ledger.rebuild([user_id])
+    data_changed(user_id)
+    return result
+
+
+@task('materialize_recurring')
+def materialize_recurring(user_id=None):
+    rules = RecurringRule.objects.filter(user_id=user_id) if user_id is not None else None
+    return materialize(rules)
+
+
+@task('refresh_prices')
+def refresh_prices_job(prices):
+    return refresh_prices(parse_prices(prices))
+
+
+def enqueue(name, key='', delay=None, max_attempts=MAX_ATTEMPTS, **args):
+    """Queue ``name`` to run with ``args`` (JSON values) and return its ``Job``.
+
+    While a job with the same non-empty ``key`` is still queued, that job is
+    returned instead of queueing a second one. The row is part of the caller's
+    transaction, so a rolled back request never leaves a job behind.
+    """
+    if name not in TASKS:
+        raise ValueError(f"Unknown job {name!r}.")
+    run_at = timezone.now() + (delay or timedelta())
+    for _attempt in range(3):
+        try:
+            with atomic():
+                return Job.objects.create(name=name, key=key, args=args, run_at=run_at, max_attempts=max_attempts)
+        except IntegrityError:
+            existing = Job.objects.filter(key=key, status=Job.QUEUED).first()
+            if existing is not None:
+                return existing
+            # Claimed between the insert and the lookup; the key is free again.
+    raise IntegrityError(f"Could not queue {name!r} with key {key!r}.")
+
+
+def enqueue_for_user(name, user, **args):
+    """Queue ``name`` for ``user``, deduplicated so only one such job per user waits at a time."""
+    user_id = getattr(user, 'pk', user)
+    return enqueue(name, key=f'{name}:{user_id}', user_id=user_id, **args)
+
+
+def enqueue_due_recurring(user):
+    """Queue ``materialize_recurring`` for ``user`` if one of their rules is due; one indexed query otherwise.
+
+    Pages call this on every load, so a busy database skips the catch-up
+    (returning ``None``) rather than failing the page; the next load retries.
+    """
+    try:
+        if not RecurringRule.objects.filter(user=user, active=True, next_date__lte=date.today()).exists():
+            return None
+        return enqueue_for_user('materialize_recurring', user)
+    except OperationalError:
+        logger.warning("Could not queue the recurring catch-up for %s", user, exc_info=True)
+        return None
+
+
+def claim(worker):
+    """Mark the next due job as running for ``worker`` and return it, or ``None``.
+
+    Jobs whose key already has a running job wait, so two workers never run
+    the same key at once. The conditional update makes the claim safe across
+    threads and processes without row locks.
+    """
+    now = timezone.now()
+    with atomic():
+        busy = Job.objects.filter(status=Job.RUNNING).exclude(key='').values('key')
+        job = (
+            Job.objects.filter(status=Job.QUEUED, run_at__lte=now)
+            .exclude(key__in=busy)
+            .order_by('run_at', 'id')
+            .first()
+        )
+        if job is None:
+            return None
+        claimed = Job.objects.filter(pk=job.pk, status=Job.QUEUED).update(
+            status=Job.RUNNING, started_at=now, attempts=job.attempts + 1, worker=worker,
+        )
+    if not claimed:
+        return None
+    job.status, job.started_at, job.attempts, job.worker = Job.RUNNING, now, job.attempts + 1, worker
+    return job
+
+
+def run(job):
+    """Run a claimed ``job`` and record its outcome, queueing a retry if attempts remain."""
+    started = perf_counter()
+    try:
+        result = TASKS[job.name](**job.args)
+    except Exception:
+        job.seconds = perf_counter() - started
+        job.error = traceback.format_exc()
+        job.finished_at = timezone.now()
+        if job.attempts < job.max_attempts:
+            job.status = Job.QUEUED
+            job.run_at = job.finished_at + RETRY_DELAY * 2 ** (job.attempts - 1)
+        else:
+            job.status = Job.FAILED
+        logger.warning("Job %s failed (attempt %d of %d)", job, job.attempts, job.max_attempts, exc_info=True)
+        try:
+            with atomic():
+                job.save()
+        except IntegrityError:
+            # A newer job with this key is already queued and will do the work.
+            job.status = Job.FAILED
+            job.save()
+        return job
+
+    job.seconds = perf_counter() - started
+    job.status = Job.DONE
+    job.finished_at = timezone.now()
+    job.result = result
+    job.error = ''
+    job.save()
+    return job
+
+
+def requeue_stale(older_than):
+    """Put jobs running for longer than ``older_than`` (their worker died) back in the queue.
+
+    Where a newer job with the same key is already queued the stale one is
+    failed instead, as the queued one will do the work.
+    """
+    stale = Job.objects.filter(status=Job.RUNNING, started_at__lt=timezone.now() - older_than)
+    queued = Job.objects.filter(status=Job.QUEUED).exclude(key='').values('key')
+    stale.filter(key__in=queued).update(status=Job.FAILED, error="Worker lost; superseded by a queued job.")
+    return stale.update(status=Job.QUEUED)
+
+
+def purge(older_than):
+    """Delete finished jobs older than ``older_than``."""
+    cutoff = timezone.now() - older_than
+    return Job.objects.filter(status__in=[Job.DONE, Job.FAILED], finished_at__lt=cutoff).delete()[0]
+
+
+def work(stop=None, burst=False, poll=POLL_SECONDS, name=None):
+    """Claim and run jobs until ``stop`` is set (or, with ``burst``, the queue is empty); returns the count."""
+    stop = stop or threading.Event()
+    worker = name or f'{socket.gethostname()}:{os.getpid()}:{threading.current_thread().name}'
+    done = 0
+    while not stop.is_set():
+        close_old_connections()
+        try:
+            job = claim(worker)
+        except OperationalError:
+            # The database is busy with other claims; back off like an empty queue.
+            logger.warning("Could not claim a job", exc_info=True)
+            job = None
+        if job is None:
+            # In a burst, jobs held back by a running key are still waited for.
+            if burst and not Job.objects.filter(status=Job.QUEUED, run_at__lte=timezone.now()).exists():
+                break
+            stop.wait(poll)
+            continue
+        run(job)
+        done += 1
+    connections.close_all()
+    return done
+
+
+def work_threads(threads, stop, burst=False, poll=POLL_SECONDS):
+    """Run ``work`` on ``threads`` threads until they all return; returns the total count."""
+    counts = []
+    pool = [
+        threading.Thread(target=lambda: counts.append(work(stop, burst, poll)), name=f'worker-{i}', daemon=True)
+        for i in range(threads)
+    ]
+    for thread in pool:
+        thread.start()
+    try:
+        for thread in pool:
+            while thread.is_alive():
+                thread.join(0.5)
+    except KeyboardInterrupt:
+        stop.set()
+        for thread in pool:
+            thread.join()
+    return sum(counts)
+
+
+def stats():
+    """Per job name: how many jobs are in each status, and the run times of finished attempts."""
+    summary = {}
+    rows = Job.objects.values('name', 'status').annotate(count=Count('id'), total=Sum('seconds'), slowest=Max('seconds'))
+    for row in rows.order_by('name', 'status'):
+        entry = summary.setdefault(row['name'], {
+            Job.QUEUED: 0, Job.RUNNING: 0, Job.DONE: 0, Job.FAILED: 0, 'seconds': 0.0, 'max_seconds': 0.0,
+        })
+        entry[row['status']] = row['count']
+        if row['status'] in (Job.DONE, Job.FAILED):
+            entry['seconds'] += row['total'] or 0.0
+            entry['max_seconds'] = max(entry['max_seconds'], row['slowest'] or 0.0)
+    for entry in summary.values():
+        finished = entry[Job.DONE] + entry[Job.FAILED]
+        entry['avg_seconds'] = round(entry['seconds'] / finished, 4) if finished else 0.0
+        entry['seconds'] = round(entry['seconds'], 4)
+        entry['max_seconds'] = round(entry['max_seconds'], 4)
+    return summary
@@ -0,0 +1,125 @@
+from collections import defaultdict
+from decimal import Decimal
+from django.db.models import Count, DecimalField, Sum
+from django.db.models.functions import TruncMonth
+from django.db.transaction import atomic
+from django.utils import timezone
+from .models import Transaction, LedgerSummary, CategorySummary, MonthlyRollup, normalize_type, to_money
+
+
+def expected_rollups(user_ids=None):
+    """Recompute monthly totals straight from ``Transaction`` rows.
+
+    Returns ``{(user_id, type, category_id, month): (total, count)}``.
+    """
+    transactions = Transaction.objects.all()
+    if user_ids is not None:
+        transactions = transactions.filter(user_id__in=user_ids)
+    rows = (
+        transactions
+        .order_by()
+        .annotate(month=TruncMonth('date'))
+        .values('user_id', 'type', 'category', 'month')
+        .annotate(total=Sum('amount', output_field=DecimalField(max_digits=20, decimal_places=2)), count=Count('id'))
+    )
+    expected = defaultdict(lambda: [Decimal('0'), 0])
+    for row in rows.iterator():
+        entry = expected[(row['user_id'], normalize_type(row['type']), row['category'], row['month'])]
+        entry[0] += to_money(row['total'])
+        entry[1] += row['count']
+    return {key: tuple(value) for key, value in expected.items()}
+
+
+def _category_totals(rollups):
+    categories = defaultdict(lambda: [Decimal('0'), 0])
+    for (user_id, type_, category, _month), (total, count) in rollups.items():
+        categories[(user_id, type_, category)][0] += total
+        categories[(user_id, type_, category)][1] += count
+    return {key: tuple(value) for key, value in categories.items()}
+
+
+def _ledger_totals(categories):
+    ledgers = defaultdict(lambda: [Decimal('0'), Decimal('0'), 0])
+    for (user_id, type_, _category), (total, count) in categories.items():
+        if type_ == 'Income':
+            ledgers[user_id][0] += total
+        elif type_ == 'Expense':
+            ledgers[user_id][1] += total
+        ledgers[user_id][2] += count
+    return {key: tuple(value) for key, value in ledgers.items()}
+
+
+def _scoped(model, user_ids):
+    qs = model.objects.all()
+    if user_ids is not None:
+        qs = qs.filter(user_id__in=user_ids)
+    return qs
+
+
+def rebuild(user_ids=None):
+    """Replace the summaries and monthly rollups of ``user_ids`` (or every user)."""
+    with atomic():
+        rollups = expected_rollups(user_ids)
+        categories = _category_totals(rollups)
+        ledgers = _ledger_totals(categories)
+        for model in (MonthlyRollup, CategorySummary, LedgerSummary):
+            _scoped(model, user_ids).delete()
+
+        MonthlyRollup.objects.bulk_create(
+            [
+                MonthlyRollup(user_id=user_id, type=type_, category_id=category, month=month, total=total, count=count)
+                for (user_id, type_, category, month), (total, count) in rollups.items()
+            ],
+            batch_size=1000,
+        )
+        CategorySummary.objects.bulk_create(
+            [
+                CategorySummary(user_id=user_id, type=type_, category_id=category, total=total, count=count)
+                for (user_id, type_, category), (total, count) in categories.items()
+            ],
+            batch_size=1000,
+        )
+        now = timezone.now()
+        LedgerSummary.objects.bulk_create(
+            [
+                LedgerSummary(user_id=user_id, total_income=income, total_expense=expense,
+                              transaction_count=count, updated_at=now)
+                for user_id, (income, expense, count) in ledgers.items()
+            ],
+            batch_size=1000,
+        )
+    return len(ledgers), len(categories), len(rollups)
+
+
+def _compare(label, expected, actual, zero):
+    drift = []
+    for key in sorted(set(actual) | set(expected), key=str):
+        want = expected.get(key, zero)
+        have = actual.get(key, zero)
+        if want != have:
+            drift.append(f"{label} {key}: stored {have}, expected {want}")
+    return drift
+
+
+def verify(user_ids=None):
+    """Compare stored summaries with raw transactions and return a list of drift messages."""
+    rollups = expected_rollups(user_ids)
+    categories = _category_totals(rollups)
+    ledgers = _ledger_totals(categories)
+
+    drift = _compare('month', rollups, {
+        (r.user_id, r.type, r.category_id, r.month): (r.total, r.count)
+        for r in _scoped(MonthlyRollup, user_ids).iterator()
+        if r.total or r.count
+    }, (Decimal('0'), 0))
+    drift += _compare('category', categories, {
+        (s.user_id, s.type, s.category_id): (s.total, s.count)
+        for s in _scoped(CategorySummary, user_ids).iterator()
+        if s.total or s.count
+    }, (Decimal('0'), 0))
+    drift += _compare('ledger user', ledgers, {
+        s.user_id: (s.total_income, s.total_expense, s.transaction_count)
+        for s in _scoped(LedgerSummary, user_ids).iterator()
+        if s.total_income or s.total_expense or s.transaction_count
+    }, (Decimal('0'), Decimal('0'), 0))
+    return drift
@@ -0,0 +1,129 @@
+import asyncio
+import json
+import os
+import statistics
+import tempfile
+import time
+from django.conf import settings
+from django.core.asgi import get_asgi_application
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.utils import setup_databases, setup_test_environment, teardown_databases, teardown_test_environment
+from django.urls import reverse
+from MoneyMapControl.synthetic import seed_price_history, seed_user
+
+VIEWS = ['dashboard', 'dashboard_data', 'reports_data']
+
+MODES = {'sequential': False, 'concurrent': True}
+
+
+async def _get(app, path, session):
+    """One GET through the ASGI application; returns ``(status, seconds)``."""
+    scope = {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET', 'scheme': 'http',
+        'path': path, 'raw_path': path.encode(), 'query_string': b'', 'root_path': '',
+        'headers': [(b'host', b'testserver'), (b'cookie', f'{settings.SESSION_COOKIE_NAME}={session}'.encode())],
+        'client': ('127.0.0.1', 0), 'server': ('testserver', 80),
+    }
+    body = [{'type': 'http.request', 'body': b'', 'more_body': False}]
+    status = []
+
+    async def receive():
+        if body:
+            return body.pop()
+        await asyncio.Event().wait()  # the client never disconnects
+
+    async def send(message):
+        if message['type'] == 'http.response.start':
+            status.append(message['status'])
+
+    started = time.perf_counter()
+    await app(scope, receive, send)
+    return status[0], time.perf_counter() - started
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the latency of the async views through the ASGI application with their sections "
+        "run one after another (as the synchronous views did) and fanned out concurrently."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--transactions', type=int, default=5000, help="Transactions per user.")
+        parser.add_argument('--users', type=int, default=8, help="Users, each sending one request per round.")
+        parser.add_argument('--rounds', type=int, default=5, help="Rounds per view and mode; caches start cold.")
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--output', default='bench_asgi_results.json')
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError("bench_asgi runs against a throwaway SQLite file database.")
+
+        setup_test_environment()
+        with tempfile.TemporaryDirectory() as directory:
+            # A file rather than the shared in-memory database, which serializes connections.
+            connection.settings_dict['TEST']['NAME'] = os.path.join(directory, 'bench.sqlite3')
+            old_config = setup_databases(verbosity=0, interactive=False)
+            try:
+                seed_price_history(years=3, seed=options['seed'])
+                sessions = []
+                for i in range(options['users']):
+                    client = Client()
+                    client.force_login(seed_user(f'asgi-{i}', transactions=options['transactions'], seed=options['seed'] + i))
+                    sessions.append(client.cookies[settings.SESSION_COOKIE_NAME].value)
+                results = asyncio.run(self.bench(sessions, options['rounds']))
+            finally:
+                connection.close()
+                teardown_databases(old_config, verbosity=0)
+                teardown_test_environment()
+
+        report = {
+            'meta': {
+                'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                'transactions': options['transactions'],
+                'users': options['users'],
+                'rounds': options['rounds'],
+                'seed': options['seed'],
+            },
+            'results': results,
+        }
+        with open(options['output'], 'w') as f:
+            json.dump(report, f, indent=2)
+        self.stdout.write(self.style.SUCCESS(f"Wrote {len(results)} measurements to {options['output']}."))
+
+    async def bench(self, sessions, rounds):
+        app = get_asgi_application()
+        results = []
+        for name in VIEWS:
+            path = reverse(name)
+            await asyncio.gather(*(_get(app, path, session) for session in sessions))  # warm up connections
+            medians = {}
+            for mode, concurrent in MODES.items():
+                latencies, walls = [], []
+                with override_settings(MONEYMAP_CONCURRENT_SECTIONS=concurrent):
+                    for _ in range(rounds):
+                        cache.clear()
+                        started = time.perf_counter()
+                        responses = await asyncio.gather(*(_get(app, path, session) for session in sessions))
+                        walls.append(time.perf_counter() - started)
+                        if any(status != 200 for status, _seconds in responses):
+                            raise CommandError(f"{name} answered {[status for status, _seconds in responses]}")
+                        latencies += [seconds for _status, seconds in responses]
+                latencies.sort()
+                row = {
+                    'view': name,
+                    'mode': mode,
+                    'p50_ms': round(statistics.median(latencies) * 1000, 2),
+                    'p95_ms': round(latencies[int(len(latencies) * 0.95) - 1] * 1000, 2),
+                    'round_ms': round(statistics.median(walls) * 1000, 2),
+                }
+                medians[mode] = row['p50_ms']
+                self.stdout.write(
+                    f"{name:<16} {mode:<11} p50 {row['p50_ms']:>9.2f}ms  p95 {row['p95_ms']:>9.2f}ms  "
+                    f"round of {len(sessions)} {row['round_ms']:>9.2f}ms"
+                )
+                results.append(row)
+            self.stdout.write(f"{name:<16} concurrent/sequential p50: {medians['concurrent'] / medians['sequential']:.2f}x")
+        return results
@@ -0,0 +1,151 @@
+import json
+import multiprocessing
+import os
+import random
+import shutil
+import tempfile
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+
+def _worker(path, profile, seconds, write_ratio, users, seed):
+    """Mix reads and writes against ``path`` for ``seconds``; runs in a fresh process."""
+    import django
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'DjangoMoneyMap.settings')
+    from django.conf import settings as worker_settings
+    worker_settings.DATABASES['default'] = {
+        **worker_settings.DATABASES['default'], 'OPTIONS': {},
+        **worker_settings.MONEYMAP_SQLITE_PROFILES[profile], 'NAME': path,
+    }
+    django.setup()
+    from django.db import OperationalError, connection as db
+    from MoneyMapControl.models import Transaction
+    from MoneyMapControl.services import latest_transactions, transaction_totals
+
+    rng = random.Random(seed)
+    counts = {'reads': 0, 'writes': 0, 'locked': 0, 'errors': 0}
+    latencies = []
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        user_id, category_id = rng.choice(users)
+        write = rng.random() < write_ratio
+        started = time.perf_counter()
+        try:
+            if write:
+                Transaction.objects.create(
+                    user_id=user_id, type='Expense', category_id=category_id, amount=Decimal(rng.randint(1, 500)),
+                    date=date(2025, 1, 1) + timedelta(days=rng.randrange(365)), description='bench',
+                )
+            else:
+                transaction_totals(user_id)
+                latest_transactions(user_id)
+        except OperationalError as exc:
+            counts['locked' if 'locked' in str(exc) else 'errors'] += 1
+            continue
+        finally:
+            # Like a request ending, under the profile's connection settings.
+            db.close_if_unusable_or_obsolete()
+        latencies.append(time.perf_counter() - started)
+        counts['writes' if write else 'reads'] += 1
+    db.close()
+    return counts, latencies
+
+
+class Command(BaseCommand):
+    help = (
+        "Hammer a throwaway copy of the schema from several processes with a read/write mix under "
+        "each SQLite profile, and report throughput, latency and the \"database is locked\" rate."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--profiles', default='stock,production', help="Comma-separated MONEYMAP_SQLITE_PROFILES.")
+        parser.add_argument('--processes', type=int, default=8)
+        parser.add_argument('--seconds', type=float, default=10.0, help="Run time per profile.")
+        parser.add_argument('--write-ratio', type=float, default=0.3, help="Share of operations that write.")
+        parser.add_argument('--users', type=int, default=4)
+        parser.add_argument('--transactions', type=int, default=2000, help="Seeded transactions per user.")
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--output', default='bench_sqlite_results.json')
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError("bench_sqlite benchmarks the SQLite profiles only.")
+        profiles = options['profiles'].split(',')
+        unknown = set(profiles) - set(settings.MONEYMAP_SQLITE_PROFILES)
+        if unknown:
+            raise CommandError(f"Unknown profile(s): {', '.join(sorted(unknown))}.")
+
+        results = []
+        with tempfile.TemporaryDirectory() as directory:
+            template = os.path.join(directory, 'template.sqlite3')
+            users = self.build(template, options)
+            for profile in profiles:
+                path = os.path.join(directory, f'{profile}.sqlite3')
+                shutil.copyfile(template, path)
+                results.append(self.run(path, profile, users, options))
+
+        report = {
+            'meta': {
+                'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                'processes': options['processes'],
+                'seconds': options['seconds'],
+                'write_ratio': options['write_ratio'],
+                'users': options['users'],
+                'transactions': options['transactions'],
+                'seed': options['seed'],
+            },
+            'results': results,
+        }
+        with open(options['output'], 'w') as f:
+            json.dump(report, f, indent=2)
+        self.stdout.write(self.style.SUCCESS(f"Wrote {len(results)} measurements to {options['output']}."))
+
+    def build(self, path, options):
+        """Migrate and seed ``path`` with plain SQLite settings; returns ``[(user_id, category_id)]``."""
+        from MoneyMapControl.models import Category
+        from MoneyMapControl.synthetic import seed_user
+
+        original = dict(connection.settings_dict)
+        connection.close()
+        connection.settings_dict.update(NAME=path, OPTIONS={}, CONN_MAX_AGE=0)
+        try:
+            call_command('migrate', verbosity=0)
+            users = []
+            for i in range(options['users']):
+                user = seed_user(f'contention-{i}', transactions=options['transactions'], seed=options['seed'] + i)
+                users += [(user.id, pk) for pk in Category.objects.filter(user=user, type='Expense').values_list('pk', flat=True)]
+        finally:
+            connection.close()
+            connection.settings_dict.clear()
+            connection.settings_dict.update(original)
+        return users
+
+    def run(self, path, profile, users, options):
+        context = multiprocessing.get_context('spawn')
+        with context.Pool(options['processes']) as pool:
+            outcomes = pool.starmap(_worker, [
+                (path, profile, options['seconds'], options['write_ratio'], users, options['seed'] * 1000 + i)
+                for i in range(options['processes'])
+            ])
+
+        counts = {name: sum(c[name] for c, _latencies in outcomes) for name in ('reads', 'writes', 'locked', 'errors')}
+        latencies = sorted(seconds for _counts, values in outcomes for seconds in values)
+        attempts = sum(counts.values())
+        row = {
+            'profile': profile,
+            **counts,
+            'ops_per_second': round((counts['reads'] + counts['writes']) / options['seconds'], 1),
+            'lock_error_rate': round(counts['locked'] / attempts, 4) if attempts else 0.0,
+            'p50_ms': round(latencies[len(latencies) // 2] * 1000, 2) if latencies else None,
+            'p99_ms': round(latencies[int(len(latencies) * 0.99)] * 1000, 2) if latencies else None,
+        }
+        self.stdout.write(
+            f"{profile:<12} {row['ops_per_second']:>9.1f} ops/s  reads {counts['reads']:>7}  writes {counts['writes']:>6}  "
+            f"locked {counts['locked']:>5} ({row['lock_error_rate']:.2%})  p50 {row['p50_ms']}ms  p99 {row['p99_ms']}ms"
+        )
+        return row
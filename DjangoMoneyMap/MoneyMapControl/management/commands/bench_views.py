@@ -0,0 +1,128 @@
+import json
+import platform
+import statistics
+import time
+import tracemalloc
+import django
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import setup_databases, setup_test_environment, teardown_databases, teardown_test_environment
+from django.urls import reverse
+from MoneyMapControl import metrics
+from MoneyMapControl.synthetic import seed_price_history, seed_user
+
+VIEWS = [
+    'dashboard', 'dashboard_data', 'transactions', 'budget', 'goals', 'investments', 'investment_history', 'reports',
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark the main views through the test client at several data sizes, in a throwaway "
+        "test database, and write wall time, query count and peak memory to JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', default='100,1000,10000', help="Comma-separated transactions per user.")
+        parser.add_argument('--repeat', type=int, default=5, help="Warm requests per view; the median is reported.")
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--output', default='bench_results.json')
+        parser.add_argument('--compare', help="Earlier results file to print a comparison against.")
+
+    def handle(self, *args, **options):
+        try:
+            sizes = [int(size) for size in options['sizes'].split(',')]
+        except ValueError:
+            raise CommandError("--sizes must be comma-separated integers.")
+
+        metrics.reset()
+        setup_test_environment()
+        old_config = setup_databases(verbosity=0, interactive=False)
+        try:
+            seed_price_history(years=3, seed=options['seed'])
+            results = [row for size in sizes for row in self.bench_size(size, options)]
+        finally:
+            teardown_databases(old_config, verbosity=0)
+            teardown_test_environment()
+
+        report = {
+            'meta': {
+                'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'database': connection.vendor,
+                'repeat': options['repeat'],
+                'seed': options['seed'],
+                'instrumentation_us_per_request': metrics.overhead(),
+            },
+            'results': results,
+        }
+        with open(options['output'], 'w') as f:
+            json.dump(report, f, indent=2)
+        self.stdout.write(f"Instrumentation overhead: {metrics.overhead()}us per request.")
+        self.stdout.write(self.style.SUCCESS(f"Wrote {len(results)} measurements to {options['output']}."))
+
+        if options['compare']:
+            with open(options['compare']) as f:
+                self.compare(json.load(f)['results'], results)
+
+    def bench_size(self, size, options):
+        user = seed_user(f'bench-{size}', transactions=size, budgets=10, goals=5, investments=8, seed=options['seed'])
+        client = Client()
+        client.force_login(user)
+        for name in VIEWS:
+            url = reverse(name)
+
+            cache.clear()
+            # The middleware's counts include the queries async views run on worker threads.
+            _requests, queries_before, db_before = metrics.totals(name)
+            started = time.perf_counter()
+            response = client.get(url)
+            cold = time.perf_counter() - started
+            _requests, queries_after, db_after = metrics.totals(name)
+            if response.status_code != 200:
+                raise CommandError(f"{name} returned {response.status_code}")
+
+            warm = []
+            for _ in range(options['repeat']):
+                started = time.perf_counter()
+                client.get(url)
+                warm.append(time.perf_counter() - started)
+
+            cache.clear()
+            tracemalloc.start()
+            client.get(url)
+            _current, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+            row = {
+                'size': size,
+                'view': name,
+                'cold_ms': round(cold * 1000, 2),
+                'warm_ms': round(statistics.median(warm) * 1000, 2),
+                'queries': queries_after - queries_before,
+                'db_ms': round((db_after - db_before) * 1000, 2),
+                'peak_kb': round(peak / 1024, 1),
+                'bytes': len(response.content),
+            }
+            self.stdout.write(
+                f"{size:>8} {name:<16} cold {row['cold_ms']:>9.2f}ms  warm {row['warm_ms']:>9.2f}ms  "
+                f"{row['queries']:>3} queries  peak {row['peak_kb']:>9.1f}KB"
+            )
+            yield row
+
+    def compare(self, before, after):
+        previous = {(row['size'], row['view']): row for row in before}
+        self.stdout.write("\nsize     view             cold ratio  warm ratio  queries")
+        for row in after:
+            old = previous.get((row['size'], row['view']))
+            if old is None:
+                continue
+            cold = row['cold_ms'] / old['cold_ms'] if old['cold_ms'] else float('nan')
+            warm = row['warm_ms'] / old['warm_ms'] if old['warm_ms'] else float('nan')
+            self.stdout.write(
+                f"{row['size']:>8} {row['view']:<16} {cold:>10.2f}x {warm:>10.2f}x  "
+                f"{old['queries']} -> {row['queries']}"
+            )
@@ -0,0 +1,30 @@
+import csv
+from datetime import date
+from decimal import Decimal, InvalidOperation
+from django.core.management.base import BaseCommand, CommandError
+from MoneyMapControl.pricehistory import store_points
+
+
+class Command(BaseCommand):
+    help = "Load daily closing prices from a CSV of date,instrument,price rows into the price history."
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+
+    def handle(self, *args, **options):
+        points = []
+        try:
+            with open(options['path'], newline='', encoding='utf-8') as f:
+                for line, row in enumerate(csv.reader(f), start=1):
+                    if not row or (line == 1 and row[0].strip().lower() == 'date'):
+                        continue
+                    try:
+                        day, name, price = row[0].strip(), row[1].strip(), Decimal(row[2].strip())
+                        points.append((name, date.fromisoformat(day), price))
+                    except (IndexError, ValueError, InvalidOperation):
+                        raise CommandError(f"Line {line}: expected date,instrument,price.")
+        except OSError as e:
+            raise CommandError(str(e))
+
+        rows = store_points(points)
+        self.stdout.write(self.style.SUCCESS(f"Stored {len(points)} price(s) in {rows} instrument-year row(s)."))
@@ -0,0 +1,30 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from MoneyMapControl.importers import BATCH_SIZE, PARSERS, detect_format, import_transactions
+
+
+class Command(BaseCommand):
+    help = "Stream-import a CSV or OFX bank statement into a user's transactions."
+
+    def add_arguments(self, parser):
+        parser.add_argument('username')
+        parser.add_argument('path')
+        parser.add_argument('--format', choices=sorted(PARSERS), help="Defaults to the file extension, else csv.")
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        try:
+            user = get_user_model().objects.get(username=options['username'])
+        except get_user_model().DoesNotExist:
+            raise CommandError(f"User {options['username']!r} does not exist.")
+
+        parse = PARSERS[options['format'] or detect_format(options['path'])]
+        with open(options['path'], encoding='utf-8-sig', errors='replace', newline='') as stream:
+            report = import_transactions(user, parse(stream), batch_size=options['batch_size'])
+
+        for error in report.errors:
+            self.stderr.write(f"line {error['line']}: {error['errors']}")
+        self.stdout.write(self.style.SUCCESS(
+            f"{report.created} created, {report.duplicates} duplicates, {report.error_count} errors "
+            f"out of {report.rows} rows in {report.elapsed:.2f}s ({report.rows_per_second:.0f} rows/s)."
+        ))
@@ -0,0 +1,24 @@
+import time
+from datetime import date
+from django.core.management.base import BaseCommand, CommandError
+from MoneyMapControl.recurring import BATCH_SIZE, materialize
+
+
+class Command(BaseCommand):
+    help = "Create the transactions of all due recurring rules, for every user, in batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--today', help="Materialize up to this date (YYYY-MM-DD) instead of today.")
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE, help="Rules per transaction.")
+
+    def handle(self, *args, **options):
+        try:
+            today = date.fromisoformat(options['today']) if options['today'] else None
+        except ValueError:
+            raise CommandError("--today must be YYYY-MM-DD.")
+
+        started = time.perf_counter()
+        rules, created = materialize(today=today, batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Processed {rules} rule(s), created {created} transaction(s) in {time.perf_counter() - started:.2f}s."
+        ))
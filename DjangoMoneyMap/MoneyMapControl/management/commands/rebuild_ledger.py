@@ -0,0 +1,33 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from MoneyMapControl import ledger
+
+
+class Command(BaseCommand):
+    help = "Rebuild or verify the ledger summaries and monthly rollups from raw transactions."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--verify', action='store_true', help="Only report drift; exit with an error if any is found.")
+        parser.add_argument('--user', action='append', dest='usernames', help="Limit to this username (repeatable).")
+
+    def handle(self, *args, **options):
+        user_ids = None
+        if options['usernames']:
+            users = get_user_model().objects.filter(username__in=options['usernames'])
+            user_ids = list(users.values_list('id', flat=True))
+            if len(user_ids) != len(set(options['usernames'])):
+                raise CommandError("Unknown username in --user.")
+
+        if options['verify']:
+            drift = ledger.verify(user_ids)
+            for line in drift:
+                self.stdout.write(line)
+            if drift:
+                raise CommandError(f"{len(drift)} summary row(s) drifted; run rebuild_ledger to fix.")
+            self.stdout.write(self.style.SUCCESS("Ledger summaries match transactions."))
+            return
+
+        ledgers, categories, months = ledger.rebuild(user_ids)
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt {ledgers} ledger, {categories} category and {months} monthly summaries."
+        ))
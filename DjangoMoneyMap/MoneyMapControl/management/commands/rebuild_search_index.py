@@ -0,0 +1,23 @@
+import time
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.transaction import atomic
+from django.db.utils import OperationalError
+from MoneyMapControl import search
+
+
+class Command(BaseCommand):
+    help = "Recreate the SQLite full-text index over transaction descriptions and categories."
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError("Full-text search needs SQLite; other databases use the icontains fallback.")
+        started = time.perf_counter()
+        try:
+            with atomic():
+                rows = search.rebuild()
+        except OperationalError as e:
+            raise CommandError(f"Could not build the index (is FTS5 available?): {e}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Indexed {rows} transaction(s) in {time.perf_counter() - started:.2f}s."
+        ))
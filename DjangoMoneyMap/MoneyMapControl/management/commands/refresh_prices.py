@@ -0,0 +1,32 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from MoneyMapControl.prices import BATCH_SIZE, load_prices, refresh_prices
+
+
+class Command(BaseCommand):
+    help = "Update current prices of investments from a name,price CSV or a JSON {name: price} feed."
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--user', help="Only update this username's holdings.")
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        user = None
+        if options['user']:
+            try:
+                user = get_user_model().objects.get(username=options['user'])
+            except get_user_model().DoesNotExist:
+                raise CommandError(f"No user named {options['user']!r}.")
+        try:
+            prices = load_prices(options['path'])
+        except (OSError, ValueError) as e:
+            raise CommandError(str(e))
+
+        report = refresh_prices(prices, user=user, batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Updated {report['updated']} holding(s) across {report['users']} user(s) "
+            f"from {report['instruments']} price(s)."
+        ))
+        if report['unknown']:
+            self.stdout.write(f"Not held by anyone: {', '.join(report['unknown'])}")
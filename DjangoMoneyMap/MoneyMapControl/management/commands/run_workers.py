@@ -0,0 +1,58 @@
+import multiprocessing
+import threading
+import time
+from datetime import timedelta
+from django.core.management.base import BaseCommand, CommandError
+
+
+def _process_main(threads, burst, poll):
+    # Runs in a spawned child, which has to set Django up before touching models.
+    import django
+    django.setup()
+    from MoneyMapControl import jobs
+    return jobs.work_threads(threads, threading.Event(), burst, poll)
+
+
+class Command(BaseCommand):
+    help = "Run queued background jobs on a pool of worker threads, optionally in several processes."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=2, help="Worker threads per process.")
+        parser.add_argument('--processes', type=int, default=1, help="Worker processes; more than one spawns children.")
+        parser.add_argument('--burst', action='store_true', help="Exit once the queue is empty instead of polling.")
+        parser.add_argument('--poll', type=float, default=1.0, help="Seconds between polls of an empty queue.")
+        parser.add_argument('--stale-after', type=int, default=3600,
+                            help="Requeue jobs that have been running this many seconds at start-up.")
+        parser.add_argument('--keep-days', type=int, default=7, help="Delete finished jobs older than this at start-up.")
+
+    def handle(self, *args, **options):
+        from MoneyMapControl import jobs
+
+        if options['threads'] < 1 or options['processes'] < 1:
+            raise CommandError("--threads and --processes must be at least 1.")
+
+        requeued = jobs.requeue_stale(timedelta(seconds=options['stale_after']))
+        purged = jobs.purge(timedelta(days=options['keep_days']))
+        if requeued or purged:
+            self.stdout.write(f"Requeued {requeued} stale job(s), purged {purged} old one(s).")
+
+        started = time.perf_counter()
+        if options['processes'] == 1:
+            done = jobs.work_threads(options['threads'], threading.Event(), options['burst'], options['poll'])
+        else:
+            context = multiprocessing.get_context('spawn')
+            with context.Pool(options['processes']) as pool:
+                try:
+                    done = sum(pool.starmap(
+                        _process_main, [(options['threads'], options['burst'], options['poll'])] * options['processes'],
+                    ))
+                except KeyboardInterrupt:
+                    pool.terminate()
+                    raise
+
+        self.stdout.write(self.style.SUCCESS(f"Ran {done} job(s) in {time.perf_counter() - started:.2f}s."))
+        for name, entry in jobs.stats().items():
+            self.stdout.write(
+                f"{name:<24} done {entry['done']:>6}  failed {entry['failed']:>4}  queued {entry['queued']:>4}  "
+                f"avg {entry['avg_seconds'] * 1000:>9.2f}ms  max {entry['max_seconds'] * 1000:>9.2f}ms"
+            )
@@ -0,0 +1,203 @@
+import threading
+from bisect import bisect_left
+from contextvars import ContextVar
+from time import perf_counter
+from django.template import TemplateDoesNotExist
+from django.template.backends.django import DjangoTemplates, Template, reraise
+
+# Upper bounds (seconds) of the request latency histogram buckets.
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Stats of the request being handled in this thread/task, set by PerformanceMiddleware.
+current = ContextVar('moneymap_request_stats', default=None)
+
+_lock = threading.Lock()
+_views = {}
+_requests = {}
+_overhead = {'seconds': 0.0, 'requests': 0}
+
+
+class RequestStats:
+    """Per-request counters; called by ``count_queries`` for every query the request runs."""
+
+    __slots__ = ('queries', 'db_seconds', 'template_seconds', 'sql')
+
+    def __init__(self, capture_sql=False):
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.template_seconds = 0.0
+        self.sql = [] if capture_sql else None
+
+    def __call__(self, execute, sql, params, many, context):
+        started = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = perf_counter() - started
+            self.queries += 1
+            self.db_seconds += elapsed
+            if self.sql is not None:
+                self.sql.append((elapsed, sql))
+
+    def merge(self, other):
+        """Add the counters of ``other``, e.g. queries run on another thread for this request."""
+        self.queries += other.queries
+        self.db_seconds += other.db_seconds
+        self.template_seconds += other.template_seconds
+        if self.sql is not None and other.sql:
+            self.sql.extend(other.sql)
+
+
+def count_queries(execute, sql, params, many, context):
+    """``execute_wrapper`` on every connection that adds the query to the current request's stats.
+
+    The stats travel in a context variable, so queries are counted on
+    whichever thread runs them, including the worker threads ASGI uses
+    for sync views, sessions and auth.
+    """
+    stats = current.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    return stats(execute, sql, params, many, context)
+
+
+def install_query_counter(connection, **kwargs):
+    """``connection_created`` receiver that adds ``count_queries`` to the new connection."""
+    if count_queries not in connection.execute_wrappers:
+        connection.execute_wrappers.append(count_queries)
+
+
+class _ViewStats:
+    __slots__ = ('buckets', 'count', 'seconds', 'queries', 'db_seconds', 'template_seconds', 'response_bytes')
+
+    def __init__(self):
+        self.buckets = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.seconds = 0.0
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.template_seconds = 0.0
+        self.response_bytes = 0
+
+
+def observe(view, method, status, seconds, stats, response_bytes):
+    with _lock:
+        entry = _views.get(view)
+        if entry is None:
+            entry = _views[view] = _ViewStats()
+        entry.buckets[bisect_left(BUCKETS, seconds)] += 1
+        entry.count += 1
+        entry.seconds += seconds
+        entry.queries += stats.queries
+        entry.db_seconds += stats.db_seconds
+        entry.template_seconds += stats.template_seconds
+        entry.response_bytes += response_bytes
+        key = (view, method, status)
+        _requests[key] = _requests.get(key, 0) + 1
+
+
+def totals(view):
+    """``(requests, queries, db_seconds)`` recorded for ``view`` so far."""
+    with _lock:
+        entry = _views.get(view)
+        return (entry.count, entry.queries, entry.db_seconds) if entry else (0, 0, 0.0)
+
+
+def record_overhead(seconds):
+    with _lock:
+        _overhead['seconds'] += seconds
+        _overhead['requests'] += 1
+
+
+def overhead():
+    """Average time the middleware itself added per request, in microseconds."""
+    with _lock:
+        seconds, requests = _overhead['seconds'], _overhead['requests']
+    return round(seconds / requests * 1e6, 1) if requests else 0.0
+
+
+def reset():
+    with _lock:
+        _views.clear()
+        _requests.clear()
+        _overhead.update(seconds=0.0, requests=0)
+
+
+def _label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def render():
+    """All metrics of this process in the Prometheus text exposition format."""
+    with _lock:
+        views = {name: (list(s.buckets), s.count, s.seconds, s.queries, s.db_seconds, s.template_seconds, s.response_bytes)
+                 for name, s in _views.items()}
+        requests = dict(_requests)
+        overhead = dict(_overhead)
+
+    lines = [
+        '# HELP moneymap_request_duration_seconds Request latency by URL name.',
+        '# TYPE moneymap_request_duration_seconds histogram',
+    ]
+    for name, (buckets, count, seconds, *_rest) in sorted(views.items()):
+        view = _label(name)
+        cumulative = 0
+        for bound, hits in zip(BUCKETS, buckets):
+            cumulative += hits
+            lines.append(f'moneymap_request_duration_seconds_bucket{{view="{view}",le="{bound}"}} {cumulative}')
+        lines.append(f'moneymap_request_duration_seconds_bucket{{view="{view}",le="+Inf"}} {count}')
+        lines.append(f'moneymap_request_duration_seconds_sum{{view="{view}"}} {seconds:.6f}')
+        lines.append(f'moneymap_request_duration_seconds_count{{view="{view}"}} {count}')
+
+    lines += [
+        '# HELP moneymap_requests_total Requests by URL name, method and status code.',
+        '# TYPE moneymap_requests_total counter',
+    ]
+    for (view, method, status), count in sorted(requests.items()):
+        lines.append(f'moneymap_requests_total{{view="{_label(view)}",method="{_label(method)}",status="{status}"}} {count}')
+
+    counters = [
+        ('moneymap_db_queries_total', 'Database queries executed by URL name.', 3, '{}'),
+        ('moneymap_db_query_seconds_total', 'Time spent executing database queries by URL name.', 4, '{:.6f}'),
+        ('moneymap_template_render_seconds_total', 'Time spent rendering templates by URL name.', 5, '{:.6f}'),
+        ('moneymap_response_bytes_total', 'Size of non-streaming response bodies by URL name.', 6, '{}'),
+    ]
+    for metric, help_text, index, fmt in counters:
+        lines += [f'# HELP {metric} {help_text}', f'# TYPE {metric} counter']
+        for name, values in sorted(views.items()):
+            lines.append(f'{metric}{{view="{_label(name)}"}} {fmt.format(values[index])}')
+
+    lines += [
+        '# HELP moneymap_instrumentation_seconds_total Time spent by the instrumentation itself.',
+        '# TYPE moneymap_instrumentation_seconds_total counter',
+        f"moneymap_instrumentation_seconds_total {overhead['seconds']:.6f}",
+        '# HELP moneymap_instrumented_requests_total Requests seen by the instrumentation.',
+        '# TYPE moneymap_instrumented_requests_total counter',
+        f"moneymap_instrumented_requests_total {overhead['requests']}",
+    ]
+    return '\n'.join(lines) + '\n'
+
+
+class TimedTemplate(Template):
+    def render(self, context=None, request=None):
+        stats = current.get()
+        if stats is None:
+            return super().render(context, request)
+        started = perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            stats.template_seconds += perf_counter() - started
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    """DjangoTemplates backend that adds render time to the current request's stats."""
+
+    def from_string(self, template_code):
+        return TimedTemplate(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        try:
+            return TimedTemplate(self.engine.get_template(template_name), self)
+        except TemplateDoesNotExist as exc:
+            reraise(exc, self)
@@ -0,0 +1,114 @@
+import logging
+from time import perf_counter
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from whitenoise.middleware import WhiteNoiseMiddleware
+from . import metrics
+
+logger = logging.getLogger('MoneyMapControl.performance')
+
+SLOW_SQL_LIMIT = 50
+
+
+class PerformanceMiddleware:
+    """Record latency, SQL, template and response-size metrics per URL name.
+
+    Requests slower than ``MONEYMAP_SLOW_REQUEST_MS`` are logged together with
+    their SQL. Streaming responses are timed until their iterator is returned.
+    Queries are counted by ``metrics.count_queries`` on whichever thread runs
+    them, so sync views served under ASGI are measured too.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.slow_ms = getattr(settings, 'MONEYMAP_SLOW_REQUEST_MS', None)
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        started = perf_counter()
+        stats = metrics.RequestStats(capture_sql=self.slow_ms is not None)
+        token = metrics.current.set(stats)
+        try:
+            inner_started = perf_counter()
+            response = self.get_response(request)
+            inner = perf_counter() - inner_started
+        finally:
+            metrics.current.reset(token)
+        return self.finish(request, response, stats, started, inner)
+
+    async def __acall__(self, request):
+        started = perf_counter()
+        stats = metrics.RequestStats(capture_sql=self.slow_ms is not None)
+        token = metrics.current.set(stats)
+        try:
+            inner_started = perf_counter()
+            response = await self.get_response(request)
+            inner = perf_counter() - inner_started
+        finally:
+            metrics.current.reset(token)
+        return self.finish(request, response, stats, started, inner)
+
+    def finish(self, request, response, stats, started, inner):
+        elapsed = perf_counter() - started
+        match = request.resolver_match
+        view = match.view_name if match else '<unmatched>'
+        size = 0 if response.streaming else len(response.content)
+        metrics.observe(view, request.method, response.status_code, elapsed, stats, size)
+        if self.slow_ms is not None and elapsed * 1000 >= self.slow_ms:
+            self.log_slow(request, view, elapsed, stats)
+        metrics.record_overhead(perf_counter() - started - inner)
+        return response
+
+    def log_slow(self, request, view, elapsed, stats):
+        lines = [
+            f"{seconds * 1000:8.2f}ms  {sql}"
+            for seconds, sql in stats.sql[:SLOW_SQL_LIMIT]
+        ]
+        if len(stats.sql) > SLOW_SQL_LIMIT:
+            lines.append(f"... {len(stats.sql) - SLOW_SQL_LIMIT} more")
+        logger.warning(
+            "Slow request %s %s (%s): %.1fms, %d queries in %.1fms, templates %.1fms\n%s",
+            request.method, request.get_full_path(), view, elapsed * 1000,
+            stats.queries, stats.db_seconds * 1000, stats.template_seconds * 1000, '\n'.join(lines),
+        )
+
+
+class StaticFilesMiddleware(WhiteNoiseMiddleware):
+    """``WhiteNoiseMiddleware`` that can also sit in an async middleware chain.
+
+    Plain WhiteNoise is sync-only, which makes Django hand every ASGI request
+    to a thread for the whole of its lifetime. Finding a static file is a dict
+    lookup, so it is done inline and other requests are simply awaited. The
+    async path mirrors ``WhiteNoiseMiddleware.__call__`` and uses its
+    internals, which is why requirements.txt pins whitenoise.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response=None, settings=settings):
+        super().__init__(get_response, settings)
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        return super().__call__(request)
+
+    async def __acall__(self, request):
+        if self.autorefresh:
+            static_file = self.find_file(request.path_info)
+        else:
+            static_file = self.files.get(request.path_info)
+        if static_file is not None:
+            return self.serve(static_file, request)
+        return await self.get_response(request)
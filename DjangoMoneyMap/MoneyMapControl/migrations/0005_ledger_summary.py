@@ -0,0 +1,71 @@
+# Generated by Django 5.2.18 on 2026-10-17 19:01
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from collections import defaultdict
+from decimal import Decimal
+from django.db import migrations, models
+
+
+def backfill_summaries(apps, schema_editor):
+    Transaction = apps.get_model('MoneyMapControl', 'Transaction')
+    LedgerSummary = apps.get_model('MoneyMapControl', 'LedgerSummary')
+    CategorySummary = apps.get_model('MoneyMapControl', 'CategorySummary')
+
+    categories = defaultdict(lambda: [Decimal('0'), 0])
+    ledgers = defaultdict(lambda: [Decimal('0'), Decimal('0'), 0])
+    for t in Transaction.objects.only('user_id', 'type', 'category', 'amount').iterator():
+        type_ = (t.type or '').strip().capitalize()
+        categories[(t.user_id, type_, t.category)][0] += t.amount
+        categories[(t.user_id, type_, t.category)][1] += 1
+        if type_ == 'Income':
+            ledgers[t.user_id][0] += t.amount
+        elif type_ == 'Expense':
+            ledgers[t.user_id][1] += t.amount
+        ledgers[t.user_id][2] += 1
+
+    CategorySummary.objects.bulk_create([
+        CategorySummary(user_id=user_id, type=type_, category=category, total=total, count=count)
+        for (user_id, type_, category), (total, count) in categories.items()
+    ], batch_size=1000)
+    LedgerSummary.objects.bulk_create([
+        LedgerSummary(user_id=user_id, total_income=income, total_expense=expense, transaction_count=count)
+        for user_id, (income, expense, count) in ledgers.items()
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('MoneyMapControl', '0004_blog'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LedgerSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('total_income', models.DecimalField(decimal_places=2, default=0, max_digits=20)),
+                ('total_expense', models.DecimalField(decimal_places=2, default=0, max_digits=20)),
+                ('transaction_count', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='ledger_summary', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='CategorySummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('type', models.CharField(choices=[('Income', 'Income'), ('Expense', 'Expense')], max_length=10)),
+                ('category', models.CharField(max_length=100)),
+                ('total', models.DecimalField(decimal_places=2, default=0, max_digits=20)),
+                ('count', models.IntegerField(default=0)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='category_summaries', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('user', 'category', 'type'), name='unique_category_summary')],
+            },
+        ),
+        migrations.RunPython(backfill_summaries, migrations.RunPython.noop),
+    ]
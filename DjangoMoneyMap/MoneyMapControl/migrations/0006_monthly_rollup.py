@@ -0,0 +1,50 @@
+# Generated by Django 5.2.18 on 2026-10-17 19:02
+
+import django.db.models.deletion
+from django.conf import settings
+from collections import defaultdict
+from decimal import Decimal
+from django.db import migrations, models
+
+
+def backfill_rollups(apps, schema_editor):
+    Transaction = apps.get_model('MoneyMapControl', 'Transaction')
+    MonthlyRollup = apps.get_model('MoneyMapControl', 'MonthlyRollup')
+
+    rollups = defaultdict(lambda: [Decimal('0'), 0])
+    for t in Transaction.objects.only('user_id', 'type', 'category', 'amount', 'date').iterator():
+        key = (t.user_id, (t.type or '').strip().capitalize(), t.category, t.date.replace(day=1))
+        rollups[key][0] += t.amount
+        rollups[key][1] += 1
+
+    MonthlyRollup.objects.bulk_create([
+        MonthlyRollup(user_id=user_id, type=type_, category=category, month=month, total=total, count=count)
+        for (user_id, type_, category, month), (total, count) in rollups.items()
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('MoneyMapControl', '0005_ledger_summary'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MonthlyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField(help_text='First day of the month')),
+                ('type', models.CharField(choices=[('Income', 'Income'), ('Expense', 'Expense')], max_length=10)),
+                ('category', models.CharField(max_length=100)),
+                ('total', models.DecimalField(decimal_places=2, default=0, max_digits=20)),
+                ('count', models.IntegerField(default=0)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='monthly_rollups', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['month'],
+                'constraints': [models.UniqueConstraint(fields=('user', 'month', 'type', 'category'), name='unique_monthly_rollup')],
+            },
+        ),
+        migrations.RunPython(backfill_rollups, migrations.RunPython.noop),
+    ]
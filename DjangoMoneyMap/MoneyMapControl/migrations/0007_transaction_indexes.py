@@ -0,0 +1,38 @@
+# Generated by Django 5.2.18 on 2026-10-17 19:03
+
+from django.db import migrations, models
+
+
+def normalize_types(apps, schema_editor):
+    Transaction = apps.get_model('MoneyMapControl', 'Transaction')
+    for value in Transaction.objects.values_list('type', flat=True).distinct():
+        normalized = (value or '').strip().capitalize()
+        if normalized != value:
+            Transaction.objects.filter(type=value).update(type=normalized)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('MoneyMapControl', '0006_monthly_rollup'),
+    ]
+
+    operations = [
+        migrations.RunPython(normalize_types, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='blog',
+            index=models.Index(fields=['-published_date'], name='blog_published_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['user', 'date', 'id'], name='txn_user_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['user', 'type', 'date'], name='txn_user_type_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['user', 'category', 'date'], name='txn_user_category_date_idx'),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-17 19:13
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def stamp_existing_users(apps, schema_editor):
+    apps.get_model('MoneyMapControl', 'CustomUser').objects.update(data_modified=timezone.now())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('MoneyMapControl', '0007_transaction_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customuser',
+            name='data_modified',
+            field=models.DateTimeField(blank=True, help_text="Last write to this user's financial data", null=True),
+        ),
+        migrations.RunPython(stamp_existing_users, migrations.RunPython.noop),
+    ]
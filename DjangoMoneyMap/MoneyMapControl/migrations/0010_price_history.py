@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-17 19:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('MoneyMapControl', '0009_investment_name_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PriceHistory',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('instrument', models.CharField(max_length=150)),
+                ('year', models.PositiveSmallIntegerField()),
+                ('prices', models.BinaryField()),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ['instrument', 'year'],
+                'constraints': [models.UniqueConstraint(fields=('instrument', 'year'), name='unique_price_history')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 19:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('MoneyMapControl', '0010_price_history'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='goal',
+            name='target_date',
+            field=models.DateField(blank=True, null=True),
+        ),
+    ]
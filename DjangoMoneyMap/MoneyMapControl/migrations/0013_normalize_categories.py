@@ -0,0 +1,252 @@
+# Generated by Django 5.2.18 on 2026-10-17 20:10
+
+import django.db.models.deletion
+from collections import defaultdict
+from decimal import Decimal
+from django.conf import settings
+from django.db import migrations, models
+
+
+def _clean(name):
+    return ' '.join(str(name or '').split())[:100] or 'Uncategorized'
+
+
+def _type(value):
+    return (value or '').strip().capitalize()
+
+
+def intern_categories(apps, schema_editor):
+    """Turn free-text categories into per-user ``Category`` rows and rebuild the summaries on them."""
+    Category = apps.get_model('MoneyMapControl', 'Category')
+    Transaction = apps.get_model('MoneyMapControl', 'Transaction')
+    Budget = apps.get_model('MoneyMapControl', 'Budget')
+    RecurringRule = apps.get_model('MoneyMapControl', 'RecurringRule')
+    CategorySummary = apps.get_model('MoneyMapControl', 'CategorySummary')
+    MonthlyRollup = apps.get_model('MoneyMapControl', 'MonthlyRollup')
+
+    for category in Category.objects.all():
+        category.name = _clean(category.name)
+        category.key = category.name.casefold()
+        category.type = _type(category.type)
+        category.save(update_fields=['name', 'key', 'type'])
+
+    sources = [
+        (Transaction, Transaction.objects.values_list('user_id', 'type', 'category').distinct()),
+        (RecurringRule, RecurringRule.objects.values_list('user_id', 'type', 'category').distinct()),
+        (Budget, ((user_id, 'Expense', name) for user_id, name in Budget.objects.values_list('user_id', 'category').distinct())),
+    ]
+    found = {}
+    raw = []
+    for model, rows in sources:
+        for user_id, type_, name in rows:
+            key = (user_id, _type(type_), _clean(name).casefold())
+            found.setdefault(key, _clean(name))
+            raw.append((model, user_id, type_, name, key))
+
+    created = Category.objects.bulk_create(
+        [Category(user_id=user_id, type=type_, key=key, name=found[user_id, type_, key]) for user_id, type_, key in found],
+        batch_size=1000,
+    )
+    ids = {(c.user_id, c.type, c.key): c.pk for c in created}
+    for model, user_id, type_, name, key in raw:
+        rows = model.objects.filter(user_id=user_id, category=name)
+        if model is not Budget:
+            rows = rows.filter(type=type_)
+        rows.update(category_ref_id=ids[key])
+
+    CategorySummary.objects.all().delete()
+    MonthlyRollup.objects.all().delete()
+    months = defaultdict(lambda: [Decimal('0'), 0])
+    for user_id, type_, category_id, day, amount in (
+        Transaction.objects.values_list('user_id', 'type', 'category_ref_id', 'date', 'amount').iterator()
+    ):
+        entry = months[(user_id, _type(type_), category_id, day.replace(day=1))]
+        entry[0] += amount
+        entry[1] += 1
+    totals = defaultdict(lambda: [Decimal('0'), 0])
+    for (user_id, type_, category_id, _month), (total, count) in months.items():
+        totals[(user_id, type_, category_id)][0] += total
+        totals[(user_id, type_, category_id)][1] += count
+
+    MonthlyRollup.objects.bulk_create([
+        MonthlyRollup(user_id=user_id, type=type_, category_id=category_id, month=month, total=total, count=count)
+        for (user_id, type_, category_id, month), (total, count) in months.items()
+    ], batch_size=1000)
+    CategorySummary.objects.bulk_create([
+        CategorySummary(user_id=user_id, type=type_, category_id=category_id, total=total, count=count)
+        for (user_id, type_, category_id), (total, count) in totals.items()
+    ], batch_size=1000)
+
+
+def restore_names(apps, schema_editor):
+    """Copy category names back into the text columns; run ``rebuild_ledger`` afterwards."""
+    Category = apps.get_model('MoneyMapControl', 'Category')
+    names = dict(Category.objects.values_list('pk', 'name'))
+    for model_name in ('Transaction', 'Budget', 'RecurringRule'):
+        model = apps.get_model('MoneyMapControl', model_name)
+        for pk, name in names.items():
+            model.objects.filter(category_ref_id=pk).update(category=name)
+        model.objects.update(category_ref=None)
+    apps.get_model('MoneyMapControl', 'CategorySummary').objects.all().delete()
+    apps.get_model('MoneyMapControl', 'MonthlyRollup').objects.all().delete()
+    Category.objects.exclude(user=None).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('MoneyMapControl', '0012_recurring_rules'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='category',
+            options={'verbose_name_plural': 'categories'},
+        ),
+        migrations.AlterField(
+            model_name='category',
+            name='name',
+            field=models.CharField(max_length=100),
+        ),
+        migrations.AddField(
+            model_name='category',
+            name='user',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='categories', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='category',
+            name='key',
+            field=models.CharField(default='', editable=False, max_length=100),
+            preserve_default=False,
+        ),
+        migrations.AlterField(
+            model_name='transaction',
+            name='category',
+            field=models.CharField(max_length=100, null=True),
+        ),
+        migrations.AlterField(
+            model_name='budget',
+            name='category',
+            field=models.CharField(max_length=100, null=True),
+        ),
+        migrations.AlterField(
+            model_name='recurringrule',
+            name='category',
+            field=models.CharField(max_length=100, null=True),
+        ),
+        migrations.AddField(
+            model_name='transaction',
+            name='category_ref',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.RESTRICT, related_name='+', to='MoneyMapControl.category'),
+        ),
+        migrations.AddField(
+            model_name='budget',
+            name='category_ref',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.RESTRICT, related_name='+', to='MoneyMapControl.category'),
+        ),
+        migrations.AddField(
+            model_name='recurringrule',
+            name='category_ref',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.RESTRICT, related_name='+', to='MoneyMapControl.category'),
+        ),
+        migrations.RemoveIndex(
+            model_name='transaction',
+            name='txn_user_category_date_idx',
+        ),
+        migrations.RemoveConstraint(
+            model_name='categorysummary',
+            name='unique_category_summary',
+        ),
+        migrations.RemoveConstraint(
+            model_name='monthlyrollup',
+            name='unique_monthly_rollup',
+        ),
+        migrations.RemoveField(
+            model_name='categorysummary',
+            name='category',
+        ),
+        migrations.RemoveField(
+            model_name='monthlyrollup',
+            name='category',
+        ),
+        migrations.AddField(
+            model_name='categorysummary',
+            name='category',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='MoneyMapControl.category'),
+        ),
+        migrations.AddField(
+            model_name='monthlyrollup',
+            name='category',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='MoneyMapControl.category'),
+        ),
+        migrations.RunPython(intern_categories, restore_names),
+        migrations.RemoveField(
+            model_name='transaction',
+            name='category',
+        ),
+        migrations.RemoveField(
+            model_name='budget',
+            name='category',
+        ),
+        migrations.RemoveField(
+            model_name='recurringrule',
+            name='category',
+        ),
+        migrations.RenameField(
+            model_name='transaction',
+            old_name='category_ref',
+            new_name='category',
+        ),
+        migrations.RenameField(
+            model_name='budget',
+            old_name='category_ref',
+            new_name='category',
+        ),
+        migrations.RenameField(
+            model_name='recurringrule',
+            old_name='category_ref',
+            new_name='category',
+        ),
+        migrations.AlterField(
+            model_name='transaction',
+            name='category',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.RESTRICT, related_name='transactions', to='MoneyMapControl.category'),
+        ),
+        migrations.AlterField(
+            model_name='budget',
+            name='category',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.RESTRICT, related_name='budgets', to='MoneyMapControl.category'),
+        ),
+        migrations.AlterField(
+            model_name='recurringrule',
+            name='category',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.RESTRICT, related_name='recurring_rules', to='MoneyMapControl.category'),
+        ),
+        migrations.AlterField(
+            model_name='categorysummary',
+            name='category',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='MoneyMapControl.category'),
+        ),
+        migrations.AlterField(
+            model_name='monthlyrollup',
+            name='category',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='MoneyMapControl.category'),
+        ),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['user', 'category', 'date'], name='txn_user_category_date_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='categorysummary',
+            constraint=models.UniqueConstraint(fields=('user', 'category', 'type'), name='unique_category_summary'),
+        ),
+        migrations.AddConstraint(
+            model_name='monthlyrollup',
+            constraint=models.UniqueConstraint(fields=('user', 'month', 'type', 'category'), name='unique_monthly_rollup'),
+        ),
+        migrations.AddConstraint(
+            model_name='category',
+            constraint=models.UniqueConstraint(fields=('user', 'type', 'key'), name='unique_category'),
+        ),
+    ]
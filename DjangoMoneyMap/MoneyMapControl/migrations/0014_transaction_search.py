@@ -0,0 +1,71 @@
+# Generated by Django 5.2.18 on 2026-10-17 20:40
+
+from django.db import migrations
+from django.db.utils import OperationalError
+
+# A frozen copy of MoneyMapControl.search.SCHEMA (plus the initial fill) as it
+# stood when this migration was written; migrations must not change when the
+# app does. Edit search.SCHEMA (used by ``rebuild_search_index``) and add a
+# new migration for existing databases rather than editing this copy.
+TRIGGERS = ['transaction_fts_insert', 'transaction_fts_update', 'transaction_fts_delete', 'category_fts_rename']
+
+CREATE = [
+    '''CREATE VIRTUAL TABLE IF NOT EXISTS "MoneyMapControl_transaction_fts" USING fts5(
+        description, category, owner, tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3'
+    )''',
+    '''INSERT INTO "MoneyMapControl_transaction_fts"("MoneyMapControl_transaction_fts", rank)
+    VALUES ('rank', 'bm25(1.0, 2.0, 0.0)')''',
+    '''CREATE TRIGGER IF NOT EXISTS transaction_fts_insert AFTER INSERT ON "MoneyMapControl_transaction" BEGIN
+        INSERT INTO "MoneyMapControl_transaction_fts"(rowid, description, category, owner)
+        VALUES (new.id, coalesce(new.description, ''),
+                (SELECT name FROM "MoneyMapControl_category" WHERE id = new.category_id), 'u' || new.user_id);
+    END''',
+    '''CREATE TRIGGER IF NOT EXISTS transaction_fts_update AFTER UPDATE OF description, category_id, user_id
+    ON "MoneyMapControl_transaction" BEGIN
+        UPDATE "MoneyMapControl_transaction_fts" SET description = coalesce(new.description, ''),
+            category = (SELECT name FROM "MoneyMapControl_category" WHERE id = new.category_id),
+            owner = 'u' || new.user_id
+        WHERE rowid = new.id;
+    END''',
+    '''CREATE TRIGGER IF NOT EXISTS transaction_fts_delete AFTER DELETE ON "MoneyMapControl_transaction" BEGIN
+        DELETE FROM "MoneyMapControl_transaction_fts" WHERE rowid = old.id;
+    END''',
+    '''CREATE TRIGGER IF NOT EXISTS category_fts_rename AFTER UPDATE OF name ON "MoneyMapControl_category" BEGIN
+        UPDATE "MoneyMapControl_transaction_fts" SET category = new.name
+        WHERE rowid IN (SELECT id FROM "MoneyMapControl_transaction" WHERE category_id = new.id);
+    END''',
+    '''INSERT INTO "MoneyMapControl_transaction_fts"(rowid, description, category, owner)
+    SELECT t.id, coalesce(t.description, ''), c.name, 'u' || t.user_id
+    FROM "MoneyMapControl_transaction" t JOIN "MoneyMapControl_category" c ON c.id = t.category_id''',
+]
+
+
+def create_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    try:
+        schema_editor.execute(CREATE[0])
+    except OperationalError:
+        # SQLite built without FTS5: search falls back to icontains.
+        return
+    for statement in CREATE[1:]:
+        schema_editor.execute(statement)
+
+
+def drop_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for trigger in TRIGGERS:
+        schema_editor.execute(f'DROP TRIGGER IF EXISTS {trigger}')
+    schema_editor.execute('DROP TABLE IF EXISTS "MoneyMapControl_transaction_fts"')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('MoneyMapControl', '0013_normalize_categories'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-17 21:35
+
+from django.db import migrations, models
+from django.utils.html import linebreaks
+
+
+def render_content(apps, schema_editor):
+    Blog = apps.get_model('MoneyMapControl', 'Blog')
+    for blog in Blog.objects.only('pk', 'content'):
+        blog.content_html = linebreaks(blog.content, autoescape=True)
+        blog.save(update_fields=['content_html'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('MoneyMapControl', '0014_transaction_search'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='blog',
+            name='content_html',
+            field=models.TextField(blank=True, editable=False, help_text='``content`` rendered on save'),
+        ),
+        migrations.RunPython(render_content, migrations.RunPython.noop),
+    ]
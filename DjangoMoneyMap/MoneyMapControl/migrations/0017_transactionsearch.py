@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-17 22:30
+
+import MoneyMapControl.models
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('MoneyMapControl', '0016_jobs'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TransactionSearch',
+            fields=[
+                ('transaction', models.OneToOneField(db_column='rowid', db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='search', serialize=False, to='MoneyMapControl.transaction')),
+                ('document', MoneyMapControl.models.FullTextField(db_column='MoneyMapControl_transaction_fts')),
+                ('rank', models.FloatField()),
+            ],
+            options={
+                'db_table': 'MoneyMapControl_transaction_fts',
+                'managed': False,
+            },
+        ),
+    ]
@@ -1,41 +1,74 @@
-from django.db import models
+from collections import defaultdict
+from decimal import Decimal
+from django.db import models, IntegrityError
+from django.db.models import Case, F, FloatField, OuterRef, Q, Subquery, Value, When
+from django.db.models.functions import Cast, Coalesce, Round
+from django.db.transaction import atomic
+from django.utils import timezone
 from django.contrib.auth.models import AbstractUser
 from django.contrib.auth import get_user_model
+from django.utils.html import linebreaks
 from django.utils.text import slugify
 from django.conf import settings
 
 class CustomUser(AbstractUser):
-    pass
+    data_modified = models.DateTimeField(null=True, blank=True, help_text="Last write to this user's financial data")
 
     def __str__(self):  
         return self.username
 
 User = get_user_model()
 
+def mark_data_modified(*user_ids):
+    User.objects.filter(pk__in=user_ids).update(data_modified=timezone.now())
+
 class Blog(models.Model):
     title = models.CharField(max_length=200)
     slug = models.SlugField(unique=True, max_length=200, blank=True)
     excerpt = models.TextField(max_length=300, help_text="Short preview for dashboard")
     content = models.TextField(help_text="Full blog content")
+    content_html = models.TextField(blank=True, editable=False, help_text="``content`` rendered on save")
     published_date = models.DateField(auto_now_add=True)
 
     class Meta:
         ordering = ['-published_date']
+        indexes = [
+            models.Index(fields=['-published_date'], name='blog_published_idx'),
+        ]
 
     def save(self, *args, **kwargs):
         if not self.slug:
             self.slug = slugify(self.title)
+        self.content_html = linebreaks(self.content, autoescape=True)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'content' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'content_html'}
         super().save(*args, **kwargs)
 
     def __str__(self):
         return self.title
 
 class Category(models.Model):
-    name = models.CharField(max_length=50)
+    """A user's income or expense category; ``key`` is ``name`` case- and whitespace-folded."""
+    user = models.ForeignKey(User, on_delete=models.CASCADE, null=True, blank=True, related_name='categories')
+    name = models.CharField(max_length=100)
+    key = models.CharField(max_length=100, editable=False)
     type = models.CharField(max_length=10, choices=[('Income', 'Income'), ('Expense', 'Expense')])
 
+    class Meta:
+        verbose_name_plural = 'categories'
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'type', 'key'], name='unique_category'),
+        ]
+
+    def save(self, *args, **kwargs):
+        self.name = clean_category_name(self.name)
+        self.key = category_key(self.name)
+        self.type = normalize_type(self.type)
+        super().save(*args, **kwargs)
+
     def __str__(self):
-        return f"{self.name} ({self.type})"
+        return self.name
 
 class Transaction(models.Model):
     TRANSACTION_TYPES = [
@@ -45,23 +78,302 @@ class Transaction(models.Model):
 
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     type = models.CharField(max_length=10, choices=TRANSACTION_TYPES)
-    category = models.CharField(max_length=100)
+    category = models.ForeignKey(Category, on_delete=models.RESTRICT, related_name='transactions')
     amount = models.DecimalField(max_digits=10, decimal_places=2)
     date = models.DateField()
     description = models.TextField(blank=True, null=True)
+    recurring_rule = models.ForeignKey(
+        'RecurringRule', null=True, blank=True, on_delete=models.SET_NULL, related_name='transactions',
+    )
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'date', 'id'], name='txn_user_date_idx'),
+            models.Index(fields=['user', 'type', 'date'], name='txn_user_type_date_idx'),
+            models.Index(fields=['user', 'category', 'date'], name='txn_user_category_date_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['recurring_rule', 'date'], condition=models.Q(recurring_rule__isnull=False),
+                name='unique_recurring_occurrence',
+            ),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        if all(name in instance.__dict__ for name in ('user_id', 'type', 'category_id', 'amount', 'date')):
+            instance._ledger_row = instance.ledger_row()
+        return instance
+
+    def ledger_row(self):
+        day = self._meta.get_field('date').to_python(self.date)
+        return (self.user_id, normalize_type(self.type), self.category_id, month_start(day), to_money(self.amount))
+
+    def save(self, *args, **kwargs):
+        self.type = normalize_type(self.type)
+        adding = self._state.adding
+        previous = getattr(self, '_ledger_row', None)
+        with atomic():
+            super().save(*args, **kwargs)
+            current = self.ledger_row()
+            if previous is None and not adding:
+                # Loaded without the ledger fields, so the old row is unknown; recompute in the background.
+                from .jobs import enqueue_for_user
+                enqueue_for_user('recompute_user', self.user_id)
+            elif previous != current:
+                deltas = defaultdict(lambda: [Decimal('0'), 0])
+                if previous is not None:
+                    add_ledger_delta(deltas, previous, -1)
+                add_ledger_delta(deltas, current, 1)
+                apply_ledger_deltas(deltas)
+        self._ledger_row = current
+
+    def delete(self, *args, **kwargs):
+        row = getattr(self, '_ledger_row', None) or self.ledger_row()
+        with atomic():
+            result = super().delete(*args, **kwargs)
+            deltas = defaultdict(lambda: [Decimal('0'), 0])
+            add_ledger_delta(deltas, row, -1)
+            apply_ledger_deltas(deltas)
+        self._ledger_row = None
+        return result
 
     def __str__(self):
         return f"{self.type} - {self.category} ({self.amount})"
 
+class Match(models.Lookup):
+    """``field__match=query``: an SQLite FTS5 ``MATCH``."""
+    lookup_name = 'match'
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f'{lhs} MATCH {rhs}', [*lhs_params, *rhs_params]
+
+class FullTextField(models.TextField):
+    """The hidden FTS5 column named after its table, which full-text queries match against."""
+
+FullTextField.register_lookup(Match)
+
+class TransactionSearch(models.Model):
+    """A row of the SQLite full-text index over transactions, kept in sync by the triggers in ``search.SCHEMA``."""
+    transaction = models.OneToOneField(
+        Transaction, on_delete=models.DO_NOTHING, primary_key=True, db_column='rowid',
+        db_constraint=False, related_name='search',
+    )
+    document = FullTextField(db_column='MoneyMapControl_transaction_fts')
+    rank = models.FloatField()
+
+    class Meta:
+        managed = False
+        db_table = 'MoneyMapControl_transaction_fts'
+
+class RecurringRule(models.Model):
+    FREQUENCIES = [
+        ('daily', 'Daily'),
+        ('weekly', 'Weekly'),
+        ('monthly', 'Monthly'),
+        ('yearly', 'Yearly'),
+    ]
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='recurring_rules')
+    type = models.CharField(max_length=10, choices=Transaction.TRANSACTION_TYPES)
+    category = models.ForeignKey(Category, on_delete=models.RESTRICT, related_name='recurring_rules')
+    amount = models.DecimalField(max_digits=10, decimal_places=2)
+    description = models.TextField(blank=True, null=True)
+    frequency = models.CharField(max_length=10, choices=FREQUENCIES, default='monthly')
+    interval = models.PositiveSmallIntegerField(default=1, help_text="Every N days/weeks/months/years")
+    start_date = models.DateField()
+    end_date = models.DateField(null=True, blank=True)
+    next_date = models.DateField(help_text="Next occurrence not yet materialized")
+    active = models.BooleanField(default=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['active', 'next_date'], name='recurring_due_idx'),
+            models.Index(fields=['user', 'active', 'next_date'], name='recurring_user_due_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        if self.next_date is None:
+            self.next_date = self.start_date
+        super().save(*args, **kwargs)
+
+    def __str__(self):
+        return f"{self.category} - {self.amount} ({self.frequency})"
+
+def normalize_type(value):
+    return (value or '').strip().capitalize()
+
+def clean_category_name(value):
+    return ' '.join(str(value or '').split())[:100] or 'Uncategorized'
+
+def category_key(value):
+    return clean_category_name(value).casefold()
+
+def to_money(value):
+    return Decimal(str(value)).quantize(Decimal('0.01'))
+
+def month_start(day):
+    return day.replace(day=1)
+
+def add_ledger_delta(deltas, row, sign):
+    user_id, type_, category, month, amount = row
+    entry = deltas[(user_id, type_, category, month)]
+    entry[0] += sign * amount
+    entry[1] += sign
+
+def apply_ledger_deltas(deltas):
+    """Apply ``{(user_id, type, category, month): [amount, count]}`` to the summary tables.
+
+    ``category`` is the ``Category`` id. Bulk writers that bypass ``Transaction.save``/``delete`` (``bulk_create``,
+    queryset ``delete``) must call this with the rows they touched.
+    """
+    per_month = {}
+    per_category = defaultdict(lambda: {'total': Decimal('0'), 'count': 0})
+    per_user = defaultdict(lambda: {'total_income': Decimal('0'), 'total_expense': Decimal('0'), 'transaction_count': 0})
+    for (user_id, type_, category, month), (amount, count) in deltas.items():
+        if not amount and not count:
+            continue
+        per_month[(user_id, month, type_, category)] = {'total': amount, 'count': count}
+        per_category[(user_id, type_, category)]['total'] += amount
+        per_category[(user_id, type_, category)]['count'] += count
+        if type_ == 'Income':
+            per_user[(user_id,)]['total_income'] += amount
+        elif type_ == 'Expense':
+            per_user[(user_id,)]['total_expense'] += amount
+        per_user[(user_id,)]['transaction_count'] += count
+
+    with atomic():
+        _upsert_many(MonthlyRollup, ('user_id', 'month', 'type', 'category_id'), per_month)
+        _upsert_many(CategorySummary, ('user_id', 'type', 'category_id'), per_category)
+        _upsert_many(LedgerSummary, ('user_id',), per_user, updated_at=timezone.now())
+
+# Above this many rows, summaries are read once and written with bulk_update/bulk_create.
+BULK_UPSERT_THRESHOLD = 20
+
+def _upsert_many(model, key_fields, rows, **values):
+    if len(rows) > BULK_UPSERT_THRESHOLD:
+        try:
+            with atomic():
+                _bulk_upsert(model, key_fields, rows, **values)
+            return
+        except IntegrityError:
+            pass
+    for key, increments in rows.items():
+        _upsert(model, dict(zip(key_fields, key)), increments, **values)
+
+def _bulk_upsert(model, key_fields, rows, **values):
+    lookup = {f'{field}__in': {key[i] for key in rows} for i, field in enumerate(key_fields)}
+    existing = {
+        tuple(getattr(obj, field) for field in key_fields): obj
+        for obj in model.objects.select_for_update().filter(**lookup)
+    }
+    changed, created = [], []
+    for key, increments in rows.items():
+        obj = existing.get(key)
+        if obj is None:
+            created.append(model(**dict(zip(key_fields, key)), **increments, **values))
+            continue
+        for field, delta in increments.items():
+            value = getattr(obj, field) + delta
+            setattr(obj, field, value.quantize(Decimal('0.01')) if isinstance(delta, Decimal) else value)
+        for field, value in values.items():
+            setattr(obj, field, value)
+        changed.append(obj)
+    fields = [*next(iter(rows.values())), *values]
+    model.objects.bulk_update(changed, fields, batch_size=500)
+    model.objects.bulk_create(created, batch_size=500)
+
+def _upsert(model, lookup, increments, **values):
+    changes = {
+        field: Round(F(field) + delta, 2) if isinstance(delta, Decimal) else F(field) + delta
+        for field, delta in increments.items()
+    }
+    if model.objects.filter(**lookup).update(**changes, **values):
+        return
+    try:
+        with atomic():
+            model.objects.create(**lookup, **increments, **values)
+    except IntegrityError:
+        model.objects.filter(**lookup).update(**changes, **values)
+
+class LedgerSummary(models.Model):
+    user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='ledger_summary')
+    total_income = models.DecimalField(max_digits=20, decimal_places=2, default=0)
+    total_expense = models.DecimalField(max_digits=20, decimal_places=2, default=0)
+    transaction_count = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(default=timezone.now)
+
+    @property
+    def balance(self):
+        return self.total_income - self.total_expense
+
+    def __str__(self):
+        return f"{self.user} - {self.balance}"
+
+class CategorySummary(models.Model):
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='category_summaries')
+    type = models.CharField(max_length=10, choices=Transaction.TRANSACTION_TYPES)
+    category = models.ForeignKey(Category, on_delete=models.CASCADE, related_name='+')
+    total = models.DecimalField(max_digits=20, decimal_places=2, default=0)
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'category', 'type'], name='unique_category_summary'),
+        ]
+
+    def __str__(self):
+        return f"{self.user} - {self.type} - {self.category} ({self.total})"
+
+class MonthlyRollup(models.Model):
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='monthly_rollups')
+    month = models.DateField(help_text="First day of the month")
+    type = models.CharField(max_length=10, choices=Transaction.TRANSACTION_TYPES)
+    category = models.ForeignKey(Category, on_delete=models.CASCADE, related_name='+')
+    total = models.DecimalField(max_digits=20, decimal_places=2, default=0)
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        ordering = ['month']
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'month', 'type', 'category'], name='unique_monthly_rollup'),
+        ]
+
+    def __str__(self):
+        return f"{self.user} - {self.month:%Y-%m} - {self.type} - {self.category} ({self.total})"
+
+class BudgetQuerySet(models.QuerySet):
+    def with_spending(self, user=None):
+        """Annotate each budget with ``spent_amount`` read from ``CategorySummary``."""
+        qs = self.filter(user=user) if user is not None else self
+        qs = qs.select_related('category')
+        money = models.DecimalField(max_digits=20, decimal_places=2)
+        expenses = (
+            CategorySummary.objects
+            .filter(user=OuterRef('user'), category=OuterRef('category'), type='Expense')
+            .values('total')[:1]
+        )
+        return qs.annotate(spent_amount=Coalesce(
+            Subquery(expenses, output_field=money),
+            Value(Decimal('0'), output_field=money),
+            output_field=money,
+        ))
+
 class Budget(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE)
-    category = models.CharField(max_length=100)
+    category = models.ForeignKey(Category, on_delete=models.RESTRICT, related_name='budgets')
     limit = models.DecimalField(max_digits=10, decimal_places=2)
 
+    objects = BudgetQuerySet.as_manager()
+
     @property
     def spent(self):
-        transactions = Transaction.objects.filter(user=self.user, category=self.category, type__iexact='Expense')
-        return sum(t.amount for t in transactions)
+        if hasattr(self, 'spent_amount'):
+            return self.spent_amount
+        return Budget.objects.filter(pk=self.pk).with_spending().values_list('spent_amount', flat=True).get()
 
     @property
     def percent(self):
@@ -71,11 +383,29 @@ class Budget(models.Model):
 
     @property
     def exceeded(self):
-        return self.spent_amount > self.limit
+        return self.spent > self.limit
 
     def __str__(self):
         return f"{self.category} - {self.limit}"
 
+class InvestmentQuerySet(models.QuerySet):
+    def with_valuation(self, user=None):
+        """Annotate ``value_amount``, ``cost_amount``, ``gain_amount`` and ``profit_pct`` in SQL."""
+        qs = self.filter(user=user) if user is not None else self
+        holding = models.DecimalField(max_digits=30, decimal_places=6)
+        qs = qs.annotate(
+            value_amount=models.ExpressionWrapper(F('quantity') * F('current_price'), output_field=holding),
+            cost_amount=models.ExpressionWrapper(F('quantity') * F('purchase_price'), output_field=holding),
+        ).annotate(
+            gain_amount=models.ExpressionWrapper(F('value_amount') - F('cost_amount'), output_field=holding),
+        )
+        return qs.annotate(profit_pct=Case(
+            When(purchase_price=0, then=Value(0.0)),
+            When(quantity=0, then=Value(0.0)),
+            default=Cast(F('gain_amount'), FloatField()) * 100 / Cast(F('cost_amount'), FloatField()),
+            output_field=FloatField(),
+        ))
+
 class Investment(models.Model):
     INVESTMENT_TYPES = [
         ('Stock', 'Stock'),
@@ -91,28 +421,62 @@ class Investment(models.Model):
     purchase_price = models.DecimalField(max_digits=15, decimal_places=2, default=0)
     current_price = models.DecimalField(max_digits=15, decimal_places=2, default=0)
 
+    objects = InvestmentQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['name'], name='investment_name_idx'),
+        ]
+
     @property
     def current_value(self):
+        if hasattr(self, 'value_amount'):
+            return self.value_amount
         return self.quantity * self.current_price
 
     @property
     def profit_percentage(self):
-        if self.purchase_price == 0:
+        if hasattr(self, 'profit_pct'):
+            return self.profit_pct
+        if self.purchase_price == 0 or self.quantity == 0:
             return 0
         return float((self.current_value - (self.purchase_price * self.quantity)) / (self.purchase_price * self.quantity) * 100)
 
     @property
     def gain_loss(self):
+        if hasattr(self, 'gain_amount'):
+            return self.gain_amount
         return self.current_value - (self.purchase_price * self.quantity)
 
     def __str__(self):
         return f"{self.name} ({self.type})"
 
+class PriceHistory(models.Model):
+    """Daily closing prices of one instrument for one calendar year.
+
+    ``prices`` holds one little-endian float64 per day of the year (NaN where
+    no price was recorded); see ``pricehistory`` for reading and writing it.
+    """
+    instrument = models.CharField(max_length=150)
+    year = models.PositiveSmallIntegerField()
+    prices = models.BinaryField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['instrument', 'year']
+        constraints = [
+            models.UniqueConstraint(fields=['instrument', 'year'], name='unique_price_history'),
+        ]
+
+    def __str__(self):
+        return f"{self.instrument} {self.year}"
+
 class Goal(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     name = models.CharField(max_length=150)
     target_amount = models.DecimalField(max_digits=12, decimal_places=2, default=0)
     saved_amount = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    target_date = models.DateField(null=True, blank=True)
 
     def progress(self):
         if self.target_amount == 0:
@@ -121,3 +485,39 @@ class Goal(models.Model):
 
     def __str__(self):
         return f"{self.name} - ₹{self.saved_amount}/₹{self.target_amount}"
+
+class Job(models.Model):
+    """A unit of background work run by ``manage.py run_workers``; see ``MoneyMapControl.jobs``."""
+    QUEUED, RUNNING, DONE, FAILED = 'queued', 'running', 'done', 'failed'
+    STATUSES = [
+        (QUEUED, 'Queued'),
+        (RUNNING, 'Running'),
+        (DONE, 'Done'),
+        (FAILED, 'Failed'),
+    ]
+
+    name = models.CharField(max_length=100)
+    args = models.JSONField(default=dict, blank=True)
+    key = models.CharField(max_length=200, blank=True, default='', help_text="At most one queued and one running job per key")
+    status = models.CharField(max_length=10, choices=STATUSES, default=QUEUED)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=3)
+    run_at = models.DateTimeField(default=timezone.now)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    seconds = models.FloatField(null=True, blank=True, help_text="Run time of the last attempt")
+    worker = models.CharField(max_length=100, blank=True)
+    result = models.JSONField(null=True, blank=True)
+    error = models.TextField(blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'run_at'], name='job_status_run_at_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['key'], condition=Q(status='queued') & ~Q(key=''), name='unique_queued_job'),
+        ]
+
+    def __str__(self):
+        return f"{self.name} #{self.pk} ({self.status})"
@@ -0,0 +1,72 @@
+from datetime import date
+from decimal import Decimal, InvalidOperation
+from django.db.models import Q
+from .models import Category, Transaction, category_key, normalize_type
+
+PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+def encode_cursor(transaction):
+    return f"{transaction.date.isoformat()}.{transaction.id}"
+
+
+def decode_cursor(value):
+    """Turn a ``YYYY-MM-DD.<id>`` cursor back into ``(date, id)``; raises ``ValueError``."""
+    day, _, pk = value.partition('.')
+    return date.fromisoformat(day), int(pk)
+
+
+def filter_transactions(user, params):
+    """Apply the ``start``/``end``/``type``/``category``/``min_amount``/``max_amount`` query parameters.
+
+    Raises ``ValueError`` for a malformed date or amount.
+    """
+    transactions = Transaction.objects.filter(user=user).select_related('category')
+    if params.get('start'):
+        transactions = transactions.filter(date__gte=date.fromisoformat(params['start']))
+    if params.get('end'):
+        transactions = transactions.filter(date__lte=date.fromisoformat(params['end']))
+    if params.get('type'):
+        transactions = transactions.filter(type=normalize_type(params['type']))
+    if params.get('category'):
+        categories = Category.objects.filter(user=user, key=category_key(params['category']))
+        transactions = transactions.filter(category__in=categories.values('pk'))
+    if params.get('min_amount'):
+        transactions = transactions.filter(amount__gte=_amount(params['min_amount']))
+    if params.get('max_amount'):
+        transactions = transactions.filter(amount__lte=_amount(params['max_amount']))
+    return transactions
+
+
+def _amount(value):
+    try:
+        amount = Decimal(value)
+    except InvalidOperation:
+        raise ValueError(f"Invalid amount: {value!r}")
+    if not amount.is_finite():
+        raise ValueError(f"Invalid amount: {value!r}")
+    return amount
+
+
+def keyset_page(transactions, cursor=None, size=PAGE_SIZE):
+    """Return ``(rows, next_cursor)`` for the page after ``cursor``, newest first.
+
+    Seeks on ``(date, id)`` instead of using OFFSET, so every page costs the
+    same index range scan however deep the user pages.
+    """
+    transactions = transactions.order_by('-date', '-id')
+    if cursor:
+        day, pk = decode_cursor(cursor)
+        transactions = transactions.filter(Q(date__lt=day) | Q(date=day, id__lt=pk))
+    rows = list(transactions[:size + 1])
+    next_cursor = encode_cursor(rows[size - 1]) if len(rows) > size else None
+    return rows[:size], next_cursor
+
+
+def page_size(params):
+    try:
+        size = int(params.get('limit', PAGE_SIZE))
+    except ValueError:
+        return PAGE_SIZE
+    return max(1, min(size, MAX_PAGE_SIZE))
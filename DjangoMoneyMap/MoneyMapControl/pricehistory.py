@@ -0,0 +1,195 @@
+import calendar
+from collections import defaultdict
+from datetime import date, timedelta
+import numpy as np
+from django.db.models import Max
+from django.db.transaction import atomic
+from django.utils import timezone
+from .caching import cached
+from .models import Investment, PriceHistory
+
+DTYPE = np.dtype('<f8')
+PERIODS_PER_YEAR = 365
+MAX_CHART_POINTS = 800
+
+
+def _days(year):
+    return 366 if calendar.isleap(year) else 365
+
+
+def _decode(blob):
+    return np.frombuffer(blob, dtype=DTYPE)
+
+
+def _store(pieces):
+    """Write ``{(instrument, year): [(day_offsets, prices), ...]}`` into the yearly arrays."""
+    if not pieces:
+        return 0
+    existing = {
+        (row.instrument, row.year): row
+        for row in PriceHistory.objects.filter(
+            instrument__in={name for name, _year in pieces}, year__in={year for _name, year in pieces},
+        )
+    }
+    now = timezone.now()
+    created, updated = [], []
+    for (name, year), chunks in pieces.items():
+        row = existing.get((name, year))
+        prices = _decode(row.prices).copy() if row else np.full(_days(year), np.nan, dtype=DTYPE)
+        for offsets, values in chunks:
+            prices[offsets] = values
+        if row is None:
+            created.append(PriceHistory(instrument=name, year=year, prices=prices.tobytes(), updated_at=now))
+        else:
+            row.prices, row.updated_at = prices.tobytes(), now
+            updated.append(row)
+    with atomic():
+        PriceHistory.objects.bulk_create(created, batch_size=500)
+        PriceHistory.objects.bulk_update(updated, ['prices', 'updated_at'], batch_size=500)
+    return len(created) + len(updated)
+
+
+def store_series(series):
+    """Store ``{instrument: (first_day, daily_prices)}`` of consecutive daily prices."""
+    pieces = defaultdict(list)
+    for name, (start, values) in series.items():
+        values = np.asarray(values, dtype=DTYPE)
+        position, day = 0, start
+        while position < len(values):
+            offset = day.timetuple().tm_yday - 1
+            take = min(_days(day.year) - offset, len(values) - position)
+            pieces[(name, day.year)].append((np.arange(offset, offset + take), values[position:position + take]))
+            position += take
+            day = date(day.year + 1, 1, 1)
+    return _store(pieces)
+
+
+def store_points(points):
+    """Store an iterable of ``(instrument, day, price)`` in any order."""
+    grouped = defaultdict(lambda: ([], []))
+    for name, day, price in points:
+        offsets, values = grouped[(name, day.year)]
+        offsets.append(day.timetuple().tm_yday - 1)
+        values.append(float(price))
+    return _store({
+        key: [(np.array(offsets), np.array(values, dtype=DTYPE))]
+        for key, (offsets, values) in grouped.items()
+    })
+
+
+def record_prices(prices, day=None):
+    """Record ``{instrument: price}`` as the closing prices for ``day`` (today by default)."""
+    day = day or date.today()
+    return store_points((name, day, price) for name, price in prices.items())
+
+
+def load_matrix(instruments, start, end, fallback=None):
+    """Daily prices of ``instruments`` from ``start`` to ``end`` as an ``(n, days)`` array.
+
+    Gaps are forward-filled, days before an instrument's first price take
+    that first price, and instruments without any history use ``fallback``.
+    """
+    first = date(start.year, 1, 1)
+    width = (end - first).days + 1
+    index = {name: i for i, name in enumerate(instruments)}
+    matrix = np.full((len(instruments), width), np.nan, dtype=DTYPE)
+    rows = (
+        PriceHistory.objects
+        .filter(instrument__in=instruments, year__gte=start.year, year__lte=end.year)
+        .values_list('instrument', 'year', 'prices')
+    )
+    for name, year, blob in rows:
+        offset = (date(year, 1, 1) - first).days
+        values = _decode(blob)[:width - offset]
+        matrix[index[name], offset:offset + len(values)] = values
+
+    missing = np.isnan(matrix)
+    positions = np.where(missing, 0, np.arange(width))
+    np.maximum.accumulate(positions, axis=1, out=positions)
+    matrix = np.take_along_axis(matrix, positions, axis=1)
+
+    has_any = ~missing.all(axis=1)
+    first_valid = np.take_along_axis(matrix, np.argmax(~missing, axis=1)[:, None], axis=1)
+    matrix = np.where(np.isnan(matrix), first_valid, matrix)
+    if fallback is not None:
+        matrix[~has_any] = np.asarray(fallback, dtype=DTYPE)[~has_any, None]
+
+    skip = (start - first).days
+    dates = np.arange(np.datetime64(start), np.datetime64(end) + 1)
+    return dates, matrix[:, skip:]
+
+
+def daily_returns(values):
+    values = np.asarray(values, dtype=DTYPE)
+    previous = values[..., :-1]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        returns = np.where(previous > 0, values[..., 1:] / previous - 1, 0.0)
+    return returns
+
+
+def time_weighted_return(values):
+    """Chain-linked return over the whole series."""
+    return np.prod(1 + daily_returns(values), axis=-1) - 1
+
+
+def volatility(values):
+    """Annualised standard deviation of daily log returns."""
+    returns = np.log1p(daily_returns(values))
+    if returns.shape[-1] < 2:
+        return np.zeros(returns.shape[:-1])
+    return returns.std(axis=-1, ddof=1) * np.sqrt(PERIODS_PER_YEAR)
+
+
+def max_drawdown(values):
+    """Largest peak-to-trough fall, as a negative fraction."""
+    values = np.asarray(values, dtype=DTYPE)
+    peaks = np.maximum.accumulate(values, axis=-1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        drawdowns = np.where(peaks > 0, values / peaks - 1, 0.0)
+    return drawdowns.min(axis=-1)
+
+
+def _holdings(user):
+    quantities, prices = defaultdict(float), {}
+    for name, quantity, price in Investment.objects.filter(user=user).values_list('name', 'quantity', 'current_price'):
+        quantities[name] += float(quantity)
+        prices[name] = float(price)
+    names = sorted(quantities)
+    return names, np.array([quantities[n] for n in names]), np.array([prices[n] for n in names])
+
+
+def portfolio_history(user, years=3, end=None):
+    """Daily portfolio value of ``user``'s current holdings with return statistics."""
+    end = end or date.today()
+    start = end - timedelta(days=round(years * 365.25))
+    names, quantities, fallback = _holdings(user)
+    if not names:
+        return {'dates': [], 'values': [], 'time_weighted_return': 0.0, 'volatility': 0.0,
+                'max_drawdown': 0.0, 'holdings': []}
+
+    dates, matrix = load_matrix(names, start, end, fallback)
+    values = quantities @ matrix
+    chart = np.arange(0, len(values), max(1, -(-len(values) // MAX_CHART_POINTS)))
+    if chart[-1] != len(values) - 1:
+        chart = np.append(chart, len(values) - 1)
+
+    per_holding = zip(names, time_weighted_return(matrix), volatility(matrix), max_drawdown(matrix))
+    return {
+        'dates': [str(d) for d in dates[chart]],
+        'values': np.round(values[chart], 2).tolist(),
+        'time_weighted_return': round(float(time_weighted_return(values)), 6),
+        'volatility': round(float(volatility(values)), 6),
+        'max_drawdown': round(float(max_drawdown(values)), 6),
+        'holdings': [
+            {'name': name, 'time_weighted_return': round(float(r), 6), 'volatility': round(float(v), 6),
+             'max_drawdown': round(float(d), 6)}
+            for name, r, v, d in per_holding
+        ],
+    }
+
+
+def cached_portfolio_history(user, years=3):
+    """``portfolio_history`` cached per user data version, price-history change and day."""
+    stamp = PriceHistory.objects.aggregate(latest=Max('updated_at'))['latest']
+    key = f"price_history:{years}:{date.today()}:{stamp.timestamp() if stamp else 0}"
+    return cached(user.id, key, portfolio_history, user, years)
@@ -0,0 +1,78 @@
+import csv
+import json
+from decimal import Decimal, InvalidOperation
+from django.db.transaction import atomic
+from .models import Investment
+from .pricehistory import record_prices
+from .signals import data_changed_many
+
+BATCH_SIZE = 500
+PRICE_LIMIT = Decimal('1e13')
+
+
+def parse_prices(raw):
+    """Validate a ``{name: price}`` mapping into ``{name: Decimal}``; raises ``ValueError``."""
+    if not isinstance(raw, dict) or not raw:
+        raise ValueError("'prices' must be a non-empty object of name: price.")
+    prices = {}
+    for name, value in raw.items():
+        try:
+            price = Decimal(str(value).strip()).quantize(Decimal('0.01'))
+        except (InvalidOperation, ValueError):
+            raise ValueError(f"Invalid price for {name!r}: {value!r}")
+        if not price.is_finite() or price < 0 or price >= PRICE_LIMIT:
+            raise ValueError(f"Invalid price for {name!r}: {value!r}")
+        prices[str(name).strip()] = price
+    return prices
+
+
+def load_prices(path):
+    """Read a price feed file: a JSON object, or CSV rows of ``name,price``."""
+    with open(path, newline='', encoding='utf-8') as f:
+        if path.lower().endswith('.json'):
+            return parse_prices(json.load(f))
+        rows = [row for row in csv.reader(f) if row and row[0].strip()]
+    if rows and rows[0][0].strip().lower() == 'name':
+        rows = rows[1:]
+    if any(len(row) < 2 for row in rows):
+        raise ValueError("CSV price rows must be name,price.")
+    return parse_prices({row[0]: row[1] for row in rows})
+
+
+def refresh_prices(prices, user=None, batch_size=BATCH_SIZE):
+    """Set ``current_price`` on every holding named in ``prices``, for all users or just ``user``.
+
+    Only holdings whose price actually changes are written, ``batch_size`` at
+    a time with ``bulk_update``, all in one transaction. Market-wide refreshes
+    (no ``user``) also record the prices as today's closes in the price history.
+    """
+    holdings = Investment.objects.filter(name__in=list(prices))
+    if user is not None:
+        holdings = holdings.filter(user=user)
+
+    seen, users, updated = set(), set(), 0
+    batch = []
+    with atomic():
+        for inv in holdings.only('id', 'user_id', 'name', 'current_price').iterator(chunk_size=2000):
+            seen.add(inv.name)
+            price = prices[inv.name]
+            if inv.current_price == price:
+                continue
+            inv.current_price = price
+            batch.append(inv)
+            users.add(inv.user_id)
+            if len(batch) >= batch_size:
+                Investment.objects.bulk_update(batch, ['current_price'])
+                updated += len(batch)
+                batch = []
+        Investment.objects.bulk_update(batch, ['current_price'])
+        updated += len(batch)
+        if user is None:
+            record_prices(prices)
+        data_changed_many(users)
+    return {
+        'instruments': len(prices),
+        'updated': updated,
+        'users': len(users),
+        'unknown': sorted(set(prices) - seen),
+    }
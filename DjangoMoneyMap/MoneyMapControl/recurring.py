@@ -0,0 +1,87 @@
+import calendar
+from collections import defaultdict
+from datetime import date, timedelta
+from decimal import Decimal
+from django.db.transaction import atomic
+from .models import RecurringRule, Transaction, add_ledger_delta, apply_ledger_deltas
+from .signals import data_changed_many
+
+BATCH_SIZE = 1000
+# A rule that is further behind than this catches up over several runs.
+MAX_OCCURRENCES = 1000
+
+
+def _add_months(day, months, anchor):
+    month = day.month - 1 + months
+    year, month = day.year + month // 12, month % 12 + 1
+    return date(year, month, min(anchor, calendar.monthrange(year, month)[1]))
+
+
+def following(rule, day):
+    """The occurrence after ``day``; months keep the start date's day where the month has it."""
+    if rule.frequency == 'daily':
+        return day + timedelta(days=rule.interval)
+    if rule.frequency == 'weekly':
+        return day + timedelta(weeks=rule.interval)
+    months = rule.interval * (12 if rule.frequency == 'yearly' else 1)
+    return _add_months(day, months, rule.start_date.day)
+
+
+def due_dates(rule, today):
+    """Occurrences of ``rule`` from its ``next_date`` up to ``today``, and the next one after them."""
+    last = today if rule.end_date is None else min(today, rule.end_date)
+    day, dates = rule.next_date, []
+    while day <= last and len(dates) < MAX_OCCURRENCES:
+        dates.append(day)
+        day = following(rule, day)
+    return dates, day
+
+
+def materialize(rules=None, today=None, batch_size=BATCH_SIZE):
+    """Create the transactions of every due rule in ``rules`` (all rules by default).
+
+    Rules are processed ``batch_size`` at a time; each batch's transactions
+    are inserted with one ``bulk_create`` and the rules' ``next_date`` moved
+    past them in the same transaction, so running again never duplicates.
+    Returns ``(rules_processed, transactions_created)``.
+    """
+    today = today or date.today()
+    due = (RecurringRule.objects.all() if rules is None else rules).filter(active=True, next_date__lte=today)
+    processed = created = 0
+    last_pk = 0
+    while True:
+        with atomic():
+            batch = list(due.filter(pk__gt=last_pk).order_by('pk').select_for_update()[:batch_size])
+            if not batch:
+                break
+            last_pk = batch[-1].pk
+
+            transactions = []
+            for rule in batch:
+                dates, rule.next_date = due_dates(rule, today)
+                if rule.end_date is not None and rule.next_date > rule.end_date:
+                    rule.active = False
+                transactions.extend(
+                    Transaction(
+                        user_id=rule.user_id, type=rule.type, category_id=rule.category_id, amount=rule.amount,
+                        description=rule.description, date=day, recurring_rule=rule,
+                    )
+                    for day in dates
+                )
+            Transaction.objects.bulk_create(transactions, batch_size=2000)
+            RecurringRule.objects.bulk_update(batch, ['next_date', 'active'])
+
+            deltas = defaultdict(lambda: [Decimal('0'), 0])
+            for transaction in transactions:
+                add_ledger_delta(deltas, transaction.ledger_row(), 1)
+            apply_ledger_deltas(deltas)
+            data_changed_many(t.user_id for t in transactions)
+
+        processed += len(batch)
+        created += len(transactions)
+    return processed, created
+
+
+def materialize_for_user(user, today=None):
+    """Catch ``user``'s rules up to ``today``; a single indexed query when nothing is due."""
+    return materialize(RecurringRule.objects.filter(user=user), today)
@@ -0,0 +1,179 @@
+from datetime import date, timedelta
+import numpy as np
+from django.db.models import Sum
+from django.db.models.functions import Trunc
+from .caching import cached
+from .models import Category, MonthlyRollup, Transaction
+
+GRANULARITIES = ('day', 'week', 'month', 'quarter', 'year')
+# Buckets averaged by the trailing rolling means.
+DEFAULT_WINDOW = 3
+MAX_WINDOW = 60
+# Upper bound on the buckets in one report, so a daily report over decades is refused.
+MAX_BUCKETS = 5000
+
+
+def report_params(params):
+    """Read the ``start``/``end``/``granularity``/``window`` query parameters; raises ``ValueError``."""
+    start = date.fromisoformat(params['start']) if params.get('start') else None
+    end = date.fromisoformat(params['end']) if params.get('end') else None
+    if start and end and start > end:
+        raise ValueError("start must not be after end.")
+    granularity = params.get('granularity') or 'month'
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"granularity must be one of {', '.join(GRANULARITIES)}.")
+    window = int(params['window']) if params.get('window') else DEFAULT_WINDOW
+    if not 1 <= window <= MAX_WINDOW:
+        raise ValueError(f"window must be between 1 and {MAX_WINDOW}.")
+    return {'start': start, 'end': end, 'granularity': granularity, 'window': window}
+
+
+def _floor(days, granularity):
+    """Start of the bucket holding each of ``days`` (``datetime64[D]``)."""
+    if granularity == 'day':
+        return days
+    if granularity == 'week':
+        # 1970-01-01, day 0, was a Thursday; weeks start on Monday like TruncWeek.
+        return days - (days.astype(np.int64) + 3) % 7
+    months = days.astype('datetime64[M]')
+    if granularity == 'quarter':
+        months = months - months.astype(np.int64) % 3
+    elif granularity == 'year':
+        months = months.astype('datetime64[Y]')
+    return months.astype('datetime64[D]')
+
+
+def _buckets(first, last, granularity):
+    """Every bucket start from the bucket of ``first`` through the bucket of ``last``."""
+    first, last = _floor(np.array([first, last], dtype='datetime64[D]'), granularity)
+    if granularity in ('day', 'week'):
+        step, unit = (1 if granularity == 'day' else 7), 'D'
+    else:
+        step, unit = (3 if granularity == 'quarter' else 1), ('Y' if granularity == 'year' else 'M')
+    count = (last.astype(f'datetime64[{unit}]') - first.astype(f'datetime64[{unit}]')).astype(np.int64) // step + 1
+    if count > MAX_BUCKETS:
+        raise ValueError(f"The range spans {count} {granularity} buckets; at most {MAX_BUCKETS} are allowed.")
+    return np.arange(first.astype(f'datetime64[{unit}]'), last.astype(f'datetime64[{unit}]') + 1, step).astype('datetime64[D]')
+
+
+def _labels(starts, granularity):
+    if granularity in ('day', 'week'):
+        return np.datetime_as_string(starts, unit='D').tolist()
+    if granularity == 'month':
+        return np.datetime_as_string(starts, unit='M').tolist()
+    years = starts.astype('datetime64[Y]').astype(np.int64) + 1970
+    if granularity == 'year':
+        return [str(year) for year in years]
+    quarters = starts.astype('datetime64[M]').astype(np.int64) % 12 // 3 + 1
+    return [f'{year}-Q{quarter}' for year, quarter in zip(years, quarters)]
+
+
+def rolling_mean(values, window):
+    """Trailing mean over ``window`` buckets; the first buckets average what is there so far."""
+    sums = np.cumsum(values)
+    sums[window:] = sums[window:] - sums[:-window]
+    return sums / np.minimum(np.arange(1, len(values) + 1), window)
+
+
+def _rows(user_id, start, end, granularity):
+    """``(bucket, type, category id, total)`` grouped in SQL, from the monthly rollups when the range covers whole months."""
+    whole_months = (
+        granularity in ('month', 'quarter', 'year')
+        and (start is None or start.day == 1)
+        and (end is None or (end + timedelta(days=1)).day == 1)
+    )
+    if whole_months:
+        rows, field, amount = MonthlyRollup.objects.filter(user_id=user_id, count__gt=0), 'month', 'total'
+    else:
+        rows, field, amount = Transaction.objects.filter(user_id=user_id), 'date', 'amount'
+    if start is not None:
+        rows = rows.filter(**{f'{field}__gte': start})
+    if end is not None:
+        rows = rows.filter(**{f'{field}__lte': end})
+    return list(
+        rows.annotate(bucket=Trunc(field, granularity))
+        .values_list('bucket', 'type', 'category')
+        .annotate(total=Sum(amount))
+        .order_by()
+    )
+
+
+def _money(values):
+    return np.round(values, 2).tolist()
+
+
+def build_report(user_id, start=None, end=None, granularity='month', window=DEFAULT_WINDOW):
+    rows = _rows(user_id, start, end, granularity)
+    report = {
+        'start': start, 'end': end, 'granularity': granularity, 'window': window,
+        'labels': [], 'income': [], 'expense': [], 'net': [], 'balance': [],
+        'income_avg': [], 'expense_avg': [], 'categories': [], 'category_series': [],
+    }
+    if not rows and (start is None or end is None):
+        return report
+
+    buckets, types, category_ids, totals = (list(column) for column in zip(*rows)) if rows else ([], [], [], [])
+    names = dict(Category.objects.filter(pk__in=set(category_ids)).values_list('pk', 'name')) if rows else {}
+    days = np.array(buckets, dtype='datetime64[D]')
+    starts = _buckets(
+        np.datetime64(start) if start else days.min(),
+        np.datetime64(end) if end else days.max(),
+        granularity,
+    )
+    count = len(starts)
+    index = np.searchsorted(starts, days)
+    totals = np.array(totals, dtype=float)
+    income_rows = np.array(types, dtype=object) == 'Income'
+
+    income = np.bincount(index[income_rows], weights=totals[income_rows], minlength=count)
+    expense = np.bincount(index[~income_rows], weights=totals[~income_rows], minlength=count)
+    net = income - expense
+
+    # One row per (type, category): its total over the range and its value in every bucket.
+    # Keyed by id, so same-named categories stay apart; ordered by name like the old listing.
+    keys = list(zip(types, category_ids))
+    categories = sorted(set(keys), key=lambda key: (key[0], names[key[1]], key[1]))
+    slot = {key: i for i, key in enumerate(categories)}
+    category_index = np.array([slot[key] for key in keys], dtype=np.int64)
+    series = np.bincount(
+        category_index * count + index, weights=totals, minlength=len(categories) * count,
+    ).reshape(len(categories), count)
+    category_totals = series.sum(axis=1)
+    type_totals = {'Income': income.sum(), 'Expense': expense.sum()}
+    order = np.argsort(-category_totals, kind='stable')
+
+    report.update({
+        'labels': _labels(starts, granularity),
+        'income': _money(income),
+        'expense': _money(expense),
+        'net': _money(net),
+        'balance': _money(np.cumsum(net)),
+        'income_avg': _money(rolling_mean(income, window)),
+        'expense_avg': _money(rolling_mean(expense, window)),
+    })
+    for position in order:
+        type_, category_id = categories[position]
+        name = names[category_id]
+        total = category_totals[position]
+        report['categories'].append({
+            'category': name,
+            'type': type_,
+            'total': round(float(total), 2),
+            'share': round(float(total / type_totals[type_] * 100), 2) if type_totals[type_] else 0.0,
+        })
+        report['category_series'].append({'category': name, 'type': type_, 'values': _money(series[position])})
+    return report
+
+
+def report(user, start=None, end=None, granularity='month', window=DEFAULT_WINDOW):
+    """Income and expense for ``user`` per ``granularity`` bucket between ``start`` and ``end``.
+
+    Buckets without transactions are filled with zeros; a missing ``start`` or
+    ``end`` means the user's first or last transaction. Cached per range,
+    granularity and window until the user's data changes.
+    """
+    user_id = getattr(user, 'pk', user)
+    return cached(
+        user_id, f'report:{start}:{end}:{granularity}:{window}',
+        build_report, user_id, start, end, granularity, window,
+    )
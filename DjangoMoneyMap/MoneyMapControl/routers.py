@@ -0,0 +1,97 @@
+from contextvars import ContextVar
+from datetime import timedelta
+from functools import wraps
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.utils import timezone
+
+REPLICA = 'replica'
+
+# The replica scope of the request being handled; shared with its worker threads.
+_scope = ContextVar('moneymap_replica_scope', default=None)
+
+
+class _Scope:
+    __slots__ = ('pinned',)
+
+    def __init__(self, pinned):
+        self.pinned = pinned
+
+
+def _recently_written(user):
+    lag = getattr(settings, 'MONEYMAP_REPLICA_LAG', 0)
+    modified = getattr(user, 'data_modified', None)
+    return modified is not None and modified > timezone.now() - timedelta(seconds=lag)
+
+
+def _enter(request):
+    # A user who has just written must read their own write, which the replica may still lack.
+    return _scope.set(_Scope(pinned=_recently_written(request.user)))
+
+
+def _scoped(chunks, scope):
+    iterator = iter(chunks)
+    while True:
+        token = _scope.set(scope)
+        try:
+            chunk = next(iterator)
+        except StopIteration:
+            return
+        finally:
+            _scope.reset(token)
+        yield chunk
+
+
+def replica_reads(view):
+    """Route the view's reads to the replica, streamed responses included.
+
+    Reads stay on the primary once the view writes anything, inside atomic
+    blocks, and for ``MONEYMAP_REPLICA_LAG`` seconds after the user's last
+    write. Without a ``replica`` database everything uses ``default``.
+    """
+    if iscoroutinefunction(view):
+        @wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            token = _enter(request)
+            try:
+                return await view(request, *args, **kwargs)
+            finally:
+                _scope.reset(token)
+        return wrapper
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        token = _enter(request)
+        try:
+            response = view(request, *args, **kwargs)
+            if response.streaming:
+                response.streaming_content = _scoped(response.streaming_content, _scope.get())
+            return response
+        finally:
+            _scope.reset(token)
+    return wrapper
+
+
+class ReadReplicaRouter:
+    """Send reads inside ``replica_reads`` views to the ``replica`` alias and everything else to ``default``."""
+
+    def db_for_read(self, model, **hints):
+        scope = _scope.get()
+        if scope is None or scope.pinned or REPLICA not in settings.DATABASES:
+            return None
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return None
+        return REPLICA
+
+    def db_for_write(self, model, **hints):
+        scope = _scope.get()
+        if scope is not None:
+            scope.pinned = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db != REPLICA
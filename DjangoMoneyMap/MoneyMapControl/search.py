@@ -0,0 +1,119 @@
+import re
+from django.db import connection
+from django.db.models import F, Q
+from .models import Category, Transaction, TransactionSearch
+from .pagination import PAGE_SIZE, keyset_page
+
+FTS_TABLE = TransactionSearch._meta.db_table
+TERM = re.compile(r'\w+')
+MAX_TERMS = 8
+
+_TRANSACTIONS = Transaction._meta.db_table
+_CATEGORIES = Category._meta.db_table
+_CATEGORY_NAME = f'(SELECT name FROM "{_CATEGORIES}" WHERE id = new.category_id)'
+
+# ``owner`` holds a "u<user id>" token so a user's rows are narrowed inside
+# the full-text index itself rather than after matching every user's rows.
+# Migration 0014 keeps a frozen copy of this schema; change it with a new
+# migration rather than by editing that copy.
+SCHEMA = [
+    f'''CREATE VIRTUAL TABLE IF NOT EXISTS "{FTS_TABLE}" USING fts5(
+        description, category, owner, tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3'
+    )''',
+    f'''INSERT INTO "{FTS_TABLE}"("{FTS_TABLE}", rank) VALUES ('rank', 'bm25(1.0, 2.0, 0.0)')''',
+    f'''CREATE TRIGGER IF NOT EXISTS transaction_fts_insert AFTER INSERT ON "{_TRANSACTIONS}" BEGIN
+        INSERT INTO "{FTS_TABLE}"(rowid, description, category, owner)
+        VALUES (new.id, coalesce(new.description, ''), {_CATEGORY_NAME}, 'u' || new.user_id);
+    END''',
+    f'''CREATE TRIGGER IF NOT EXISTS transaction_fts_update AFTER UPDATE OF description, category_id, user_id
+    ON "{_TRANSACTIONS}" BEGIN
+        UPDATE "{FTS_TABLE}" SET description = coalesce(new.description, ''), category = {_CATEGORY_NAME},
+            owner = 'u' || new.user_id
+        WHERE rowid = new.id;
+    END''',
+    f'''CREATE TRIGGER IF NOT EXISTS transaction_fts_delete AFTER DELETE ON "{_TRANSACTIONS}" BEGIN
+        DELETE FROM "{FTS_TABLE}" WHERE rowid = old.id;
+    END''',
+    f'''CREATE TRIGGER IF NOT EXISTS category_fts_rename AFTER UPDATE OF name ON "{_CATEGORIES}" BEGIN
+        UPDATE "{FTS_TABLE}" SET category = new.name
+        WHERE rowid IN (SELECT id FROM "{_TRANSACTIONS}" WHERE category_id = new.id);
+    END''',
+]
+
+
+def fts_available():
+    """Whether the SQLite full-text index exists; other backends use the ``icontains`` fallback."""
+    if connection.vendor != 'sqlite':
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", [FTS_TABLE])
+        return cursor.fetchone() is not None
+
+
+def rebuild():
+    """(Re)create the index and its sync triggers, then refill it from ``Transaction``; returns the row count."""
+    with connection.cursor() as cursor:
+        for statement in SCHEMA:
+            cursor.execute(statement)
+        cursor.execute(f'DELETE FROM "{FTS_TABLE}"')
+        cursor.execute(f'''
+            INSERT INTO "{FTS_TABLE}"(rowid, description, category, owner)
+            SELECT t.id, coalesce(t.description, ''), c.name, 'u' || t.user_id
+            FROM "{_TRANSACTIONS}" t JOIN "{_CATEGORIES}" c ON c.id = t.category_id
+        ''')
+        count = cursor.rowcount
+        cursor.execute(f'''INSERT INTO "{FTS_TABLE}"("{FTS_TABLE}") VALUES ('optimize')''')
+    return count
+
+
+def terms(text):
+    return TERM.findall((text or '').lower())[:MAX_TERMS]
+
+
+def match_expression(user_id, words):
+    """An FTS5 query matching rows of ``user_id`` that contain every word as a prefix."""
+    return f'owner:u{user_id} AND ' + ' AND '.join(f'"{word}"*' for word in words)
+
+
+def encode_cursor(transaction):
+    return f"{transaction.rank!r}:{transaction.id}"
+
+
+def decode_cursor(value):
+    rank, _, pk = value.rpartition(':')
+    return float(rank), int(pk)
+
+
+def search_page(user, transactions, text, cursor=None, size=PAGE_SIZE):
+    """Return ``(rows, next_cursor)`` of ``transactions`` matching ``text``, best match first.
+
+    ``transactions`` is an already filtered queryset of ``user``'s rows. On
+    SQLite the words are matched as prefixes through the FTS5 index and ranked
+    with BM25 (category hits weigh double), paging on ``(rank, id)``. Other
+    backends fall back to ``icontains`` on every word, newest first, and the
+    rows' ``rank`` is ``None``. Raises ``ValueError`` for a query with no words
+    or a bad cursor.
+    """
+    words = terms(text)
+    if not words:
+        raise ValueError("Search for at least one word.")
+
+    if not fts_available():
+        for word in words:
+            transactions = transactions.filter(Q(description__icontains=word) | Q(category__name__icontains=word))
+        rows, next_cursor = keyset_page(transactions, cursor, size)
+        for row in rows:
+            row.rank = None
+        return rows, next_cursor
+
+    ranked = (
+        transactions
+        .filter(search__document__match=match_expression(user.pk, words))
+        .annotate(rank=F('search__rank'))
+    )
+    if cursor:
+        rank, pk = decode_cursor(cursor)
+        ranked = ranked.filter(Q(rank__gt=rank) | Q(rank=rank, id__gt=pk))
+    rows = list(ranked.order_by('rank', 'id')[:size + 1])
+    next_cursor = encode_cursor(rows[size - 1]) if len(rows) > size else None
+    return rows[:size], next_cursor
@@ -0,0 +1,143 @@
+import hashlib
+import json
+from decimal import Decimal
+from django.db.models import DecimalField, F, Sum, Value
+from django.db.models.functions import Coalesce
+from .forecasting import forecast_goals
+from .models import Transaction, Budget, Investment, Goal, LedgerSummary
+from .reporting import report
+
+MONEY = DecimalField(max_digits=20, decimal_places=2)
+HOLDING = DecimalField(max_digits=30, decimal_places=6)
+
+
+def _total(expression, output_field, **extra):
+    return Coalesce(
+        Sum(expression, output_field=output_field, **extra),
+        Value(Decimal('0'), output_field=output_field),
+        output_field=output_field,
+    )
+
+
+def transaction_totals(user):
+    """Income, expense and balance for ``user`` read from its ``LedgerSummary`` row."""
+    totals = LedgerSummary.objects.filter(user=user).values('total_income', 'total_expense').first()
+    if totals is None:
+        totals = {'total_income': Decimal('0'), 'total_expense': Decimal('0')}
+    totals['balance'] = totals['total_income'] - totals['total_expense']
+    return totals
+
+
+def investment_totals(user):
+    totals = Investment.objects.filter(user=user).aggregate(
+        total_invested=_total(F('quantity') * F('purchase_price'), HOLDING),
+        total_current=_total(F('quantity') * F('current_price'), HOLDING),
+    )
+    totals['net_gain_loss'] = totals['total_current'] - totals['total_invested']
+    return totals
+
+
+def goal_totals(user):
+    totals = Goal.objects.filter(user=user).aggregate(
+        goals_saved=_total('saved_amount', MONEY),
+        goals_target=_total('target_amount', MONEY),
+    )
+    if totals['goals_target']:
+        totals['goals_progress'] = round((totals['goals_saved'] / totals['goals_target']) * 100, 2)
+    else:
+        totals['goals_progress'] = 0
+    return totals
+
+
+def user_summary(user):
+    """All dashboard totals for ``user``: one aggregate query per model."""
+    summary = transaction_totals(user)
+    summary.update(investment_totals(user))
+    summary.update(goal_totals(user))
+    return summary
+
+
+def latest_transactions(user, limit=5):
+    return list(Transaction.objects.filter(user=user).select_related('category').order_by('-date', '-id')[:limit])
+
+
+def investment_holdings(user):
+    return list(Investment.objects.with_valuation(user))
+
+
+def investment_values(user):
+    return [
+        {"name": name, "value": float(value)}
+        for name, value in Investment.objects.with_valuation(user).values_list('name', 'value_amount')
+    ]
+
+
+def investment_chart_data(user):
+    return json.dumps(investment_values(user))
+
+
+def goal_progress(user):
+    goals = list(Goal.objects.filter(user=user).values('id', 'name', 'target_amount', 'saved_amount', 'target_date'))
+    forecast = forecast_goals(user, goals=goals)['goals']
+    goals_data = []
+    for g in goals:
+        progress = round((g['saved_amount'] / g['target_amount']) * 100, 2) if g['target_amount'] else 0
+        goals_data.append({
+            "id": g['id'],
+            "name": g['name'],
+            "saved_amount": float(g['saved_amount']),
+            "target_amount": float(g['target_amount']),
+            "target_date": g['target_date'],
+            "progress": progress,
+            **forecast[g['id']],
+        })
+    return goals_data
+
+
+def budget_progress(user):
+    budgets_data = []
+    for b in Budget.objects.with_spending(user):
+        spent = b.spent
+        percent = round((spent / b.limit) * 100, 2) if b.limit else 0
+        exceeded = spent > b.limit if b.limit else False
+        budgets_data.append({
+            "category": b.category.name,
+            "limit": float(b.limit),
+            "spent": float(spent),
+            "percent": percent,
+            "exceeded": exceeded
+        })
+    return budgets_data
+
+
+def investment_profit_chart(user):
+    return [
+        {"name": name, "profit_percentage": profit}
+        for name, profit in Investment.objects.with_valuation(user).values_list('name', 'profit_pct')
+    ]
+
+
+def report_data(user, **params):
+    """``reporting.report`` plus the chart keys the reports page has always read."""
+    data = report(user, **params)
+    return {
+        **data,
+        'category_chart': [
+            {"category": c["category"], "total": c["total"]}
+            for c in data['categories'] if c['type'] == 'Expense'
+        ],
+        'months': data['labels'],
+        'income_values': data['income'],
+        'expense_values': data['expense'],
+    }
+
+
+def data_last_modified(request, *args, **kwargs):
+    """Last write to the requesting user's financial data, read from the already-loaded user row."""
+    return request.user.data_modified or request.user.date_joined
+
+
+def data_etag(request, *args, **kwargs):
+    modified = data_last_modified(request)
+    path = hashlib.md5(request.get_full_path().encode()).hexdigest()[:12]
+    return f"{request.user.pk}-{path}-{modified.timestamp():.6f}"
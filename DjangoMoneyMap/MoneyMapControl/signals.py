@@ -1,12 +1,80 @@
-from django.db.models.signals import post_save
+import threading
+from django.db import transaction
+from django.db.models import QuerySet
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
-from django.contrib.auth.models import User
-from .models import Profile
-
-@receiver(post_save, sender=User)
-def create_or_update_user_profile(sender, instance, created, **kwargs):
-    if created:
-        profile = Profile.objects.create(user=instance)
-        profile.assign_random_image()
-    else:
-        instance.profile.save()
+from .caching import bump_version
+from .blogs import blogs_changed
+from .categories import forget
+from .models import User, Blog, Category, Transaction, Budget, Goal, Investment, mark_data_modified
+
+def _deleting_user(origin):
+    return isinstance(origin, User) or (isinstance(origin, QuerySet) and origin.model is User)
+
+class _Changes:
+    """User ids changed in the current transaction, stamped by the first of its callbacks to run."""
+
+    __slots__ = ('user_ids', 'stamped')
+
+    def __init__(self):
+        self.user_ids = set()
+        self.stamped = False
+
+    def stamp(self):
+        if self.stamped:
+            return
+        self.stamped = True
+        user_ids = sorted(self.user_ids)
+        mark_data_modified(*user_ids)
+        bump_version(*user_ids)
+
+# Changes not yet stamped, per connection alias; connections are per thread too.
+_pending = threading.local()
+
+def data_changed_many(user_ids):
+    """Stamp ``user_ids``' data as modified once the surrounding transaction commits.
+
+    Every call queues its own on-commit callback, so none depends on another
+    surviving a savepoint rollback, but the callbacks share one set of ids:
+    the first to run stamps them all with a single update and the rest do
+    nothing. Bulk deletes that send a signal per row still cost one update.
+    Ids left over from a rolled back transaction are stamped with the next
+    commit, which only costs a spurious cache invalidation.
+    """
+    user_ids = set(user_ids)
+    if not user_ids:
+        return
+    alias = transaction.get_connection().alias
+    changes = getattr(_pending, alias, None)
+    if changes is None or changes.stamped:
+        changes = _Changes()
+        setattr(_pending, alias, changes)
+    changes.user_ids |= user_ids
+    transaction.on_commit(changes.stamp)
+
+def data_changed(user_id):
+    data_changed_many([user_id])
+
+@receiver(post_save, sender=Transaction)
+@receiver(post_save, sender=Budget)
+@receiver(post_save, sender=Goal)
+@receiver(post_save, sender=Investment)
+def saved(sender, instance, **kwargs):
+    data_changed(instance.user_id)
+
+@receiver(post_delete, sender=Transaction)
+@receiver(post_delete, sender=Budget)
+@receiver(post_delete, sender=Goal)
+@receiver(post_delete, sender=Investment)
+def deleted(sender, instance, origin=None, **kwargs):
+    if not _deleting_user(origin):
+        data_changed(instance.user_id)
+
+@receiver(post_delete, sender=Category)
+def category_deleted(sender, instance, **kwargs):
+    forget(instance)
+
+@receiver(post_save, sender=Blog)
+@receiver(post_delete, sender=Blog)
+def blog_changed(sender, instance, **kwargs):
+    transaction.on_commit(blogs_changed)
@@ -0,0 +1,119 @@
+import random
+from datetime import date, timedelta
+from decimal import Decimal
+import numpy as np
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db.transaction import atomic
+from . import ledger
+from .categories import resolve_many
+from .models import Transaction, Budget, Goal, Investment, category_key
+from .pricehistory import store_series
+from .signals import data_changed
+
+# (category, weight, low, high) - rough shape of a household's spending.
+EXPENSES = [
+    ('Groceries', 30, 5, 180), ('Dining', 18, 3, 90), ('Transport', 14, 2, 60),
+    ('Utilities', 6, 20, 250), ('Rent', 3, 600, 2500), ('Shopping', 10, 10, 400),
+    ('Health', 4, 10, 300), ('Entertainment', 8, 5, 120), ('Travel', 2, 80, 2000),
+    ('Subscriptions', 5, 3, 30),
+]
+INCOME = [('Salary', 70, 1500, 6000), ('Freelance', 20, 50, 1500), ('Interest', 10, 1, 80)]
+HOLDINGS = [
+    ('NIFTYBEES', 'Mutual Fund', 150, 300), ('TCS', 'Stock', 3000, 4200), ('INFY', 'Stock', 1300, 1900),
+    ('HDFCBANK', 'Stock', 1400, 1800), ('BTC', 'Crypto', 2000000, 6000000), ('ETH', 'Crypto', 100000, 300000),
+    ('GOLDBEES', 'Other', 40, 70), ('PPFAS Flexi Cap', 'Mutual Fund', 40, 90),
+]
+GOALS = ['Emergency fund', 'Car', 'House deposit', 'Vacation', 'Wedding', 'Education', 'Retirement']
+
+
+def _money(rng, low, high):
+    return Decimal(rng.uniform(low, high)).quantize(Decimal('0.01'))
+
+
+def _pick(rng, table):
+    category, _weight, low, high = rng.choices(table, weights=[row[1] for row in table])[0]
+    return category, _money(rng, low, high)
+
+
+def generate_transactions(user, count, rng, years=3, income_share=0.15):
+    categories = resolve_many(user.id, [('Income', row[0]) for row in INCOME] + [('Expense', row[0]) for row in EXPENSES])
+    end = date.today()
+    span = years * 365
+    for _ in range(count):
+        if rng.random() < income_share:
+            type_, (category, amount) = 'Income', _pick(rng, INCOME)
+        else:
+            type_, (category, amount) = 'Expense', _pick(rng, EXPENSES)
+        yield Transaction(
+            user=user, type=type_, category_id=categories[type_, category_key(category)], amount=amount,
+            date=end - timedelta(days=rng.randrange(span)),
+            description=f"{category} #{rng.randrange(10 ** 6)}",
+        )
+
+
+def seed_user(username, transactions=1000, budgets=8, goals=3, investments=6, seed=0, batch_size=5000):
+    """Create (or replace) ``username`` with a reproducible synthetic history.
+
+    Rows are written with ``bulk_create`` and the ledger summaries are rebuilt
+    once at the end instead of row by row.
+    """
+    rng = random.Random(f"{seed}:{username}")
+    User = get_user_model()
+    with atomic():
+        User.objects.filter(username=username).delete()
+        user = User.objects.create(username=username, password=_password_hash())
+
+        batch = []
+        for t in generate_transactions(user, transactions, rng):
+            batch.append(t)
+            if len(batch) >= batch_size:
+                Transaction.objects.bulk_create(batch)
+                batch = []
+        Transaction.objects.bulk_create(batch)
+
+        expense_ids = resolve_many(user.id, [('Expense', row[0]) for row in EXPENSES])
+        categories = [expense_ids['Expense', category_key(row[0])] for row in EXPENSES]
+        Budget.objects.bulk_create([
+            Budget(user=user, category_id=categories[i % len(categories)], limit=_money(rng, 100, 5000))
+            for i in range(budgets)
+        ])
+        Goal.objects.bulk_create([
+            Goal(user=user, name=GOALS[i % len(GOALS)], target_amount=target, saved_amount=_money(rng, 0, float(target)))
+            for i, target in enumerate(_money(rng, 10000, 500000) for _ in range(goals))
+        ])
+        Investment.objects.bulk_create([
+            Investment(
+                user=user, name=name, type=type_,
+                quantity=Decimal(rng.uniform(0.01, 200)).quantize(Decimal('0.0001')),
+                purchase_price=_money(rng, low, high), current_price=_money(rng, low, high),
+            )
+            for name, type_, low, high in rng.sample(HOLDINGS, min(investments, len(HOLDINGS)))
+        ])
+        ledger.rebuild(user_ids=[user.id])
+        data_changed(user.id)
+    return user
+
+
+def seed_price_history(years=3, seed=0, instruments=HOLDINGS):
+    """Store a random-walk daily price history for ``instruments`` ending today."""
+    rng = np.random.default_rng(seed)
+    days = round(years * 365.25) + 1
+    start = date.today() - timedelta(days=days - 1)
+    series = {}
+    for name, _type, low, high in instruments:
+        steps = rng.normal(0.0003, 0.02, days)
+        steps[0] = 0
+        series[name] = (start, np.round(rng.uniform(low, high) * np.exp(np.cumsum(steps)), 2))
+    return store_series(series)
+
+
+_hash = None
+
+
+def _password_hash():
+    """Every synthetic user shares the password ``synthetic``; hash it only once."""
+    global _hash
+    if _hash is None:
+        _hash = make_password('synthetic')
+    return _hash
@@ -0,0 +1,1426 @@
+import csv
+import gzip
+import json
+import math
+import re
+import statistics
+import tempfile
+import threading
+import time
+import unittest
+import unittest.mock
+from datetime import date, timedelta
+from decimal import Decimal
+from io import StringIO
+from asgiref.sync import async_to_sync
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection, connections
+from django.db.transaction import atomic
+from django.http import HttpResponse
+from django.test import Client, RequestFactory, TestCase as DjangoTestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from .models import Transaction, Investment, Goal, Budget, Blog, LedgerSummary, CategorySummary, MonthlyRollup
+from . import ledger
+from .importers import import_transactions, parse_csv, parse_ofx
+from . import caching
+from . import fanout
+from . import jobs
+from . import metrics
+from .services import transaction_totals, investment_totals, goal_totals, user_summary
+from .synthetic import seed_user
+from .batch import MAX_OPERATIONS
+from .forms import TransactionForm
+from .prices import load_prices, refresh_prices
+from . import pricehistory
+from .forecasting import forecast_goals, monthly_net_flow
+from .models import Category, Job, PriceHistory, RecurringRule
+from .categories import resolve as resolve_category, resolve_many
+from .recurring import materialize, materialize_for_user
+from .blogs import latest_blogs
+from .routers import replica_reads
+from . import reporting
+
+User = get_user_model()
+
+
+def category(user, name, type_='Expense'):
+    return Category.objects.get(pk=resolve_category(user.id, type_, name))
+
+
+# Rows a TestCase creates are uncommitted, so other connections cannot see
+# them; run async views' sections on the test's own connection instead.
+@override_settings(MONEYMAP_CONCURRENT_SECTIONS=False)
+class TestCase(DjangoTestCase):
+    def setUp(self):
+        # Per-user cache versions are only bumped on commit, which never
+        # happens inside a TestCase, and user ids are reused between tests.
+        cache.clear()
+        super().setUp()
+
+
+class SummaryServiceTests(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user(username='alice', password='pw-12345!')
+        self.other = User.objects.create_user(username='bob', password='pw-12345!')
+        amounts = ['1234.56', '0.01', '99999.99', '10.10', '0.99', '7.77']
+        for i, amount in enumerate(amounts):
+            type_ = ['Income', 'Expense', 'expense'][i % 3]
+            Transaction.objects.create(
+                user=self.user, type=type_,
+                category=category(self.user, 'Food', type_), amount=Decimal(amount), date=date(2025, 1, i + 1),
+            )
+        Transaction.objects.create(user=self.other, type='Income', category=category(self.other, 'Pay', 'Income'), amount=Decimal('500'), date=date(2025, 1, 1))
+        Investment.objects.create(user=self.user, name='ACME', type='Stock', quantity=Decimal('1.5000'),
+                                  purchase_price=Decimal('100.25'), current_price=Decimal('120.33'))
+        Investment.objects.create(user=self.user, name='BTC', type='Crypto', quantity=Decimal('0.0123'),
+                                  purchase_price=Decimal('45000.00'), current_price=Decimal('39999.99'))
+        Goal.objects.create(user=self.user, name='Car', target_amount=Decimal('1000'), saved_amount=Decimal('333.33'))
+
+    def test_transaction_totals_match_python_loop(self):
+        transactions = Transaction.objects.filter(user=self.user)
+        income = sum(t.amount for t in transactions if t.type.lower() == 'income')
+        expense = sum(t.amount for t in transactions if t.type.lower() == 'expense')
+
+        with self.assertNumQueries(1):
+            totals = transaction_totals(self.user)
+
+        self.assertEqual(totals['total_income'], income)
+        self.assertEqual(totals['total_expense'], expense)
+        self.assertEqual(totals['balance'], income - expense)
+        self.assertIsInstance(totals['balance'], Decimal)
+
+    def test_investment_totals_match_python_loop(self):
+        investments = Investment.objects.filter(user=self.user)
+        invested = sum(inv.quantity * inv.purchase_price for inv in investments)
+        current = sum(inv.current_value for inv in investments)
+
+        totals = investment_totals(self.user)
+
+        self.assertEqual(totals['total_invested'], invested)
+        self.assertEqual(totals['total_current'], current)
+        self.assertEqual(totals['net_gain_loss'], current - invested)
+
+    def test_empty_user_totals_are_decimal_zero(self):
+        summary = user_summary(User.objects.create_user(username='empty', password='pw-12345!'))
+        for key in ('total_income', 'total_expense', 'balance', 'total_invested', 'total_current'):
+            self.assertEqual(summary[key], Decimal('0'))
+            self.assertIsInstance(summary[key], Decimal)
+        self.assertEqual(summary['goals_progress'], 0)
+
+    def test_goal_totals(self):
+        totals = goal_totals(self.user)
+        self.assertEqual(totals['goals_saved'], Decimal('333.33'))
+        self.assertEqual(totals['goals_progress'], Decimal('33.33'))
+
+    def test_dashboard_data_uses_aggregates(self):
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('dashboard_data'))
+        totals = transaction_totals(self.user)
+        self.assertEqual(response.json()['balance'], float(totals['balance']))
+
+    def test_dashboard_renders_totals(self):
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('dashboard'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['balance'], transaction_totals(self.user)['balance'])
+
+
+class BudgetSpendingTests(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user(username='alice', password='pw-12345!')
+        for i in range(30):
+            Budget.objects.create(user=self.user, category=category(self.user, f'Cat{i}'), limit=Decimal('100.00'))
+            Transaction.objects.create(user=self.user, type='Expense', category=category(self.user, f'Cat{i}'),
+                                       amount=Decimal('40.25') * (i % 4), date=date(2025, 2, 1))
+        Transaction.objects.create(user=self.user, type='Income', category=category(self.user, 'Cat1', 'Income'), amount=Decimal('999'), date=date(2025, 2, 1))
+
+    def test_with_spending_is_one_query(self):
+        with self.assertNumQueries(1):
+            rows = [(b.spent, b.percent, b.exceeded) for b in Budget.objects.with_spending(self.user)]
+        self.assertEqual(len(rows), 30)
+
+    def test_annotated_values_match_unannotated(self):
+        annotated = {b.pk: b for b in Budget.objects.with_spending(self.user)}
+        for b in Budget.objects.filter(user=self.user):
+            expected = sum(t.amount for t in Transaction.objects.filter(
+                user=self.user, category__name=b.category.name, type__iexact='Expense'))
+            self.assertEqual(b.spent, expected)
+            self.assertEqual(annotated[b.pk].spent, expected)
+            self.assertEqual(annotated[b.pk].percent, b.percent)
+            self.assertEqual(annotated[b.pk].exceeded, b.exceeded)
+
+    def test_budget_without_expenses_spends_zero(self):
+        b = Budget.objects.create(user=self.user, category=category(self.user, 'Unused'), limit=Decimal('10'))
+        self.assertEqual(b.spent, Decimal('0'))
+        self.assertFalse(b.exceeded)
+
+
+class LedgerSummaryTests(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user(username='alice', password='pw-12345!')
+        self.client.force_login(self.user)
+
+    def post_transaction(self, **data):
+        payload = {'type': 'Expense', 'category': 'Food', 'amount': '10.10', 'date': '2025-03-01', 'description': ''}
+        payload.update(data)
+        return self.client.post(reverse('transactions'), payload, HTTP_X_REQUESTED_WITH='XMLHttpRequest')
+
+    def category(self, type_, name):
+        return CategorySummary.objects.get(user=self.user, type=type_, category__name=name)
+
+    def test_create_edit_delete_keep_summaries_in_sync(self):
+        self.post_transaction(amount='10.10')
+        self.post_transaction(type='Income', category='Salary', amount='2500.00')
+        t = Transaction.objects.get(user=self.user, category__name='Food')
+
+        self.post_transaction(transaction_id=t.id, type='Income', category='Gift', amount='3.30')
+        self.assertEqual(self.category('Expense', 'Food').total, Decimal('0'))
+        self.assertEqual(self.category('Income', 'Gift').total, Decimal('3.30'))
+
+        response = self.client.post(
+            reverse('transactions'), json.dumps({'action': 'delete', 'delete_id': t.id}),
+            content_type='application/json', HTTP_X_REQUESTED_WITH='XMLHttpRequest',
+        )
+        self.assertEqual(response.json()['balance'], 2500.0)
+        summary = LedgerSummary.objects.get(user=self.user)
+        self.assertEqual((summary.total_income, summary.total_expense, summary.transaction_count),
+                         (Decimal('2500.00'), Decimal('0'), 1))
+        self.assertEqual(ledger.verify([self.user.id]), [])
+
+    def test_budget_update_action_records_expense(self):
+        b = Budget.objects.create(user=self.user, category=category(self.user, 'Rent'), limit=Decimal('1000'))
+        self.client.post(
+            reverse('budget'), json.dumps({'action': 'update', 'id': b.id, 'spent_amount': '450.55'}),
+            content_type='application/json', HTTP_X_REQUESTED_WITH='XMLHttpRequest',
+        )
+        self.assertEqual(self.category('Expense', 'Rent').total, Decimal('450.55'))
+        self.assertEqual(Budget.objects.with_spending(self.user).get().spent, Decimal('450.55'))
+
+    def test_verify_detects_and_rebuild_fixes_drift(self):
+        self.post_transaction(amount='10.10')
+        LedgerSummary.objects.filter(user=self.user).update(total_expense=Decimal('99'))
+        CategorySummary.objects.filter(user=self.user).delete()
+
+        with self.assertRaises(CommandError):
+            call_command('rebuild_ledger', '--verify', stdout=StringIO())
+        call_command('rebuild_ledger', stdout=StringIO())
+        call_command('rebuild_ledger', '--verify', stdout=StringIO())
+        self.assertEqual(LedgerSummary.objects.get(user=self.user).total_expense, Decimal('10.10'))
+
+    def test_save_without_ledger_fields_recomputes_in_a_job(self):
+        self.post_transaction(amount='10.10')
+        t = Transaction.objects.only('id', 'user_id').get(user=self.user)
+        t.amount = Decimal('20.20')
+        t.save()
+        self.assertTrue(Job.objects.filter(name='recompute_user', key=f'recompute_user:{self.user.id}').exists())
+        jobs.work(burst=True)
+        self.assertEqual(LedgerSummary.objects.get(user=self.user).total_expense, Decimal('20.20'))
+        self.assertEqual(ledger.verify([self.user.id]), [])
+
+
+class MonthlyRollupTests(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user(username='alice', password='pw-12345!')
+        self.client.force_login(self.user)
+        for day, type_, name, amount in [
+            (date(2024, 12, 31), 'Income', 'Salary', '3000.00'),
+            (date(2025, 1, 5), 'Expense', 'Food', '12.34'),
+            (date(2025, 1, 20), 'Expense', 'Food', '0.66'),
+            (date(2025, 3, 1), 'Expense', 'Rent', '800.00'),
+        ]:
+            Transaction.objects.create(user=self.user, type=type_, category=category(self.user, name, type_),
+                                       amount=Decimal(amount), date=day)
+
+    def test_rollups_follow_date_moves(self):
+        rollup = MonthlyRollup.objects.get(user=self.user, month=date(2025, 1, 1), category__name='Food')
+        self.assertEqual((rollup.total, rollup.count), (Decimal('13.00'), 2))
+
+        t = Transaction.objects.get(user=self.user, amount=Decimal('0.66'))
+        t.date = date(2025, 2, 14)
+        t.save()
+        self.assertEqual(MonthlyRollup.objects.get(user=self.user, month=date(2025, 2, 1)).total, Decimal('0.66'))
+        self.assertEqual(MonthlyRollup.objects.get(user=self.user, month=date(2025, 1, 1)).count, 1)
+        self.assertEqual(ledger.verify([self.user.id]), [])
+
+    def test_reports_reads_rollups(self):
+        response = self.client.get(reverse('reports'))
+        self.assertEqual(json.loads(response.context['months']), ['2024-12', '2025-01', '2025-02', '2025-03'])
+        self.assertEqual(json.loads(response.context['income_values']), [3000.0, 0, 0, 0])
+        self.assertEqual(json.loads(response.context['expense_values']), [0, 13.0, 0, 800.0])
+        self.assertEqual(json.loads(response.context['category_chart'])[0], {'category': 'Rent', 'total': 800.0})
+
+
+@unittest.skipUnless(connection.vendor == 'sqlite', "EXPLAIN QUERY PLAN is SQLite syntax")
+class QueryPlanTests(TestCase):
+    VIEWS = ['dashboard', 'dashboard_data', 'transactions', 'budget', 'goals', 'investments', 'reports']
+    FULL_SCAN = re.compile(r'^SCAN (?!.* USING (COVERING )?INDEX )')
+
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user(username='alice', password='pw-12345!')
+        self.client.force_login(self.user)
+        for i in range(20):
+            type_ = ['Income', 'Expense'][i % 2]
+            Transaction.objects.create(user=self.user, type=type_, category=category(self.user, f'Cat{i % 4}', type_),
+                                       amount=Decimal('10.00'), date=date(2025, 1 + i % 12, 1))
+        Budget.objects.create(user=self.user, category=category(self.user, 'Cat1'), limit=Decimal('50'))
+        Goal.objects.create(user=self.user, name='Trip', target_amount=Decimal('100'))
+        Investment.objects.create(user=self.user, name='ACME', type='Stock', quantity=1, purchase_price=1, current_price=2)
+        Blog.objects.create(title='Saving tips', excerpt='...', content='...')
+
+    def test_transaction_types_are_normalized(self):
+        t = Transaction.objects.create(user=self.user, type=' expense', category=category(self.user, 'Cat0'),
+                                       amount=Decimal('1'), date=date(2025, 1, 1))
+        t.refresh_from_db()
+        self.assertEqual(t.type, 'Expense')
+
+    def test_view_queries_do_not_scan_tables(self):
+        for name in self.VIEWS:
+            with CaptureQueriesContext(connection) as ctx:
+                self.assertEqual(self.client.get(reverse(name)).status_code, 200)
+            for query in ctx.captured_queries:
+                sql = query['sql']
+                if not sql.startswith('SELECT'):
+                    continue
+                with connection.cursor() as cursor:
+                    cursor.execute('EXPLAIN QUERY PLAN ' + sql)
+                    plan = [row[-1] for row in cursor.fetchall()]
+                scans = [step for step in plan if self.FULL_SCAN.match(step)]
+                self.assertEqual(scans, [], f"{name}: {sql}\n" + "\n".join(plan))
+
+
+class TransactionPaginationTests(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user(username='alice', password='pw-12345!')
+        self.client.force_login(self.user)
+        for i in range(25):
+            type_ = ['Income', 'Expense'][i % 2]
+            Transaction.objects.create(user=self.user, type=type_, category=category(self.user, f'Cat{i % 3}', type_),
+                                       amount=Decimal(i + 1), date=date(2025, 1, 1 + i // 4))
+
+    def walk(self, **params):
+        seen, cursor = [], None
+        while True:
+            query = dict(params, limit=4)
+            if cursor:
+                query['cursor'] = cursor
+            data = self.client.get(reverse('transactions_data'), query).json()
+            seen += [row['id'] for row in data['transactions']]
+            cursor = data['next_cursor']
+            if not cursor:
+                return seen
+
+    def test_cursor_walk_returns_every_row_once_in_order(self):
+        expected = list(Transaction.objects.filter(user=self.user).order_by('-date', '-id').values_list('id', flat=True))
+        self.assertEqual(self.walk(), expected)
+
+    def test_filters_apply_to_every_page(self):
+        expected = list(
+            Transaction.objects.filter(user=self.user, type='Expense', category__name='Cat1', date__gte=date(2025, 1, 3))
+            .order_by('-date', '-id').values_list('id', flat=True)
+        )
+        self.assertEqual(self.walk(type='expense', category='Cat1', start='2025-01-03'), expected)
+
+    def test_deep_pages_seek_instead_of_offset(self):
+        last = Transaction.objects.filter(user=self.user).order_by('date', 'id').first()
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get(reverse('transactions_data'), {'cursor': f"{last.date}.{last.id + 1}"})
+        self.assertFalse(any('OFFSET' in q['sql'] for q in ctx.captured_queries))
+
+    def test_invalid_cursor_is_rejected(self):
+        response = self.client.get(reverse('transactions_data'), {'cursor': 'yesterday'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_html_page_links_next_page(self):
+        response = self.client.get(reverse('transactions'), {'type': 'Income'})
+        self.assertEqual(len(response.context['transactions']), 13)
+        self.assertIsNone(response.context['next_query'])
+        response = self.client.get(reverse('transactions'))
+        self.assertEqual(len(response.context['transactions']), 25)
+
+
+class TransactionImportTests(TestCase):
+    CSV = (
+        "Date,Type,Category,Amount,Description\n"
+        "2025-01-02,Expense,Food,12.50,Lunch\n"
+        "2025-01-03,income,Salary,3000,\n"
+        "not-a-date,Expense,Food,1,Bad\n"
+        "2025-01-04,,Misc,-7.25,Signed amount\n"
+        "2025-01-02,Expense,Food,12.50,Lunch\n"
+    )
+    OFX = (
+        "OFXHEADER:100\n<OFX><BANKMSGSRSV1><STMTTRNRS><STMTRS><BANKTRANLIST>\n"
+        "<STMTTRN><TRNTYPE>DEBIT<DTPOSTED>20250110120000[-5:EST]<TRNAMT>-42.10<NAME>AMAZON</STMTTRN>\n"
+        "<STMTTRN>\n<TRNTYPE>CREDIT\n<DTPOSTED>20250115\n<TRNAMT>1500.00\n<MEMO>Payroll\n</STMTTRN>\n"
+        "</BANKTRANLIST></STMTRS></STMTTRNRS></BANKMSGSRSV1></OFX>\n"
+    )
+
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user(username='alice', password='pw-12345!')
+
+    def test_csv_import_validates_dedupes_and_updates_summaries(self):
+        report = import_transactions(self.user, parse_csv(StringIO(self.CSV)), batch_size=2)
+        self.assertEqual((report.rows, report.created, report.duplicates, report.error_count), (5, 4, 0, 1))
+        self.assertEqual(report.errors[0]['line'], 4)
+        self.assertIn('date', report.errors[0]['errors'])
+        self.assertEqual(Transaction.objects.get(category__name='Misc').type, 'Expense')
+
+        report = import_transactions(self.user, parse_csv(StringIO(self.CSV)))
+        self.assertEqual((report.created, report.duplicates), (0, 4))
+        self.assertEqual(ledger.verify([self.user.id]), [])
+        self.assertEqual(LedgerSummary.objects.get(user=self.user).total_expense, Decimal('32.25'))
+        self.assertEqual(Transaction.objects.filter(user=self.user, description='Lunch').count(), 2)
+
+    def test_ofx_import(self):
+        report = import_transactions(self.user, parse_ofx(StringIO(self.OFX)))
+        self.assertEqual(report.created, 2)
+        amazon = Transaction.objects.get(user=self.user, type='Expense')
+        self.assertEqual((amazon.date, amazon.amount, amazon.description), (date(2025, 1, 10), Decimal('42.10'), 'AMAZON'))
+
+    def test_upload_endpoint_and_command(self):
+        self.client.force_login(self.user)
+        upload = SimpleUploadedFile('statement.ofx', self.OFX.encode())
+        response = self.client.post(reverse('transactions_import'), {'file': upload})
+        self.assertEqual(response.json()['created'], 2)
+        self.assertIn('rows_per_second', response.json())
+
+        with tempfile.NamedTemporaryFile('w', suffix='.csv') as f:
+            f.write(self.CSV)
+            f.flush()
+            call_command('import_transactions', 'alice', f.name, stdout=StringIO(), stderr=StringIO())
+        self.assertEqual(Transaction.objects.filter(user=self.user).count(), 6)
+
+
+class ExportTests(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user(username='alice', password='pw-12345!')
+        self.client.force_login(self.user)
+        for i in range(5):
+            Transaction.objects.create(user=self.user, type='Expense', category=category(self.user, 'Food'), amount=Decimal('1.05') * (i + 1),
+                                       date=date(2025, 1, 5 - i), description=f'meal, "{i}"')
+        Budget.objects.create(user=self.user, category=category(self.user, 'Food'), limit=Decimal('20'))
+
+    def export(self, dataset, **params):
+        response = self.client.get(reverse('export', args=[dataset]), params)
+        self.assertTrue(response.streaming)
+        return response, b''.join(response.streaming_content)
+
+    def test_csv_export_round_trips(self):
+        response, body = self.export('transactions')
+        self.assertIn('attachment; filename="transactions.csv"', response['Content-Disposition'])
+        rows = list(csv.DictReader(body.decode().splitlines()))
+        self.assertEqual(len(rows), 5)
+        self.assertEqual(rows[0]['date'], '2025-01-01')
+        self.assertEqual(rows[0]['description'], 'meal, "4"')
+
+    def test_ndjson_gzip_export(self):
+        response, body = self.export('budgets', format='ndjson', gzip='1')
+        self.assertEqual(response['Content-Type'], 'application/gzip')
+        rows = [json.loads(line) for line in gzip.decompress(body).decode().splitlines()]
+        self.assertEqual(rows[0]['spent_amount'], '15.75')
+
+    def test_unknown_dataset_is_404(self):
+        self.assertEqual(self.client.get(reverse('export', args=['passwords'])).status_code, 404)
+
+
+class VersionedCacheTests(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user(username='alice', password='pw-12345!')
+        self.client.force_login(self.user)
+        with self.captureOnCommitCallbacks(execute=True):
+            Transaction.objects.create(user=self.user, type='Income', category=category(self.user, 'Pay', 'Income'), amount=Decimal('100'), date=date(2025, 1, 1))
+            Budget.objects.create(user=self.user, category=category(self.user, 'Food'), limit=Decimal('50'))
+            Investment.objects.create(user=self.user, name='ACME', type='Stock', quantity=2, purchase_price=5, current_price=7)
+        caching.reset_stats()
+
+    def test_second_dashboard_load_is_served_from_cache(self):
+        with CaptureQueriesContext(connection) as cold:
+            self.client.get(reverse('dashboard'))
+        with CaptureQueriesContext(connection) as warm:
+            response = self.client.get(reverse('dashboard'))
+        app_tables = ('transaction', 'budget', 'goal', 'investment', 'summary', 'rollup', 'blog')
+        self.assertTrue(any(t in q['sql'] for q in cold.captured_queries for t in app_tables))
+        self.assertFalse(any(t in q['sql'] for q in warm.captured_queries for t in app_tables))
+        self.assertEqual(response.context['total_current'], Decimal('14'))
+        self.assertEqual(caching.stats()['misses'], 7)
+        self.assertEqual(caching.stats()['hits'], 7)
+
+    def test_writes_bump_the_version(self):
+        self.assertEqual(self.client.get(reverse('dashboard_data')).json()['balance'], 100.0)
+        with self.captureOnCommitCallbacks(execute=True):
+            Transaction.objects.create(user=self.user, type='Expense', category=category(self.user, 'Food'), amount=Decimal('30'), date=date(2025, 1, 2))
+        self.assertEqual(self.client.get(reverse('dashboard_data')).json()['balance'], 70.0)
+        with self.captureOnCommitCallbacks(execute=True):
+            Budget.objects.get(user=self.user).delete()
+        self.assertEqual(self.client.get(reverse('dashboard')).context['budgets'], [])
+        self.assertEqual(caching.stats()['bumps'], 2)
+
+    def test_file_based_cache(self):
+        with tempfile.TemporaryDirectory() as location:
+            backend = {'default': {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': location}}
+            with override_settings(CACHES=backend):
+                calls = []
+                compute = lambda: calls.append(1) or {'total': Decimal('1.10')}
+                self.assertEqual(caching.cached(self.user.id, 'x', compute), {'total': Decimal('1.10')})
+                self.assertEqual(caching.cached(self.user.id, 'x', compute), {'total': Decimal('1.10')})
+                caching.bump_version(self.user.id)
+                caching.cached(self.user.id, 'x', compute)
+                self.assertEqual(len(calls), 2)
+
+
+class ConditionalGetTests(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user(username='alice', password='pw-12345!')
+        self.client.force_login(self.user)
+        with self.captureOnCommitCallbacks(execute=True):
+            Transaction.objects.create(user=self.user, type='Income', category=category(self.user, 'Pay', 'Income'), amount=Decimal('100'), date=date(2025, 1, 1))
+            Investment.objects.create(user=self.user, name='ACME', type='Stock', quantity=2, purchase_price=5, current_price=7)
+
+    def test_unchanged_data_answers_304(self):
+        for name in ('dashboard_data', 'reports_data', 'investments_data'):
+            first = self.client.get(reverse(name))
+            self.assertEqual(first.status_code, 200)
+            self.assertIn('private', first['Cache-Control'])
+            with CaptureQueriesContext(connection) as ctx:
+                second = self.client.get(reverse(name), HTTP_IF_NONE_MATCH=first['ETag'])
+            self.assertEqual(second.status_code, 304, name)
+            self.assertFalse(any('transaction' in q['sql'] or 'investment' in q['sql'] for q in ctx.captured_queries))
+
+    def test_write_changes_etag(self):
+        etag = self.client.get(reverse('reports_data'))['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            Transaction.objects.create(user=self.user, type='Expense', category=category(self.user, 'Food'), amount=Decimal('5'), date=date(2025, 2, 1))
+        response = self.client.get(reverse('reports_data'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['expense_values'], [0, 5.0])
+
+    def test_bulk_delete_stamps_once(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            for i in range(5):
+                Transaction.objects.create(user=self.user, type='Expense', category=category(self.user, 'Food'), amount=Decimal('1'), date=date(2025, 2, 1))
+        with CaptureQueriesContext(connection) as ctx, self.captureOnCommitCallbacks(execute=True):
+            Transaction.objects.filter(user=self.user, category__name='Food').delete()
+        stamps = [q for q in ctx.captured_queries if q['sql'].startswith('UPDATE') and 'data_modified' in q['sql']]
+        self.assertEqual(len(stamps), 1)
+
+    def test_change_after_rolled_back_savepoint_is_stamped(self):
+        User.objects.filter(pk=self.user.pk).update(data_modified=None)
+        with self.captureOnCommitCallbacks(execute=True):
+            try:
+                with atomic():
+                    Transaction.objects.create(user=self.user, type='Expense', category=category(self.user, 'Food'), amount=Decimal('5'), date=date(2025, 2, 1))
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+            Goal.objects.create(user=self.user, name='Trip', target_amount=Decimal('100'))
+        self.user.refresh_from_db()
+        self.assertIsNotNone(self.user.data_modified)
+
+
+class SyntheticDataTests(TestCase):
+    def test_seed_user_is_reproducible_and_consistent(self):
+        first = seed_user('synthetic-test', transactions=300, budgets=4, goals=2, investments=3, seed=7)
+        amounts = list(Transaction.objects.filter(user=first).order_by('id').values_list('amount', flat=True))
+        second = seed_user('synthetic-test', transactions=300, budgets=4, goals=2, investments=3, seed=7)
+
+        self.assertFalse(get_user_model().objects.filter(pk=first.pk).exists())
+        self.assertEqual(list(Transaction.objects.filter(user=second).order_by('id').values_list('amount', flat=True)), amounts)
+        self.assertEqual(Budget.objects.filter(user=second).count(), 4)
+        self.assertEqual(LedgerSummary.objects.get(user=second).transaction_count, 300)
+        self.assertEqual(ledger.verify([second.id]), [])
+
+
+class MetricsTests(TestCase):
+    def setUp(self):
+        super().setUp()
+        metrics.reset()
+        self.user = get_user_model().objects.create_user(username='ops', password='pw', is_staff=True)
+        self.client.force_login(self.user)
+
+    def test_metrics_per_url_name(self):
+        self.client.get(reverse('dashboard'))
+        body = self.client.get(reverse('metrics')).content.decode()
+        self.assertIn('moneymap_request_duration_seconds_count{view="dashboard"} 1', body)
+        self.assertIn('moneymap_requests_total{view="dashboard",method="GET",status="200"} 1', body)
+        queries = re.search(r'^moneymap_db_queries_total\{view="dashboard"\} (\d+)$', body, re.M)
+        self.assertGreater(int(queries.group(1)), 0)
+        render = re.search(r'^moneymap_template_render_seconds_total\{view="dashboard"\} ([\d.]+)$', body, re.M)
+        self.assertGreater(float(render.group(1)), 0)
+        self.assertRegex(body, r'moneymap_instrumented_requests_total [1-9]')
+        self.assertEqual(metrics.totals('dashboard')[:2], (1, int(queries.group(1))))
+        self.assertEqual(metrics.totals('reports'), (0, 0, 0.0))
+
+    def test_metrics_staff_only(self):
+        self.user.is_staff = False
+        self.user.save()
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, 302)
+
+    async def test_sync_view_queries_counted_under_asgi(self):
+        await self.async_client.aforce_login(self.user)
+        response = await self.async_client.get(reverse('budget'))
+        self.assertEqual(response.status_code, 200)
+        queries = re.search(r'^moneymap_db_queries_total\{view="budget"\} (\d+)$', metrics.render(), re.M)
+        self.assertGreater(int(queries.group(1)), 0)
+
+    def test_static_files_served_without_a_thread_under_asgi(self):
+        from .middleware import StaticFilesMiddleware
+
+        async def app(request):
+            return HttpResponse('view')
+
+        with tempfile.TemporaryDirectory() as directory:
+            with open(f'{directory}/site.css', 'w') as f:
+                f.write('body {}')
+            middleware = StaticFilesMiddleware(app)
+            middleware.add_files(directory, prefix='static/')
+            static = async_to_sync(middleware)(RequestFactory().get('/static/site.css'))
+            other = async_to_sync(middleware)(RequestFactory().get('/dashboard/'))
+            self.assertEqual(b''.join(static.streaming_content), b'body {}')
+            static.close()
+        self.assertEqual(other.content, b'view')
+
+    @override_settings(MONEYMAP_SLOW_REQUEST_MS=0)
+    def test_slow_requests_logged_with_sql(self):
+        with self.assertLogs('MoneyMapControl.performance', 'WARNING') as logs:
+            self.client.get(reverse('budget'))
+        self.assertIn('(budget)', logs.output[0])
+        self.assertIn('SELECT', logs.output[0])
+
+
+class TransactionBatchTests(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = get_user_model().objects.create_user(username='batch', password='pw')
+        self.client.force_login(self.user)
+        self.keep = Transaction.objects.create(user=self.user, type='Income', category=category(self.user, 'Pay', 'Income'), amount=Decimal('1000'), date=date(2025, 1, 5))
+        self.edit = Transaction.objects.create(user=self.user, type='Expense', category=category(self.user, 'Food'), amount=Decimal('40'), date=date(2025, 1, 6))
+        self.drop = Transaction.objects.create(user=self.user, type='Expense', category=category(self.user, 'Fuel'), amount=Decimal('60'), date=date(2025, 2, 1))
+
+    def post(self, operations):
+        return self.client.post(reverse('transactions_batch'), json.dumps({'operations': operations}), content_type='application/json')
+
+    def test_mixed_batch_applies_once(self):
+        operations = [
+            {'op': 'create', 'data': {'type': 'expense', 'category': 'Rent', 'amount': '300', 'date': '2025-02-03'}},
+            {'op': 'update', 'id': self.edit.id, 'data': {'amount': '55.50', 'category': 'Dining'}},
+            {'op': 'delete', 'id': self.drop.id},
+        ]
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.post(operations)
+        self.assertEqual(response.status_code, 200, response.content)
+        body = response.json()
+        self.assertEqual([r['status'] for r in body['results']], ['created', 'updated', 'deleted'])
+        self.assertEqual(body['expense'], 355.5)
+        self.assertEqual(body['balance'], 644.5)
+        self.assertLess(len(ctx.captured_queries), 40)
+
+        created = Transaction.objects.get(pk=body['results'][0]['id'])
+        self.assertEqual(created.type, 'Expense')
+        self.edit.refresh_from_db()
+        self.assertEqual((self.edit.category.name, self.edit.amount, self.edit.date), ('Dining', Decimal('55.50'), date(2025, 1, 6)))
+        self.assertFalse(Transaction.objects.filter(pk=self.drop.pk).exists())
+        self.assertEqual(ledger.verify([self.user.id]), [])
+
+    def test_invalid_operation_rolls_back_everything(self):
+        other = get_user_model().objects.create_user(username='other', password='pw')
+        foreign = Transaction.objects.create(user=other, type='Expense', category=category(other, 'X'), amount=Decimal('1'), date=date(2025, 1, 1))
+        response = self.post([
+            {'op': 'create', 'data': {'type': 'Expense', 'category': 'Rent', 'amount': '300', 'date': '2025-02-03'}},
+            {'op': 'update', 'id': self.edit.id, 'data': {'amount': 'lots'}},
+            {'op': 'delete', 'id': foreign.id},
+            {'op': 'delete', 'id': self.drop.id},
+            {'op': 'delete', 'id': self.drop.id},
+        ])
+        self.assertEqual(response.status_code, 400)
+        results = response.json()['results']
+        self.assertEqual([r['status'] for r in results], ['skipped', 'error', 'error', 'skipped', 'error'])
+        self.assertIn('amount', results[1]['errors'])
+        self.assertEqual(Transaction.objects.filter(user=self.user).count(), 3)
+        self.assertTrue(Transaction.objects.filter(pk=foreign.pk).exists())
+        self.assertFalse(Category.objects.filter(user=self.user, name='Rent').exists())
+
+    def test_rejects_malformed_requests(self):
+        self.assertEqual(self.client.post(reverse('transactions_batch'), 'nope', content_type='application/json').status_code, 400)
+        self.assertEqual(self.post({'op': 'create'}).status_code, 400)
+        self.assertEqual(self.post([{'op': 'delete', 'id': 1}] * (MAX_OPERATIONS + 1)).status_code, 400)
+
+
+class InvestmentPriceTests(TestCase):
+    def setUp(self):
+        super().setUp()
+        User = get_user_model()
+        self.alice = User.objects.create_user(username='alice', password='pw')
+        self.bob = User.objects.create_user(username='bob', password='pw')
+        for user in (self.alice, self.bob):
+            Investment.objects.create(user=user, name='ACME', type='Stock', quantity=Decimal('2'), purchase_price=Decimal('10'), current_price=Decimal('10'))
+        Investment.objects.create(user=self.alice, name='BTC', type='Crypto', quantity=Decimal('0.5'), purchase_price=Decimal('100'), current_price=Decimal('90'))
+        Investment.objects.create(user=self.alice, name='Gift', type='Other', quantity=Decimal('1'), purchase_price=Decimal('0'), current_price=Decimal('5'))
+
+    def test_valuation_matches_python_properties(self):
+        annotated = {inv.pk: inv for inv in Investment.objects.with_valuation()}
+        for inv in Investment.objects.all():
+            self.assertEqual(annotated[inv.pk].current_value, inv.current_value)
+            self.assertEqual(annotated[inv.pk].gain_loss, inv.gain_loss)
+            self.assertAlmostEqual(annotated[inv.pk].profit_percentage, inv.profit_percentage)
+
+    def test_refresh_updates_every_holder_in_bulk(self):
+        with CaptureQueriesContext(connection) as ctx:
+            report = refresh_prices({'ACME': Decimal('12.50'), 'BTC': Decimal('90.00'), 'NOPE': Decimal('1')})
+        self.assertEqual(report, {'instruments': 3, 'updated': 2, 'users': 2, 'unknown': ['NOPE']})
+        self.assertEqual(sum('UPDATE' in q['sql'] for q in ctx.captured_queries), 1)
+        self.assertEqual(set(Investment.objects.filter(name='ACME').values_list('current_price', flat=True)), {Decimal('12.50')})
+        self.assertEqual(investment_totals(self.bob)['net_gain_loss'], Decimal('5'))
+
+    def test_command_and_user_scope(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False) as f:
+            f.write('name,price\nACME,11\n')
+        self.assertEqual(load_prices(f.name), {'ACME': Decimal('11.00')})
+        call_command('refresh_prices', f.name, user='alice', stdout=StringIO())
+        self.assertEqual(Investment.objects.get(user=self.alice, name='ACME').current_price, Decimal('11'))
+        self.assertEqual(Investment.objects.get(user=self.bob, name='ACME').current_price, Decimal('10'))
+
+    def test_anonymous_price_update_redirects_to_login(self):
+        from django.conf import settings
+        response = self.client.post(reverse('investments'), '{"action": "prices", "prices": {"ACME": 1}}',
+                                    content_type='application/json', HTTP_X_REQUESTED_WITH='XMLHttpRequest')
+        self.assertEqual(response.status_code, 302)
+        self.assertTrue(response['Location'].startswith(settings.LOGIN_URL))
+        self.assertEqual(Investment.objects.get(user=self.alice, name='ACME').current_price, Decimal('10'))
+
+    def test_prices_endpoint_is_staff_only_and_validates(self):
+        url = reverse('investment_prices')
+        self.client.force_login(self.alice)
+        self.assertEqual(self.client.post(url, '{"prices": {"ACME": 1}}', content_type='application/json').status_code, 302)
+        self.alice.is_staff = True
+        self.alice.save()
+        self.assertEqual(self.client.post(url, '{"prices": {"ACME": "x"}}', content_type='application/json').status_code, 400)
+        response = self.client.post(url, '{"prices": {"ACME": 15}}', content_type='application/json')
+        self.assertEqual(response.json()['updated'], 2)
+
+
+class PriceHistoryTests(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = get_user_model().objects.create_user(username='hist', password='pw')
+
+    def test_series_spans_years_and_points_overwrite(self):
+        pricehistory.store_series({'ACME': (date(2023, 12, 30), [10, 11, 12, 13])})
+        pricehistory.store_points([('ACME', date(2024, 1, 2), Decimal('20')), ('ACME', date(2024, 1, 5), Decimal('25'))])
+        self.assertEqual(PriceHistory.objects.filter(instrument='ACME').count(), 2)
+        self.assertEqual(len(PriceHistory.objects.get(instrument='ACME', year=2024).prices), 366 * 8)
+
+        dates, matrix = pricehistory.load_matrix(['ACME', 'NONE'], date(2023, 12, 29), date(2024, 1, 6), fallback=[0, 7])
+        self.assertEqual(str(dates[0]), '2023-12-29')
+        self.assertEqual(matrix[0].tolist(), [10, 10, 11, 12, 20, 20, 20, 25, 25])
+        self.assertEqual(matrix[1].tolist(), [7] * 9)
+
+    def test_analytics(self):
+        values = [100, 110, 99, 120]
+        self.assertAlmostEqual(pricehistory.time_weighted_return(values), 0.2)
+        self.assertAlmostEqual(pricehistory.max_drawdown(values), 99 / 110 - 1)
+        logs = [math.log(110 / 100), math.log(99 / 110), math.log(120 / 99)]
+        self.assertAlmostEqual(pricehistory.volatility(values), statistics.stdev(logs) * math.sqrt(365))
+        matrix = pricehistory.max_drawdown([[1, 2, 1], [4, 2, 1]])
+        self.assertEqual(matrix.tolist(), [-0.5, -0.75])
+
+    def test_portfolio_history_and_view(self):
+        end = date.today()
+        start = end - timedelta(days=10)
+        pricehistory.store_series({'ACME': (start, [10] * 5 + [20] * 6)})
+        Investment.objects.create(user=self.user, name='ACME', type='Stock', quantity=1, purchase_price=10, current_price=20)
+        Investment.objects.create(user=self.user, name='ACME', type='Stock', quantity=2, purchase_price=10, current_price=20)
+        Investment.objects.create(user=self.user, name='Flat', type='Other', quantity=1, purchase_price=5, current_price=5)
+
+        history = pricehistory.portfolio_history(self.user, years=10 / 365.25, end=end)
+        self.assertEqual(history['values'][0], 35)
+        self.assertEqual(history['values'][-1], 65)
+        self.assertAlmostEqual(history['time_weighted_return'], 30 / 35, places=5)
+        self.assertEqual([h['name'] for h in history['holdings']], ['ACME', 'Flat'])
+
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('investment_history'), {'years': 1})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['values'][-1], 65)
+        self.assertEqual(self.client.get(reverse('investment_history'), {'years': 'x'}).status_code, 400)
+        for years in ('nan', 'inf', '-inf'):
+            self.assertEqual(self.client.get(reverse('investment_history'), {'years': years}).status_code, 400, years)
+
+    def test_market_refresh_records_todays_close(self):
+        refresh_prices({'ACME': Decimal('12.34')})
+        _dates, matrix = pricehistory.load_matrix(['ACME'], date.today(), date.today())
+        self.assertEqual(matrix.tolist(), [[12.34]])
+
+
+class GoalForecastTests(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = get_user_model().objects.create_user(username='saver', password='pw')
+        for month in range(1, 7):
+            Transaction.objects.create(user=self.user, type='Income', category=category(self.user, 'Pay', 'Income'), amount=Decimal('1000'), date=date(2025, month, 1))
+            Transaction.objects.create(user=self.user, type='Expense', category=category(self.user, 'Rent'), amount=Decimal('400'), date=date(2025, month, 2))
+        Transaction.objects.create(user=self.user, type='Expense', category=category(self.user, 'Rent'), amount=Decimal('999'), date=date(2025, 7, 3))
+        self.soon = Goal.objects.create(user=self.user, name='Trip', target_amount=2000, saved_amount=800, target_date=date(2025, 10, 1))
+        self.later = Goal.objects.create(user=self.user, name='Car', target_amount=3000, saved_amount=0)
+        self.done = Goal.objects.create(user=self.user, name='Phone', target_amount=100, saved_amount=150)
+
+    def test_net_flow_skips_months_before_history_and_current_month(self):
+        self.assertEqual(monthly_net_flow(self.user, today=date(2025, 7, 15)).tolist(), [600] * 6)
+
+    def test_goals_funded_in_deadline_order(self):
+        forecast = forecast_goals(self.user, today=date(2025, 7, 15))
+        self.assertEqual(forecast['monthly_savings'], 600)
+        soon, later, done = (forecast['goals'][g.id] for g in (self.soon, self.later, self.done))
+        self.assertEqual(soon, {'months_to_complete': 2, 'completion_month': '2025-09', 'required_monthly': 400.0, 'on_track': True})
+        self.assertEqual((later['months_to_complete'], later['completion_month'], later['required_monthly']), (7, '2026-02', None))
+        self.assertEqual(done['months_to_complete'], 0)
+
+    def test_no_history_means_no_completion_date(self):
+        other = get_user_model().objects.create_user(username='new', password='pw')
+        goal = Goal.objects.create(user=other, name='Fund', target_amount=500, saved_amount=0, target_date=date(2030, 1, 1))
+        forecast = forecast_goals(other)['goals'][goal.id]
+        self.assertIsNone(forecast['completion_month'])
+        self.assertFalse(forecast['on_track'])
+
+    def test_goals_page_queries_do_not_grow_with_goals(self):
+        last_month = date.today().replace(day=1) - timedelta(days=1)
+        Transaction.objects.create(user=self.user, type='Income', category=category(self.user, 'Pay', 'Income'), amount=Decimal('500'), date=last_month)
+        self.client.force_login(self.user)
+        with CaptureQueriesContext(connection) as few:
+            self.assertContains(self.client.get(reverse('goals')), 'Expected by')
+        Goal.objects.bulk_create([Goal(user=self.user, name=f'G{i}', target_amount=10, saved_amount=0) for i in range(10)])
+        cache.clear()
+        with CaptureQueriesContext(connection) as many:
+            self.client.get(reverse('goals'))
+        self.assertEqual(len(few.captured_queries), len(many.captured_queries))
+
+
+class RecurringRuleTests(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user(username='subscriber', password='pw')
+        self.rent = RecurringRule.objects.create(
+            user=self.user, type='Expense', category=category(self.user, 'Rent'), amount=Decimal('900'),
+            frequency='monthly', start_date=date(2025, 1, 31), end_date=date(2025, 4, 30),
+        )
+
+    def test_monthly_rule_keeps_month_end_and_stops_after_end_date(self):
+        self.assertEqual(materialize(today=date(2025, 12, 31)), (1, 4))
+        dates = list(self.rent.transactions.order_by('date').values_list('date', flat=True))
+        self.assertEqual(dates, [date(2025, 1, 31), date(2025, 2, 28), date(2025, 3, 31), date(2025, 4, 30)])
+        self.rent.refresh_from_db()
+        self.assertFalse(self.rent.active)
+        self.assertEqual(ledger.verify(), [])
+
+    def test_running_again_creates_nothing(self):
+        materialize(today=date(2025, 2, 28))
+        self.assertEqual(materialize(today=date(2025, 2, 28)), (0, 0))
+        self.assertEqual(materialize(today=date(2025, 3, 31)), (1, 1))
+        self.assertEqual(Transaction.objects.filter(recurring_rule=self.rent).count(), 3)
+
+    def test_many_users_in_batches(self):
+        users = [User.objects.create_user(username=f'r{i}', password='pw') for i in range(30)]
+        RecurringRule.objects.bulk_create([
+            RecurringRule(user=u, type='Income', category=category(u, 'Pay', 'Income'), amount=Decimal('10'), frequency='weekly',
+                          start_date=date(2025, 1, 1), next_date=date(2025, 1, 1))
+            for u in users
+        ])
+        self.assertEqual(materialize(today=date(2025, 1, 29), batch_size=7), (30, 150))
+        self.assertEqual(ledger.verify(), [])
+
+    def test_pages_catch_up_lazily(self):
+        RecurringRule.objects.create(
+            user=self.user, type='Expense', category=category(self.user, 'Phone'), amount=Decimal('20'),
+            frequency='daily', interval=7, start_date=date.today() - timedelta(days=14),
+        )
+        self.client.force_login(self.user)
+        self.client.get(reverse('dashboard'))
+        self.assertFalse(Transaction.objects.filter(user=self.user, category__name='Phone').exists())
+        jobs.work(burst=True)
+        self.assertEqual(Transaction.objects.filter(user=self.user, category__name='Phone').count(), 3)
+        self.client.get(reverse('transactions'))
+        self.assertIsNone(jobs.enqueue_due_recurring(self.user))
+        self.assertFalse(Job.objects.filter(status=Job.QUEUED).exists())
+        with CaptureQueriesContext(connection) as ctx:
+            materialize_for_user(self.user)
+        self.assertEqual([q['sql'].split()[0] for q in ctx.captured_queries if 'SAVEPOINT' not in q['sql']], ['SELECT'])
+
+    def test_rules_view_adds_lists_and_stops(self):
+        materialize()
+        self.client.force_login(self.user)
+        response = self.client.post(reverse('recurring_rules'), {
+            'type': 'Income', 'category': 'Salary', 'amount': '5000', 'frequency': 'monthly',
+            'interval': '1', 'start_date': (date.today() - timedelta(days=1)).isoformat(),
+        })
+        self.assertIsNotNone(response.json()['job'])
+        jobs.work(burst=True)
+        self.assertEqual(Transaction.objects.filter(user=self.user, category__name='Salary').count(), 1)
+        self.assertEqual(len(self.client.get(reverse('recurring_rules')).json()['rules']), 2)
+        bad = self.client.post(reverse('recurring_rules'), {
+            'type': 'Income', 'category': 'X', 'amount': '1', 'frequency': 'monthly', 'interval': '0',
+            'start_date': '2025-01-01',
+        })
+        self.assertEqual(bad.status_code, 400)
+        self.client.post(reverse('recurring_rules'), {'action': 'delete', 'id': self.rent.id})
+        self.assertFalse(RecurringRule.objects.filter(id=self.rent.id).exists())
+
+    def test_command(self):
+        out = StringIO()
+        call_command('materialize_recurring', '--today', '2025-03-01', stdout=out)
+        self.assertIn('created 2 transaction(s)', out.getvalue())
+        with self.assertRaises(CommandError):
+            call_command('materialize_recurring', '--today', 'soon')
+
+
+class CategoryTests(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user(username='cook', password='pw')
+        self.client.force_login(self.user)
+
+    def post_transaction(self, name, amount):
+        return self.client.post(reverse('transactions'), {
+            'type': 'Expense', 'category': name, 'amount': amount, 'date': '2025-03-01', 'description': '',
+        }, HTTP_X_REQUESTED_WITH='XMLHttpRequest')
+
+    def test_spelling_variants_share_one_category(self):
+        for name, amount in [('Food', '10'), (' food ', '5'), ('FOOD', '1')]:
+            self.assertEqual(self.post_transaction(name, amount).status_code, 200)
+        self.client.post(reverse('budget'), json.dumps({'action': 'add', 'category': 'fOOd', 'limit': '20'}),
+                         content_type='application/json', HTTP_X_REQUESTED_WITH='XMLHttpRequest')
+
+        food = Category.objects.get(user=self.user)
+        self.assertEqual((food.name, food.key, food.type), ('Food', 'food', 'Expense'))
+        self.assertEqual(CategorySummary.objects.get(user=self.user).total, Decimal('16'))
+        self.assertEqual(Budget.objects.with_spending(self.user).get().spent, Decimal('16'))
+        ids = self.client.get(reverse('transactions_data'), {'category': 'FoOd'}).json()['transactions']
+        self.assertEqual([row['category'] for row in ids], ['Food'] * 3)
+        self.assertEqual(ledger.verify([self.user.id]), [])
+
+    def test_same_name_is_separate_per_type_and_user(self):
+        other = User.objects.create_user(username='other', password='pw')
+        ids = {
+            resolve_category(self.user.id, 'Expense', 'Gifts'),
+            resolve_category(self.user.id, 'Income', 'Gifts'),
+            resolve_category(other.id, 'Expense', 'Gifts'),
+        }
+        self.assertEqual(len(ids), 3)
+
+    def test_lookups_are_cached_after_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            pk = resolve_category(self.user.id, 'Expense', 'Rent')
+        with self.assertNumQueries(0):
+            self.assertEqual(resolve_category(self.user.id, 'expense', ' rent'), pk)
+        Category.objects.get(pk=pk).delete()
+        with self.assertNumQueries(3):
+            self.assertNotEqual(resolve_category(self.user.id, 'Expense', 'Rent'), pk)
+
+    def test_resolving_many_names_is_constant_queries(self):
+        with self.assertNumQueries(3):
+            resolve_many(self.user.id, [('Expense', f'Cat{i}') for i in range(50)])
+        self.assertEqual(Category.objects.filter(user=self.user).count(), 50)
+
+    def test_validation_never_creates_categories(self):
+        self.assertEqual(self.post_transaction('Hobbies', 'lots').status_code, 400)
+        self.assertTrue(TransactionForm({'type': 'Expense', 'category': 'Travel', 'amount': '5', 'date': '2025-03-01'},
+                                        user=self.user).is_valid())
+        self.assertFalse(Category.objects.filter(user=self.user).exists())
+        self.assertEqual(self.post_transaction('Hobbies', '5').status_code, 200)
+        self.assertEqual(Transaction.objects.get(user=self.user).category.name, 'Hobbies')
+
+
+class TransactionSearchTests(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user(username='finder', password='pw')
+        self.client.force_login(self.user)
+        self.other = User.objects.create_user(username='other', password='pw')
+        shopping = category(self.user, 'Shopping')
+        rows = [
+            ('AMAZON Mktp order 1182', shopping, '42.10', date(2025, 3, 4)),
+            ('Amazon Prime renewal', category(self.user, 'Subscriptions'), '14.99', date(2025, 3, 20)),
+            ('amazon', shopping, '300.00', date(2025, 1, 2)),
+            ('Café latte', category(self.user, 'Dining'), '4.50', date(2025, 3, 5)),
+        ]
+        self.rows = [
+            Transaction.objects.create(user=self.user, type='Expense', category=cat, amount=Decimal(amount),
+                                       date=day, description=text)
+            for text, cat, amount, day in rows
+        ]
+        Transaction.objects.create(user=self.other, type='Expense', category=category(self.other, 'Shopping'),
+                                   amount=Decimal('1'), date=date(2025, 3, 4), description='Amazon')
+
+    def search(self, **params):
+        response = self.client.get(reverse('transactions_search'), params)
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()
+
+    def ids(self, **params):
+        return [row['id'] for row in self.search(**params)['transactions']]
+
+    def test_prefix_match_ranked_and_scoped_to_user(self):
+        found = self.search(q='amaz')['transactions']
+        self.assertEqual({row['id'] for row in found}, {t.id for t in self.rows[:3]})
+        self.assertEqual([row['rank'] for row in found], sorted(row['rank'] for row in found))
+        self.assertEqual(self.ids(q='cafe'), [self.rows[3].id])
+        self.assertEqual(self.ids(q='subscriptions'), [self.rows[1].id])
+
+    def test_filters_combine_with_search(self):
+        self.assertEqual(self.ids(q='amazon', start='2025-03-01', end='2025-03-31', max_amount='20'), [self.rows[1].id])
+        self.assertEqual(self.ids(q='amazon', type='income'), [])
+        self.assertEqual(self.ids(q='amazon', category='shopping', min_amount='100'), [self.rows[2].id])
+
+    def test_index_follows_writes(self):
+        latte = self.rows[3]
+        latte.description = 'Flat white'
+        latte.save()
+        self.assertEqual(self.ids(q='latte'), [])
+        self.assertEqual(self.ids(q='flat white'), [latte.id])
+        Category.objects.filter(pk=latte.category_id).update(name='Coffee')
+        self.assertEqual(self.ids(q='coffee'), [latte.id])
+        Transaction.objects.filter(pk=latte.pk).delete()
+        self.assertEqual(self.ids(q='flat'), [])
+        Transaction.objects.bulk_create([
+            Transaction(user=self.user, type='Expense', category=latte.category, amount=1, date=date(2025, 4, 1),
+                        description='Bulk bought beans')
+        ])
+        self.assertEqual(len(self.ids(q='beans')), 1)
+
+    def test_cursor_pages_through_every_match_once(self):
+        seen, cursor = [], None
+        while True:
+            data = self.search(q='amazon', limit=1, **({'cursor': cursor} if cursor else {}))
+            seen += [row['id'] for row in data['transactions']]
+            cursor = data['next_cursor']
+            if not cursor:
+                break
+        self.assertEqual(seen, self.ids(q='amazon'))
+        self.assertEqual(len(seen), 3)
+
+    def test_bad_requests(self):
+        for params in ({'q': '  !!'}, {}, {'q': 'amazon', 'cursor': 'x'}, {'q': 'amazon', 'min_amount': 'lots'}):
+            self.assertEqual(self.client.get(reverse('transactions_search'), params).status_code, 400)
+
+    def test_rebuild_command_and_fallback(self):
+        from . import search
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM "{search.FTS_TABLE}"')
+        self.assertEqual(self.ids(q='amazon'), [])
+        out = StringIO()
+        call_command('rebuild_search_index', stdout=out)
+        self.assertIn('Indexed 5 transaction(s)', out.getvalue())
+        self.assertEqual(len(self.ids(q='amazon')), 3)
+
+        with unittest.mock.patch.object(search, 'fts_available', return_value=False):
+            found = self.search(q='amaz')['transactions']
+        self.assertEqual([row['id'] for row in found], [self.rows[1].id, self.rows[0].id, self.rows[2].id])
+        self.assertIsNone(found[0]['rank'])
+
+    def test_transactions_page_searches(self):
+        response = self.client.get(reverse('transactions'), {'q': 'prime'})
+        self.assertEqual([t.id for t in response.context['transactions']], [self.rows[1].id])
+
+
+class AsyncDashboardTests(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user(username='async', password='pw')
+        Transaction.objects.create(user=self.user, type='Income', category=category(self.user, 'Pay', 'Income'), amount=Decimal('900'), date=date(2025, 1, 1))
+        Transaction.objects.create(user=self.user, type='Expense', category=category(self.user, 'Food'), amount=Decimal('150'), date=date(2025, 1, 2))
+        Blog.objects.create(title='Saving tips', excerpt='...', content='...')
+
+    async def test_dashboard_under_asgi(self):
+        await self.async_client.aforce_login(self.user)
+        response = await self.async_client.get(reverse('dashboard'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['balance'], Decimal('750'))
+        self.assertEqual([b.title for b in response.context['blogs']], ['Saving tips'])
+        self.assertEqual(len(response.context['transactions']), 2)
+        self.assertTrue(await self.async_client.session.aget('profile_image'))
+
+    async def test_data_endpoints_keep_conditional_get(self):
+        await self.async_client.aforce_login(self.user)
+        for name in ('dashboard_data', 'reports_data'):
+            first = await self.async_client.get(reverse(name))
+            self.assertEqual(first.status_code, 200)
+            second = await self.async_client.get(reverse(name), headers={'if-none-match': first['ETag']})
+            self.assertEqual(second.status_code, 304, name)
+        body = (await self.async_client.get(reverse('dashboard_data'))).json()
+        self.assertEqual(body['balance'], 750.0)
+        self.assertEqual([t['category'] for t in body['transactions']], ['Food', 'Pay'])
+
+    async def test_anonymous_redirected(self):
+        response = await self.async_client.get(reverse('dashboard'))
+        self.assertEqual(response.status_code, 302)
+
+
+class ConcurrentSectionsTests(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        metrics.reset()
+
+    def test_sections_overlap(self):
+        started = time.perf_counter()
+        results = async_to_sync(fanout.gather)((time.sleep, 0.2), (time.sleep, 0.2), (max, 1, 2))
+        self.assertLess(time.perf_counter() - started, 0.35)
+        self.assertEqual(results, [None, None, 2])
+
+    async def test_dashboard_fans_out_on_worker_connections(self):
+        user = await User.objects.acreate_user(username='fan', password='pw')
+        pay = await Category.objects.acreate(user=user, name='Pay', type='Income')
+        await Transaction.objects.acreate(user=user, type='Income', category=pay, amount=Decimal('80'), date=date(2025, 1, 1))
+        await self.async_client.aforce_login(user)
+
+        response = await self.async_client.get(reverse('dashboard'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['balance'], Decimal('80'))
+        body = metrics.render()
+        queries = re.search(r'^moneymap_db_queries_total\{view="dashboard"\} (\d+)$', body, re.M)
+        self.assertGreater(int(queries.group(1)), 0)
+
+
+# Concurrent loads of the dashboard, whose reads may leave the primary, on the stock SQLite profile.
+class DashboardLoadTests(TransactionTestCase):
+    databases = {'default', 'replica'}
+
+    def setUp(self):
+        cache.clear()
+
+    def test_concurrent_dashboard_loads_with_due_rules(self):
+        clients = []
+        for i in range(4):
+            user = User.objects.create_user(username=f'load{i}', password='pw')
+            RecurringRule.objects.create(
+                user=user, type='Expense', category=category(user, 'Rent'), amount=Decimal('900'),
+                frequency='daily', start_date=date.today() - timedelta(days=30),
+            )
+            client = Client(raise_request_exception=False)
+            client.force_login(user)
+            # Pick the profile picture up front, so the only writes are the catch-ups.
+            session = client.session
+            session['profile_image'] = 'pic1.webp'
+            session.save()
+            clients.append(client)
+
+        statuses = []
+
+        def load(client):
+            try:
+                for _ in range(8):
+                    statuses.append(client.get(reverse('dashboard')).status_code)
+            finally:
+                connections.close_all()
+
+        threads = [threading.Thread(target=load, args=(client,)) for client in clients]
+        # Catch-ups that find the database locked are skipped with a warning.
+        with unittest.mock.patch.object(jobs.logger, 'warning'):
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        self.assertEqual(statuses, [200] * 32)
+        self.assertEqual(Job.objects.filter(name='materialize_recurring', status=Job.QUEUED).count(), 4)
+
+
+class BlogCacheTests(TestCase):
+    def setUp(self):
+        super().setUp()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.blog = Blog.objects.create(title='Saving tips', excerpt='Save more', content='Pay yourself first.\n\n<b>Then</b> budget.')
+
+    def test_content_rendered_on_save(self):
+        self.assertEqual(self.blog.content_html, '<p>Pay yourself first.</p>\n\n<p>&lt;b&gt;Then&lt;/b&gt; budget.</p>')
+        self.blog.content = 'Line one\nline two'
+        self.blog.save(update_fields=['content'])
+        self.blog.refresh_from_db()
+        self.assertEqual(self.blog.content_html, '<p>Line one<br>line two</p>')
+
+    def test_page_served_from_cache_with_headers(self):
+        url = reverse('blog_detail', args=[self.blog.slug])
+        first = self.client.get(url)
+        self.assertContains(first, '<p>Pay yourself first.</p>')
+        self.assertIn('public', first['Cache-Control'])
+        self.assertIn('max-age=300', first['Cache-Control'])
+        self.assertEqual(self.client.get(reverse('blog_detail', args=['missing'])).status_code, 404)
+        with self.assertNumQueries(0):
+            again = self.client.get(url)
+            unchanged = self.client.get(url, HTTP_IF_NONE_MATCH=first['ETag'])
+            self.assertEqual(self.client.get(reverse('blog_detail', args=['missing'])).status_code, 404)
+        self.assertEqual(again.content, first.content)
+        self.assertEqual(unchanged.status_code, 304)
+
+    def test_save_and_delete_invalidate(self):
+        url = reverse('blog_detail', args=[self.blog.slug])
+        etag = self.client.get(url)['ETag']
+        self.assertEqual([b.title for b in latest_blogs()], ['Saving tips'])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.blog.content = 'Updated advice.'
+            self.blog.save()
+            Blog.objects.create(title='Index funds', excerpt='...', content='...')
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertContains(response, 'Updated advice.')
+        self.assertEqual(len(latest_blogs()), 2)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.blog.delete()
+        self.assertEqual(self.client.get(url).status_code, 404)
+        self.assertEqual([b.title for b in latest_blogs()], ['Index funds'])
+
+
+@unittest.skipUnless(connection.vendor == 'sqlite', "SQLite profiles only apply to SQLite.")
+class SqliteProfileTests(TestCase):
+    def test_production_profile_applied_on_connect(self):
+        from django.conf import settings
+        from django.db.backends.sqlite3.base import DatabaseWrapper
+        profile = settings.MONEYMAP_SQLITE_PROFILES['production']
+        with tempfile.TemporaryDirectory() as directory:
+            wrapper = DatabaseWrapper({**connection.settings_dict, **profile, 'NAME': f'{directory}/profile.sqlite3'}, 'profile')
+            try:
+                with wrapper.cursor() as cursor:
+                    pragmas = {}
+                    for name in ('journal_mode', 'synchronous', 'busy_timeout', 'mmap_size', 'cache_size', 'temp_store'):
+                        cursor.execute(f'PRAGMA {name}')
+                        pragmas[name] = cursor.fetchone()[0]
+            finally:
+                wrapper.close()
+        self.assertEqual(pragmas, {
+            'journal_mode': 'wal', 'synchronous': 1, 'busy_timeout': 5000,
+            'mmap_size': 134217728, 'cache_size': -32000, 'temp_store': 2,
+        })
+        self.assertEqual(wrapper.transaction_mode, 'IMMEDIATE')
+        self.assertEqual((profile['CONN_MAX_AGE'], profile['CONN_HEALTH_CHECKS']), (600, True))
+
+
+# Outside a TestCase transaction, so reads can leave the primary; the replica
+# is a test mirror of default. Sections run on this thread to be captured.
+@override_settings(MONEYMAP_CONCURRENT_SECTIONS=False)
+class ReplicaRoutingTests(TransactionTestCase):
+    databases = {'default', 'replica'}
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='reader', password='pw')
+        Transaction.objects.create(user=self.user, type='Expense', category=category(self.user, 'Food'), amount=Decimal('12'), date=date(2025, 1, 3))
+        User.objects.filter(pk=self.user.pk).update(data_modified=timezone.now() - timedelta(minutes=5))
+        self.client.force_login(self.user)
+
+    def get(self, name, *args):
+        cache.clear()  # reports_data and reports share the cached report
+        with CaptureQueriesContext(connections['replica']) as replica, CaptureQueriesContext(connections['default']) as primary:
+            response = self.client.get(reverse(name, args=args))
+            if response.streaming:
+                b''.join(response.streaming_content)
+        self.assertEqual(response.status_code, 200)
+        app_queries = [q['sql'] for q in primary.captured_queries if 'MoneyMapControl_' in q['sql'] and 'customuser' not in q['sql']]
+        return len(replica.captured_queries), app_queries
+
+    def test_report_and_export_reads_use_replica(self):
+        for name, args in (('reports_data', ()), ('reports', ()), ('dashboard_data', ()), ('export', ('transactions',))):
+            replica, primary = self.get(name, *args)
+            self.assertGreater(replica, 0, name)
+            self.assertEqual(primary, [], name)
+
+    def test_recent_writer_reads_primary(self):
+        User.objects.filter(pk=self.user.pk).update(data_modified=timezone.now())
+        replica, primary = self.get('reports_data')
+        self.assertEqual(replica, 0)
+        self.assertTrue(primary)
+
+    def test_write_pins_the_rest_of_the_view(self):
+        seen = []
+
+        def view(request):
+            seen.append(Transaction.objects.all().db)
+            Category.objects.create(user=self.user, name='Books', type='Expense')
+            seen.append(Transaction.objects.all().db)
+            return HttpResponse()
+
+        request = RequestFactory().get('/')
+        request.user = self.user
+        replica_reads(view)(request)
+        self.assertEqual(seen, ['replica', 'default'])
+        self.assertEqual(Transaction.objects.all().db, 'default')
+
+
+class JobQueueTests(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user(username='worker', password='pw', is_staff=True)
+        Transaction.objects.create(user=self.user, type='Income', category=category(self.user, 'Pay', 'Income'), amount=Decimal('70'), date=date(2025, 1, 1))
+
+    def test_dedupe_by_key(self):
+        first = jobs.enqueue_for_user('recompute_user', self.user)
+        self.assertEqual(jobs.enqueue_for_user('recompute_user', self.user.pk).pk, first.pk)
+        self.assertEqual(jobs.claim('w1').pk, first.pk)
+        # Data may change while it runs, so one more can queue, but it waits for the running one.
+        second = jobs.enqueue_for_user('recompute_user', self.user)
+        self.assertNotEqual(second.pk, first.pk)
+        self.assertIsNone(jobs.claim('w2'))
+        jobs.run(Job.objects.get(pk=first.pk))
+        self.assertEqual(jobs.claim('w2').pk, second.pk)
+        with self.assertRaises(ValueError):
+            jobs.enqueue('no_such_job')
+
+    def test_run_records_result_and_timing(self):
+        LedgerSummary.objects.filter(user=self.user).delete()
+        jobs.enqueue_for_user('recompute_user', self.user)
+        self.assertEqual(jobs.work(burst=True), 1)
+        job = Job.objects.get()
+        self.assertEqual((job.status, job.attempts, job.result), (Job.DONE, 1, [1, 1, 1]))
+        self.assertGreater(job.seconds, 0)
+        self.assertEqual(LedgerSummary.objects.get(user=self.user).total_income, Decimal('70'))
+        self.assertEqual(jobs.stats()['recompute_user']['done'], 1)
+
+    def test_retries_then_fails(self):
+        calls = []
+
+        def flaky():
+            calls.append(1)
+            raise RuntimeError("feed down")
+
+        with unittest.mock.patch.dict(jobs.TASKS, {'flaky': flaky}):
+            job = jobs.enqueue('flaky', max_attempts=2)
+            with self.assertLogs('MoneyMapControl.jobs', 'WARNING'):
+                jobs.work(burst=True)
+                job.refresh_from_db()
+                self.assertEqual((job.status, job.attempts), (Job.QUEUED, 1))
+                self.assertGreater(job.run_at, timezone.now())
+                self.assertIsNone(jobs.claim('w'))
+                Job.objects.filter(pk=job.pk).update(run_at=timezone.now())
+                jobs.work(burst=True)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts, len(calls)), (Job.FAILED, 2, 2))
+        self.assertIn('RuntimeError: feed down', job.error)
+
+    def test_stale_jobs_requeued(self):
+        job = jobs.enqueue_for_user('materialize_recurring', self.user)
+        jobs.claim('lost')
+        Job.objects.filter(pk=job.pk).update(started_at=timezone.now() - timedelta(hours=2))
+        self.assertEqual(jobs.requeue_stale(timedelta(hours=1)), 1)
+        self.assertEqual(jobs.claim('w').pk, job.pk)
+
+    def test_price_refresh_from_view_and_stats(self):
+        Investment.objects.create(user=self.user, name='ACME', type='Stock', quantity=1, purchase_price=5, current_price=5)
+        self.client.force_login(self.user)
+        response = self.client.post(reverse('investment_prices'), json.dumps({'prices': {'ACME': '9.5'}, 'background': True}),
+                                    content_type='application/json')
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(Investment.objects.get().current_price, Decimal('5'))
+        jobs.work(burst=True)
+        self.assertEqual(Investment.objects.get().current_price, Decimal('9.50'))
+        self.assertEqual(Job.objects.get(pk=response.json()['job']).result['updated'], 1)
+        self.assertEqual(self.client.get(reverse('job_stats')).json()['refresh_prices']['done'], 1)
+
+
+class RunWorkersCommandTests(TransactionTestCase):
+    def test_burst_runs_queue_on_worker_thread(self):
+        user = User.objects.create_user(username='cron', password='pw')
+        for _ in range(3):
+            jobs.enqueue('materialize_recurring')
+        jobs.enqueue_for_user('recompute_user', user)
+        out = StringIO()
+        call_command('run_workers', '--burst', '--threads', '1', stdout=out)
+        self.assertIn('Ran 4 job(s)', out.getvalue())
+        self.assertIn('materialize_recurring', out.getvalue())
+        self.assertEqual(Job.objects.filter(status=Job.DONE).count(), 4)
+
+
+class ReportingTests(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user(username='alice', password='pw-12345!')
+        self.client.force_login(self.user)
+        for day, type_, name, amount in [
+            (date(2025, 1, 6), 'Income', 'Salary', '1000.00'),
+            (date(2025, 1, 8), 'Expense', 'Food', '30.00'),
+            (date(2025, 1, 20), 'Expense', 'Food', '10.00'),
+            (date(2025, 4, 2), 'Expense', 'Rent', '600.00'),
+            (date(2025, 12, 31), 'Expense', 'Food', '60.00'),
+        ]:
+            Transaction.objects.create(user=self.user, type=type_, category=category(self.user, name, type_),
+                                       amount=Decimal(amount), date=day)
+
+    def test_buckets_are_gap_filled_at_every_granularity(self):
+        expected = {
+            'day': (360, '2025-01-06', '2025-12-31'),
+            'week': (52, '2025-01-06', '2025-12-29'),
+            'month': (12, '2025-01', '2025-12'),
+            'quarter': (4, '2025-Q1', '2025-Q4'),
+            'year': (1, '2025', '2025'),
+        }
+        for granularity, (count, first, last) in expected.items():
+            data = reporting.build_report(self.user.id, granularity=granularity)
+            self.assertEqual((len(data['labels']), data['labels'][0], data['labels'][-1]), (count, first, last), granularity)
+            self.assertEqual(sum(data['expense']), 700.0, granularity)
+            self.assertEqual(data['balance'][-1], 300.0, granularity)
+        self.assertEqual(reporting.build_report(self.user.id, granularity='quarter')['expense'], [40.0, 600.0, 0.0, 60.0])
+        weekly = reporting.build_report(self.user.id, granularity='week')
+        self.assertEqual(weekly['expense'][:3], [30.0, 0.0, 10.0])
+
+    def test_range_and_rolling_average(self):
+        data = reporting.build_report(self.user.id, date(2024, 11, 15), date(2025, 4, 30), 'month', 2)
+        self.assertEqual(data['labels'], ['2024-11', '2024-12', '2025-01', '2025-02', '2025-03', '2025-04'])
+        self.assertEqual(data['expense'], [0.0, 0.0, 40.0, 0.0, 0.0, 600.0])
+        self.assertEqual(data['expense_avg'], [0.0, 0.0, 20.0, 20.0, 0.0, 300.0])
+        self.assertEqual(data['income_avg'][:3], [0.0, 0.0, 500.0])
+
+        empty = reporting.build_report(self.user.id, date(2024, 1, 1), date(2024, 3, 31), 'month')
+        self.assertEqual((empty['labels'], empty['expense'], empty['categories']), (['2024-01', '2024-02', '2024-03'], [0.0] * 3, []))
+
+    def test_category_breakdown(self):
+        data = reporting.build_report(self.user.id, end=date(2025, 6, 30), granularity='quarter')
+        self.assertEqual(data['categories'], [
+            {'category': 'Salary', 'type': 'Income', 'total': 1000.0, 'share': 100.0},
+            {'category': 'Rent', 'type': 'Expense', 'total': 600.0, 'share': 93.75},
+            {'category': 'Food', 'type': 'Expense', 'total': 40.0, 'share': 6.25},
+        ])
+        self.assertEqual(data['category_series'][2], {'category': 'Food', 'type': 'Expense', 'values': [40.0, 0.0]})
+
+    def test_whole_months_read_rollups(self):
+        with CaptureQueriesContext(connection) as ctx:
+            reporting.build_report(self.user.id, date(2025, 1, 1), date(2025, 3, 31), 'quarter')
+            reporting.build_report(self.user.id, date(2025, 1, 2), date(2025, 3, 31), 'quarter')
+        self.assertIn('MoneyMapControl_monthlyrollup', ctx.captured_queries[0]['sql'])
+        self.assertIn('MoneyMapControl_transaction', ctx.captured_queries[2]['sql'])
+        # Grouped by category id without a join; the names come from one lookup afterwards.
+        self.assertNotIn('JOIN', ctx.captured_queries[0]['sql'] + ctx.captured_queries[2]['sql'])
+        self.assertIn('MoneyMapControl_category', ctx.captured_queries[1]['sql'])
+
+    def test_cached_per_range_and_granularity(self):
+        reporting.report(self.user)
+        with self.assertNumQueries(0):
+            reporting.report(self.user)
+        with self.assertNumQueries(2):
+            reporting.report(self.user, granularity='week')
+        with self.assertNumQueries(2):
+            reporting.report(self.user, start=date(2025, 2, 1))
+
+    def test_reports_data_parameters(self):
+        response = self.client.get(reverse('reports_data'), {'start': '2025-01-01', 'end': '2025-01-31', 'granularity': 'week'})
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual((data['start'], data['granularity'], data['labels'][0]), ('2025-01-01', 'week', '2024-12-30'))
+        self.assertEqual(data['months'], data['labels'])
+        for params in ({'granularity': 'hour'}, {'start': '2025-13-01'}, {'window': '0'},
+                       {'start': '2025-02-01', 'end': '2025-01-01'}, {'start': '1900-01-01', 'granularity': 'day'}):
+            response = self.client.get(reverse('reports_data'), params)
+            self.assertEqual(response.status_code, 400, params)
+
+    def test_reports_page_falls_back_on_bad_parameters(self):
+        response = self.client.get(reverse('reports'), {'granularity': 'hour'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['params']['granularity'], 'month')
+        self.assertEqual(len(json.loads(response.context['months'])), 12)
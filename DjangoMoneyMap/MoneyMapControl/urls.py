@@ -10,9 +10,22 @@ urlpatterns=[
     path('dashboard', views.dashboard, name="dashboard"),
     path('dashboard/data/', views.dashboard_data, name='dashboard_data'),
     path('transactions/', views.transactions_view, name='transactions'),
+    path('transactions/data/', views.transactions_data, name='transactions_data'),
+    path('transactions/search/', views.transactions_search, name='transactions_search'),
+    path('transactions/import/', views.transactions_import, name='transactions_import'),
+    path('transactions/batch/', views.transactions_batch, name='transactions_batch'),
+    path('transactions/recurring/', views.recurring_rules, name='recurring_rules'),
+    path('export/<slug:dataset>/', views.export_data, name='export'),
     path('budget/', views.budget, name='budget'),
     path('investments/', views.investments, name='investments'),
+    path('investments/data/', views.investments_data, name='investments_data'),
+    path('investments/history/', views.investment_history, name='investment_history'),
+    path('investments/prices/', views.investment_prices, name='investment_prices'),
     path('goals/', views.goals, name='goals'),
     path('reports/', views.reports, name='reports'),
+    path('reports/data/', views.reports_data, name='reports_data'),
     path('add-expense/', views.add_expense, name='add_expense'),
+    path('cache/stats/', views.cache_stats_view, name='cache_stats'),
+    path('jobs/stats/', views.job_stats_view, name='job_stats'),
+    path('metrics', views.metrics_view, name='metrics'),
 ]
\ No newline at end of file
@@ -1,15 +1,39 @@
 from django.shortcuts import render, redirect, get_object_or_404
+from django.template.loader import render_to_string
 from django.contrib.auth import login, logout, get_user_model
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
-from django.views.decorators.http import require_GET
-from django.http import JsonResponse
-from .forms import CustomUserCreationForm, ForgotPasswordForm, CustomAuthenticationForm, TransactionForm
-from .models import Transaction, Budget, Goal, Investment, Blog
+from django.contrib.admin.views.decorators import staff_member_required
+from django.views.decorators.http import require_GET, require_POST, require_safe, condition
+from django.views.decorators.cache import cache_control
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse, Http404
+from .forms import CustomUserCreationForm, ForgotPasswordForm, CustomAuthenticationForm, TransactionForm, RecurringRuleForm
+from .models import Transaction, Budget, Goal, Investment, RecurringRule
+from .services import (
+    transaction_totals, user_summary, latest_transactions, investment_holdings, investment_values,
+    investment_chart_data, investment_profit_chart, goal_progress, budget_progress, report_data,
+    data_etag, data_last_modified,
+)
+from .caching import cached, stats as cache_stats
+from .pagination import filter_transactions, keyset_page, page_size
+from .search import search_page
+from .importers import PARSERS, detect_format, import_transactions, open_text
+from .exporters import DATASETS, FORMATS, export_stream
+from .batch import BatchError, apply_batch
+from .categories import resolve as resolve_category
+from .prices import parse_prices, refresh_prices
+from .pricehistory import cached_portfolio_history
+from .reporting import GRANULARITIES, report_params
+from .fanout import gather, resolve_user
+from .routers import replica_reads
+from .jobs import enqueue, enqueue_due_recurring, stats as job_stats
+from .blogs import MAX_AGE as BLOG_MAX_AGE, blog_etag, blog_page, latest_blogs
+from . import metrics
 from django.http import JsonResponse
+from datetime import date
+from functools import partial
 from decimal import Decimal
-import json, random
-from django.db.models import Sum
+import json, math, random
 
 def register_view(request):
     if request.method == 'POST':
@@ -65,85 +89,54 @@ def forgot_password(request):
         form = ForgotPasswordForm()
     return render(request, 'forgot_password.html', {'form': form})
 
+@require_safe
+@cache_control(public=True, max_age=BLOG_MAX_AGE)
+@condition(etag_func=blog_etag)
 def blog_detail(request, slug):
-    blog = get_object_or_404(Blog, slug=slug)
-    return render(request, "blog_detail.html", {"blog": blog})
+    page = blog_page(slug, lambda blog: render_to_string("blog_detail.html", {"blog": blog}, request))
+    if not page:
+        raise Http404("No such blog post.")
+    return HttpResponse(page)
 
 @login_required
-def dashboard(request):
+@resolve_user
+@replica_reads
+async def dashboard(request):
     user = request.user
+    await gather((enqueue_due_recurring, user))
 
     # --- Profile Image ---
-    if 'profile_image' not in request.session:
+    selected_pic = await request.session.aget('profile_image')
+    if selected_pic is None:
         image_choices = [
             "pic1.webp", "pic2.jpeg", "pic3.jpeg", "pic4.webp", "pic5.jpg",
             "pic6.jpeg", "pic7.webp", "pic8.jpg", "pic9.jpg", "pic10.jpg"
         ]
         selected_pic = random.choice(image_choices)
-        request.session['profile_image'] = selected_pic
-    else:
-        selected_pic = request.session['profile_image']
-
-    # --- Transactions ---
-    transactions = Transaction.objects.filter(user=user)
-    total_income = sum(t.amount for t in transactions if t.type.lower() == 'income')
-    total_expense = sum(t.amount for t in transactions if t.type.lower() == 'expense')
-    balance = total_income - total_expense
-
-    # --- Investments ---
-    investments = Investment.objects.filter(user=user)
-    total_invested = sum(inv.quantity * inv.purchase_price for inv in investments)
-    total_current = sum(inv.current_value for inv in investments)
-    net_gain_loss = total_current - total_invested
-
-    investment_chart_data = json.dumps([
-        {"name": inv.name, "value": float(inv.current_value)}
-        for inv in investments
-    ])
-
-    # --- Goals ---
-    goals_data = []
-    for g in Goal.objects.filter(user=user):
-        progress = round((g.saved_amount / g.target_amount) * 100, 2) if g.target_amount else 0
-        goals_data.append({
-            "name": g.name,
-            "saved_amount": float(g.saved_amount),
-            "target_amount": float(g.target_amount),
-            "progress": progress
-        })
-
-    # --- Budgets ---
-    budgets_data = []
-    for b in Budget.objects.filter(user=user):
-        spent = sum(
-            t.amount for t in Transaction.objects.filter(
-                user=user, category=b.category, type__iexact="Expense"
-            )
-        )
-        percent = round((spent / b.limit) * 100, 2) if b.limit else 0
-        exceeded = spent > b.limit if b.limit else False
-        budgets_data.append({
-            "category": b.category,
-            "limit": float(b.limit),
-            "spent": float(spent),
-            "percent": percent,
-            "exceeded": exceeded
-        })
-
-    # --- Blogs (Latest 2) ---
-    blogs = Blog.objects.all()[:2]
+        await request.session.aset('profile_image', selected_pic)
+
+    # --- Totals, transactions, investments, goals, budgets and the latest 2 blogs, concurrently ---
+    summary, transactions, investments, investment_chart, goals_data, budgets_data, blogs = await gather(
+        (cached, user.id, 'summary', user_summary, user),
+        (cached, user.id, 'latest_transactions', latest_transactions, user),
+        (cached, user.id, 'investments', investment_holdings, user),
+        (cached, user.id, 'investment_chart', investment_chart_data, user),
+        (cached, user.id, f'goals:{date.today():%Y-%m}', goal_progress, user),
+        (cached, user.id, 'budgets', budget_progress, user),
+        (latest_blogs,),
+    )
 
     context = {
         "user": user,
         "transactions": transactions,
-        "balance": balance,
-        "total_income": total_income,
-        "total_expense": total_expense,
+        "balance": summary['balance'],
+        "total_income": summary['total_income'],
+        "total_expense": summary['total_expense'],
         "investments": investments,
-        "total_invested": total_invested,
-        "total_current": total_current,
-        "net_gain_loss": net_gain_loss,
-        "investment_chart_data": investment_chart_data,
+        "total_invested": summary['total_invested'],
+        "total_current": summary['total_current'],
+        "net_gain_loss": summary['net_gain_loss'],
+        "investment_chart_data": investment_chart,
         "goals": goals_data,
         "budgets": budgets_data,
         "selected_pic": selected_pic,
@@ -153,28 +146,30 @@ def dashboard(request):
     return render(request, "dashboard.html", context)
 
 @login_required
+@resolve_user
+@replica_reads
 @require_GET
-def dashboard_data(request):
-    transactions = Transaction.objects.filter(user=request.user)
-    total_income = sum(t.amount for t in transactions if t.type.lower() == 'income')
-    total_expense = sum(t.amount for t in transactions if t.type.lower() == 'expense')
-    balance = total_income - total_expense
-
-    latest_transactions = list(
-        transactions.order_by('-date')[:5].values('date', 'type', 'category', 'amount', 'description')
+@cache_control(private=True, no_cache=True)
+@condition(etag_func=data_etag, last_modified_func=data_last_modified)
+async def dashboard_data(request):
+    totals, latest = await gather(
+        (cached, request.user.id, 'transaction_totals', transaction_totals, request.user),
+        (cached, request.user.id, 'latest_transactions', latest_transactions, request.user),
     )
 
     return JsonResponse({
-        'balance': float(balance),
-        'total_income': float(total_income),
-        'total_expense': float(total_expense),
-        'transactions': latest_transactions
+        'balance': float(totals['balance']),
+        'total_income': float(totals['total_income']),
+        'total_expense': float(totals['total_expense']),
+        'transactions': [
+            {'date': t.date, 'type': t.type, 'category': t.category.name, 'amount': t.amount, 'description': t.description}
+            for t in latest
+        ]
     })
 
 @login_required
 def transactions_view(request):
     import json
-    transactions = Transaction.objects.filter(user=request.user).order_by('-date')
     form = TransactionForm()
 
     if request.headers.get('x-requested-with') == 'XMLHttpRequest' and request.content_type == 'application/json':
@@ -188,44 +183,38 @@ def transactions_view(request):
             transaction = get_object_or_404(Transaction, id=delete_id, user=request.user)
             transaction.delete()
 
-            transactions = Transaction.objects.filter(user=request.user)
-            total_income = sum(t.amount for t in transactions.filter(type__iexact='Income'))
-            total_expense = sum(t.amount for t in transactions.filter(type__iexact='Expense'))
-            balance = total_income - total_expense
+            totals = transaction_totals(request.user)
 
             return JsonResponse({
                 'status': 'deleted',
                 'message': 'Transaction deleted successfully!',
-                'balance': float(balance),
-                'income': float(total_income),
-                'expense': float(total_expense),
+                'balance': float(totals['balance']),
+                'income': float(totals['total_income']),
+                'expense': float(totals['total_expense']),
             })
 
     if request.method == 'POST':
         transaction_id = request.POST.get('transaction_id')
         if transaction_id:
             transaction = get_object_or_404(Transaction, id=transaction_id, user=request.user)
-            form = TransactionForm(request.POST, instance=transaction)
+            form = TransactionForm(request.POST, instance=transaction, user=request.user)
         else:
-            form = TransactionForm(request.POST)
+            form = TransactionForm(request.POST, user=request.user)
 
         if form.is_valid():
             transaction = form.save(commit=False)
             transaction.user = request.user
             transaction.save()
 
-            transactions = Transaction.objects.filter(user=request.user)
-            total_income = sum(t.amount for t in transactions.filter(type__iexact='Income'))
-            total_expense = sum(t.amount for t in transactions.filter(type__iexact='Expense'))
-            balance = total_income - total_expense
+            totals = transaction_totals(request.user)
 
             if request.headers.get('x-requested-with') == 'XMLHttpRequest':
                 return JsonResponse({
                     'status': 'success',
                     'message': 'Transaction saved successfully!',
-                    'balance': float(balance),
-                    'income': float(total_income),
-                    'expense': float(total_expense),
+                    'balance': float(totals['balance']),
+                    'income': float(totals['total_income']),
+                    'expense': float(totals['total_expense']),
                 })
 
             return redirect('transactions')
@@ -233,11 +222,172 @@ def transactions_view(request):
         if request.headers.get('x-requested-with') == 'XMLHttpRequest':
             return JsonResponse({'status': 'error', 'errors': form.errors}, status=400)
 
+    enqueue_due_recurring(request.user)
+    try:
+        filtered = filter_transactions(request.user, request.GET)
+        if request.GET.get('q', '').strip():
+            transactions, next_cursor = search_page(request.user, filtered, request.GET['q'], request.GET.get('cursor'))
+        else:
+            transactions, next_cursor = keyset_page(filtered, request.GET.get('cursor'))
+    except ValueError:
+        messages.error(request, 'Invalid filter or page.')
+        transactions, next_cursor = keyset_page(Transaction.objects.filter(user=request.user).select_related('category'))
+
+    next_query = None
+    if next_cursor:
+        params = request.GET.copy()
+        params['cursor'] = next_cursor
+        next_query = params.urlencode()
+
     return render(request, 'transactions.html', {
         'transactions': transactions,
-        'form': form
+        'form': form,
+        'filters': request.GET,
+        'next_cursor': next_cursor,
+        'next_query': next_query,
+        'rules': RecurringRule.objects.filter(user=request.user, active=True).select_related('category').order_by('next_date'),
+        'rule_form': RecurringRuleForm(),
+    })
+
+@login_required
+def recurring_rules(request):
+    if request.method == 'POST':
+        if request.POST.get('action') == 'delete':
+            get_object_or_404(RecurringRule, id=request.POST.get('id'), user=request.user).delete()
+            return JsonResponse({'status': 'deleted'})
+
+        form = RecurringRuleForm(request.POST, user=request.user)
+        if not form.is_valid():
+            return JsonResponse({'status': 'error', 'errors': form.errors}, status=400)
+        rule = form.save(commit=False)
+        rule.user = request.user
+        rule.save()
+        job = enqueue_due_recurring(request.user)
+        return JsonResponse({'status': 'success', 'id': rule.id, 'job': job and job.pk})
+
+    rules = RecurringRule.objects.filter(user=request.user).select_related('category').order_by('next_date')
+    return JsonResponse({'rules': [
+        {
+            'id': r.id, 'type': r.type, 'category': r.category.name, 'amount': float(r.amount),
+            'frequency': r.frequency, 'interval': r.interval, 'start_date': r.start_date,
+            'end_date': r.end_date, 'next_date': r.next_date, 'active': r.active,
+        }
+        for r in rules
+    ]})
+
+@login_required
+@require_GET
+def transactions_data(request):
+    try:
+        transactions, next_cursor = keyset_page(
+            filter_transactions(request.user, request.GET),
+            request.GET.get('cursor'),
+            page_size(request.GET),
+        )
+    except ValueError:
+        return JsonResponse({'status': 'error', 'message': 'Invalid filter or cursor'}, status=400)
+
+    return JsonResponse({
+        'transactions': [
+            {
+                'id': t.id,
+                'date': t.date,
+                'type': t.type,
+                'category': t.category.name,
+                'amount': float(t.amount),
+                'description': t.description,
+            }
+            for t in transactions
+        ],
+        'next_cursor': next_cursor,
     })
 
+@login_required
+@require_GET
+def transactions_search(request):
+    try:
+        transactions, next_cursor = search_page(
+            request.user,
+            filter_transactions(request.user, request.GET),
+            request.GET.get('q'),
+            request.GET.get('cursor'),
+            page_size(request.GET),
+        )
+    except ValueError as e:
+        return JsonResponse({'status': 'error', 'message': str(e)}, status=400)
+
+    return JsonResponse({
+        'transactions': [
+            {
+                'id': t.id,
+                'date': t.date,
+                'type': t.type,
+                'category': t.category.name,
+                'amount': float(t.amount),
+                'description': t.description,
+                'rank': t.rank,
+            }
+            for t in transactions
+        ],
+        'next_cursor': next_cursor,
+    })
+
+@login_required
+@require_POST
+def transactions_import(request):
+    upload = request.FILES.get('file')
+    if upload is None:
+        return JsonResponse({'status': 'error', 'message': 'No file uploaded'}, status=400)
+
+    fmt = request.POST.get('format') or detect_format(upload.name)
+    if fmt not in PARSERS:
+        return JsonResponse({'status': 'error', 'message': 'Unsupported format'}, status=400)
+
+    report = import_transactions(request.user, PARSERS[fmt](open_text(upload.file)))
+    return JsonResponse({'status': 'success', **report.as_dict()})
+
+@login_required
+@require_POST
+def transactions_batch(request):
+    try:
+        data = json.loads(request.body.decode('utf-8'))
+    except ValueError:
+        return JsonResponse({'status': 'error', 'message': 'Invalid JSON'}, status=400)
+
+    try:
+        ok, results = apply_batch(request.user, data.get('operations') if isinstance(data, dict) else None)
+    except BatchError as e:
+        return JsonResponse({'status': 'error', 'message': str(e)}, status=400)
+
+    if not ok:
+        return JsonResponse({'status': 'error', 'results': results}, status=400)
+
+    totals = transaction_totals(request.user)
+    return JsonResponse({
+        'status': 'success',
+        'results': results,
+        'balance': float(totals['balance']),
+        'income': float(totals['total_income']),
+        'expense': float(totals['total_expense']),
+    })
+
+@login_required
+@replica_reads
+@require_GET
+def export_data(request, dataset):
+    fmt = request.GET.get('format', 'csv')
+    if dataset not in DATASETS or fmt not in FORMATS:
+        raise Http404("Unknown export")
+
+    gzip = request.GET.get('gzip') in ('1', 'true')
+    filename = f"{dataset}.{fmt}" + ('.gz' if gzip else '')
+    response = StreamingHttpResponse(
+        export_stream(request.user, dataset, fmt, gzip=gzip),
+        content_type='application/gzip' if gzip else FORMATS[fmt],
+    )
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
 @login_required
 def budget(request):
     user = request.user
@@ -250,7 +400,7 @@ def budget(request):
             category = data.get('category')
             limit = data.get('limit')
             if category and limit:
-                Budget.objects.create(user=user, category=category, limit=Decimal(limit))
+                Budget.objects.create(user=user, category_id=resolve_category(user.id, 'Expense', category), limit=Decimal(limit))
                 return JsonResponse({'status': 'success'})
             return JsonResponse({'status': 'error', 'message': 'Invalid data'})
 
@@ -271,7 +421,7 @@ def budget(request):
                     budget_obj = Budget.objects.get(id=bid, user=user)
                     Transaction.objects.create(
                         user=user,
-                        category=budget_obj.category,
+                        category_id=budget_obj.category_id,
                         type='Expense',
                         amount=Decimal(add_amount),
                         date='2025-10-23'  
@@ -283,11 +433,11 @@ def budget(request):
         return JsonResponse({'status': 'error', 'message': 'Unknown action'})
 
     budgets_list = []
-    for b in Budget.objects.filter(user=user):
-        spent = b.spent  
+    for b in Budget.objects.with_spending(user):
+        spent = b.spent
         budgets_list.append({
             'id': b.id,
-            'category': b.category,
+            'category': b.category.name,
             'limit': b.limit,
             'spent': spent,
             'percent': b.percent,
@@ -296,6 +446,7 @@ def budget(request):
 
     return render(request, 'budget.html', {'budgets': budgets_list})
 
+@login_required
 def investments(request):
     user = request.user
 
@@ -327,22 +478,65 @@ def investments(request):
             inv.save()
             return JsonResponse({"status": "updated"})
 
+        if action == "prices":
+            try:
+                report = refresh_prices(parse_prices(data.get("prices")), user=user)
+            except ValueError as e:
+                return JsonResponse({"status": "error", "message": str(e)}, status=400)
+            return JsonResponse({"status": "updated", **report})
+
         if action == "delete":
             inv_id = data.get("id")
             Investment.objects.filter(id=inv_id, user=user).delete()
             return JsonResponse({"status": "deleted"})
 
-    investments_list = Investment.objects.filter(user=user)
-    chart_data = [
-        {"name": inv.name, "profit_percentage": inv.profit_percentage}
-        for inv in investments_list
-    ]
+    investments_list = investment_holdings(user)
 
     return render(request, "investments.html", {
         "investments": investments_list,
-        "chart_data": json.dumps(chart_data)
+        "chart_data": json.dumps([
+            {"name": inv.name, "profit_percentage": inv.profit_percentage} for inv in investments_list
+        ])
     })
 
+@login_required
+@require_GET
+@cache_control(private=True, no_cache=True)
+@condition(etag_func=data_etag, last_modified_func=data_last_modified)
+def investments_data(request):
+    return JsonResponse({
+        'chart_data': investment_profit_chart(request.user),
+        'values': investment_values(request.user),
+    })
+
+@login_required
+@require_GET
+def investment_history(request):
+    try:
+        years = float(request.GET.get('years', 3))
+        if not math.isfinite(years):
+            raise ValueError(years)
+    except ValueError:
+        return JsonResponse({'status': 'error', 'message': 'Invalid years'}, status=400)
+    return JsonResponse(cached_portfolio_history(request.user, min(max(years, 0.1), 10)))
+
+@staff_member_required
+@require_POST
+def investment_prices(request):
+    try:
+        data = json.loads(request.body.decode('utf-8'))
+    except ValueError:
+        return JsonResponse({'status': 'error', 'message': 'Invalid JSON'}, status=400)
+
+    try:
+        prices = parse_prices(data.get('prices') if isinstance(data, dict) else None)
+    except ValueError as e:
+        return JsonResponse({'status': 'error', 'message': str(e)}, status=400)
+    if data.get('background'):
+        job = enqueue('refresh_prices', prices={name: str(price) for name, price in prices.items()})
+        return JsonResponse({'status': 'queued', 'job': job.pk}, status=202)
+    return JsonResponse({'status': 'success', **refresh_prices(prices)})
+
 @login_required
 def goals(request):
     if request.method == 'POST' and request.headers.get('x-requested-with') == 'XMLHttpRequest':
@@ -353,7 +547,14 @@ def goals(request):
             name = data.get('name')
             target_amount = Decimal(data.get('target_amount', 0))
             saved_amount = Decimal(data.get('saved_amount', 0))
-            Goal.objects.create(user=request.user, name=name, target_amount=target_amount, saved_amount=saved_amount)
+            try:
+                target_date = date.fromisoformat(data['target_date']) if data.get('target_date') else None
+            except ValueError:
+                return JsonResponse({'status': 'error', 'message': 'Invalid target date'}, status=400)
+            Goal.objects.create(
+                user=request.user, name=name, target_amount=target_amount, saved_amount=saved_amount,
+                target_date=target_date,
+            )
             return JsonResponse({'status': 'success'})
 
         elif action == 'delete':
@@ -377,68 +578,69 @@ def goals(request):
             goal.save()
             return JsonResponse({'status': 'updated', 'saved_amount': float(goal.saved_amount)})
 
-    goals_list = Goal.objects.filter(user=request.user)
-    goals_data = []
-    for g in goals_list:
-        progress = 0
-        if g.target_amount > 0:
-            progress = min(int((g.saved_amount / g.target_amount) * 100), 100)
-        goals_data.append({
-            'id': g.id,
-            'name': g.name,
-            'saved_amount': float(g.saved_amount),
-            'target_amount': float(g.target_amount),
-            'progress': progress
-        })
+    goals_data = [
+        {**g, 'progress': min(int(g['progress']), 100)}
+        for g in cached(request.user.id, f'goals:{date.today():%Y-%m}', goal_progress, request.user)
+    ]
 
     return render(request, 'goals.html', {'goals': goals_data})
 
 @login_required
+@replica_reads
 def reports(request):
     user = request.user
 
-    category_data = (
-        Transaction.objects
-        .filter(user=user, type='Expense')
-        .values('category')
-        .annotate(total=Sum('amount'))
-        .order_by('-total')
-    )
-    category_chart = [
-        {"category": c["category"], "total": float(c["total"])}
-        for c in category_data
-    ]
-
-    month_data = (
-        Transaction.objects
-        .filter(user=user)
-        .extra(select={'month': "strftime('%%Y-%%m', date)"})
-        .values('month', 'type')
-        .annotate(total=Sum('amount'))
-        .order_by('month')
-    )
-
-    monthly_chart = {}
-    for entry in month_data:
-        month = entry['month']
-        typ = entry['type']
-        if month not in monthly_chart:
-            monthly_chart[month] = {'Income': 0, 'Expense': 0}
-        monthly_chart[month][typ] = float(entry['total'])
-
-    months = list(monthly_chart.keys())
-    income_values = [monthly_chart[m]['Income'] for m in months]
-    expense_values = [monthly_chart[m]['Expense'] for m in months]
+    try:
+        params = report_params(request.GET)
+        data = report_data(user, **params)
+    except ValueError as e:
+        messages.error(request, str(e))
+        params = report_params({})
+        data = report_data(user, **params)
 
     context = {
-        'category_chart': json.dumps(category_chart),
-        'months': json.dumps(months),
-        'income_values': json.dumps(income_values),
-        'expense_values': json.dumps(expense_values),
+        'category_chart': json.dumps(data['category_chart']),
+        'months': json.dumps(data['months']),
+        'income_values': json.dumps(data['income_values']),
+        'expense_values': json.dumps(data['expense_values']),
+        'income_avg': json.dumps(data['income_avg']),
+        'expense_avg': json.dumps(data['expense_avg']),
+        'params': params,
+        'granularities': GRANULARITIES,
     }
 
     return render(request, "reports.html", context)
 
+@login_required
+@resolve_user
+@replica_reads
+@require_GET
+@cache_control(private=True, no_cache=True)
+@condition(etag_func=data_etag, last_modified_func=data_last_modified)
+async def reports_data(request):
+    try:
+        params = report_params(request.GET)
+        data, = await gather((partial(report_data, **params), request.user))
+    except ValueError as e:
+        return JsonResponse({'status': 'error', 'message': str(e)}, status=400)
+
+    return JsonResponse(data)
+
+@staff_member_required
+@require_GET
+def cache_stats_view(request):
+    return JsonResponse(cache_stats())
+
+@staff_member_required
+@require_GET
+def job_stats_view(request):
+    return JsonResponse(job_stats())
+
+@staff_member_required
+@require_GET
+def metrics_view(request):
+    return HttpResponse(metrics.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
 @login_required
 def add_expense(request):
     return redirect('transactions')